@@ -0,0 +1,27 @@
+"""add (error_code, scan_time) and (user_id, scan_time) indexes to error_logs
+
+Revision ID: add_error_logs_filter_indexes
+Revises: add_error_logs_scan_time_id_index
+Create Date: 2025-07-09 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_error_logs_filter_indexes'
+down_revision: Union[str, None] = 'add_error_logs_scan_time_id_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_fnb_error_logs_error_code_scan_time', 'error_logs', ['error_code', 'scan_time'], schema='fnb')
+    op.create_index('ix_fnb_error_logs_user_id_scan_time', 'error_logs', ['user_id', 'scan_time'], schema='fnb')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_fnb_error_logs_user_id_scan_time', table_name='error_logs', schema='fnb')
+    op.drop_index('ix_fnb_error_logs_error_code_scan_time', table_name='error_logs', schema='fnb')
@@ -0,0 +1,25 @@
+"""add (scan_time, id) index to error_logs for keyset pagination
+
+Revision ID: add_error_logs_scan_time_id_index
+Revises: add_scan_sync_events
+Create Date: 2025-07-08 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_error_logs_scan_time_id_index'
+down_revision: Union[str, None] = 'add_scan_sync_events'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_fnb_error_logs_scan_time_id', 'error_logs', ['scan_time', 'id'], schema='fnb')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_fnb_error_logs_scan_time_id', table_name='error_logs', schema='fnb')
@@ -0,0 +1,39 @@
+"""add event_day to food_logs
+
+Revision ID: add_event_day_to_food_logs
+Revises: add_error_code_to_error_logs
+Create Date: 2025-07-01 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_event_day_to_food_logs'
+down_revision: Union[str, None] = 'add_error_code_to_error_logs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('food_logs', sa.Column('event_day', sa.Date(), nullable=True), schema='fnb')
+
+    # Backfill the event-local day of every existing entry
+    op.execute(
+        sa.text("UPDATE fnb.food_logs SET event_day = (date AT TIME ZONE :tz)::date")
+        .bindparams(tz=settings.EVENT_TIMEZONE)
+    )
+    op.alter_column('food_logs', 'event_day', nullable=False, schema='fnb')
+
+    # Registration + day lookups become a single index probe
+    op.create_index('ix_fnb_food_logs_registration_id_event_day', 'food_logs',
+                    ['registration_id', 'event_day'], schema='fnb')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_fnb_food_logs_registration_id_event_day', table_name='food_logs', schema='fnb')
+    op.drop_column('food_logs', 'event_day', schema='fnb')
@@ -0,0 +1,47 @@
+"""add event_day to participants
+
+Revision ID: add_event_day_to_participants
+Revises: add_event_day_to_food_logs
+Create Date: 2025-07-01 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_event_day_to_participants'
+down_revision: Union[str, None] = 'add_event_day_to_food_logs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # registrant_id is compared as a string everywhere, like food_logs.registration_id
+    op.alter_column('participants', 'registrant_id',
+                    type_=sa.String(),
+                    postgresql_using='registrant_id::text',
+                    schema='fnb')
+
+    op.add_column('participants', sa.Column('event_day', sa.Date(), nullable=True), schema='fnb')
+
+    # Backfill the event-local day of every participant entry
+    op.execute(
+        sa.text("UPDATE fnb.participants SET event_day = (date AT TIME ZONE :tz)::date")
+        .bindparams(tz=settings.EVENT_TIMEZONE)
+    )
+
+    op.create_index('ix_fnb_participants_registrant_id_event_day', 'participants',
+                    ['registrant_id', 'event_day'], schema='fnb')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_fnb_participants_registrant_id_event_day', table_name='participants', schema='fnb')
+    op.drop_column('participants', 'event_day', schema='fnb')
+    op.alter_column('participants', 'registrant_id',
+                    type_=sa.Integer(),
+                    postgresql_using="NULLIF(regexp_replace(registrant_id, '[^0-9]', '', 'g'), '')::integer",
+                    schema='fnb')
@@ -0,0 +1,108 @@
+"""add meal_served_rollup, maintained by a trigger on food_logs
+
+Revision ID: add_meal_served_rollup
+Revises: add_error_logs_filter_indexes
+Create Date: 2025-07-10 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_meal_served_rollup'
+down_revision: Union[str, None] = 'add_error_logs_filter_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The rollup functions and trigger as of this revision (app.models.meal_rollup has the current ones).
+# Counts go in 15-minute buckets; food logs whose registration is not on that day's schedule count as
+# 'Unscheduled'
+ROLLUP_FUNCTIONS = """
+CREATE OR REPLACE FUNCTION fnb.bump_meal_served(day date, registration text, meal text, taken timestamptz,
+                                                delta integer) RETURNS void AS $$
+    INSERT INTO fnb.meal_served_rollup AS r (event_day, meal, participant_type, bucket_start, served)
+    VALUES (
+        day,
+        meal,
+        COALESCE((SELECT p.participant_type FROM fnb.participants p
+                  WHERE p.registrant_id = registration AND p.event_day = day
+                  LIMIT 1), 'Unscheduled'),
+        to_timestamp(floor(extract(epoch FROM taken) / 900) * 900),
+        delta
+    )
+    ON CONFLICT (event_day, meal, participant_type, bucket_start)
+    DO UPDATE SET served = r.served + EXCLUDED.served
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION fnb.food_logs_meal_rollup() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        IF OLD.lunch_takenon IS NOT NULL AND (TG_OP = 'DELETE' OR NEW.lunch_takenon IS DISTINCT FROM OLD.lunch_takenon) THEN
+            PERFORM fnb.bump_meal_served(OLD.event_day, OLD.registration_id, 'lunch', OLD.lunch_takenon, -1);
+        END IF;
+        IF OLD.dinner_takenon IS NOT NULL AND (TG_OP = 'DELETE' OR NEW.dinner_takenon IS DISTINCT FROM OLD.dinner_takenon) THEN
+            PERFORM fnb.bump_meal_served(OLD.event_day, OLD.registration_id, 'dinner', OLD.dinner_takenon, -1);
+        END IF;
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        IF NEW.lunch_takenon IS NOT NULL AND (TG_OP = 'INSERT' OR NEW.lunch_takenon IS DISTINCT FROM OLD.lunch_takenon) THEN
+            PERFORM fnb.bump_meal_served(NEW.event_day, NEW.registration_id, 'lunch', NEW.lunch_takenon, 1);
+        END IF;
+        IF NEW.dinner_takenon IS NOT NULL AND (TG_OP = 'INSERT' OR NEW.dinner_takenon IS DISTINCT FROM OLD.dinner_takenon) THEN
+            PERFORM fnb.bump_meal_served(NEW.event_day, NEW.registration_id, 'dinner', NEW.dinner_takenon, 1);
+        END IF;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+ROLLUP_TRIGGER = """
+DROP TRIGGER IF EXISTS food_logs_meal_rollup ON fnb.food_logs;
+CREATE TRIGGER food_logs_meal_rollup
+AFTER INSERT OR UPDATE OF lunch_takenon, dinner_takenon OR DELETE ON fnb.food_logs
+FOR EACH ROW EXECUTE FUNCTION fnb.food_logs_meal_rollup();
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        'meal_served_rollup',
+        sa.Column('event_day', sa.Date(), nullable=False),
+        sa.Column('meal', sa.String(length=20), nullable=False),
+        sa.Column('participant_type', sa.String(length=50), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('served', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.PrimaryKeyConstraint('event_day', 'meal', 'participant_type', 'bucket_start',
+                                name='meal_served_rollup_pkey'),
+        schema='fnb'
+    )
+    op.execute(ROLLUP_FUNCTIONS)
+    op.execute(ROLLUP_TRIGGER)
+
+    # Count what is already there; from here on the trigger keeps it current
+    op.execute("""
+        INSERT INTO fnb.meal_served_rollup (event_day, meal, participant_type, bucket_start, served)
+        SELECT f.event_day, m.meal, COALESCE(p.participant_type, 'Unscheduled'),
+               to_timestamp(floor(extract(epoch FROM m.taken) / 900) * 900),
+               count(*)
+        FROM fnb.food_logs f
+        CROSS JOIN LATERAL (VALUES ('lunch', f.lunch_takenon), ('dinner', f.dinner_takenon)) AS m (meal, taken)
+        LEFT JOIN LATERAL (
+            SELECT participant_type FROM fnb.participants
+            WHERE registrant_id = f.registration_id AND event_day = f.event_day
+            LIMIT 1
+        ) p ON true
+        WHERE m.taken IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS food_logs_meal_rollup ON fnb.food_logs")
+    op.execute("DROP FUNCTION IF EXISTS fnb.food_logs_meal_rollup()")
+    op.execute("DROP FUNCTION IF EXISTS fnb.bump_meal_served(date, text, text, timestamptz, integer)")
+    op.drop_table('meal_served_rollup', schema='fnb')
@@ -0,0 +1,60 @@
+"""add multi_entry to food_logs and make regular entries unique per event day
+
+Revision ID: add_multi_entry_to_food_logs
+Revises: add_event_day_to_participants
+Create Date: 2025-07-03 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.core.special_registrations import SPECIAL_REGISTRATIONS
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_multi_entry_to_food_logs'
+down_revision: Union[str, None] = 'add_event_day_to_participants'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('food_logs', sa.Column('multi_entry', sa.Boolean(), nullable=False,
+                                         server_default=sa.text('false')), schema='fnb')
+
+    # Special registrations and "master" badges keep one row per meal
+    op.execute(
+        sa.text("""
+            UPDATE fnb.food_logs SET multi_entry = true
+            WHERE registration_id = ANY(:codes)
+               OR regexp_replace(registration_id, '\\D', '', 'g') = ANY(:numbers)
+               OR lower(name) = 'master'
+        """).bindparams(
+            codes=list(SPECIAL_REGISTRATIONS.keys()),
+            numbers=[str(number) for number in SPECIAL_REGISTRATIONS.values()]
+        )
+    )
+
+    # Legacy duplicates from the old SELECT-then-INSERT race: keep the first row
+    # of each day as the regular entry and set the rest aside so the index can be built
+    op.execute("""
+        UPDATE fnb.food_logs f SET multi_entry = true
+        FROM (
+            SELECT registration_id, date,
+                   row_number() OVER (PARTITION BY registration_id, event_day ORDER BY date) AS n
+            FROM fnb.food_logs
+            WHERE NOT multi_entry
+        ) d
+        WHERE f.registration_id = d.registration_id AND f.date = d.date AND d.n > 1
+    """)
+
+    # Conflict target for the regular-registration upsert
+    op.create_index('uq_fnb_food_logs_registration_id_event_day', 'food_logs',
+                    ['registration_id', 'event_day'], unique=True, schema='fnb',
+                    postgresql_where=sa.text('NOT multi_entry'))
+
+
+def downgrade() -> None:
+    op.drop_index('uq_fnb_food_logs_registration_id_event_day', table_name='food_logs', schema='fnb')
+    op.drop_column('food_logs', 'multi_entry', schema='fnb')
@@ -0,0 +1,110 @@
+"""add change versions and tombstones for the roster change feed
+
+Revision ID: add_roster_change_versions
+Revises: add_meal_served_rollup
+Create Date: 2025-07-11 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_roster_change_versions'
+down_revision: Union[str, None] = 'add_meal_served_rollup'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The change-version functions and triggers as of this revision (app.models.change_tombstone has the current ones)
+CHANGE_VERSION_FUNCTIONS = """
+CREATE OR REPLACE FUNCTION fnb.stamp_change_version() RETURNS trigger AS $$
+BEGIN
+    NEW.change_version := nextval('fnb.change_version_seq');
+    NEW.changed_at := clock_timestamp();
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fnb.participant_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO fnb.change_tombstones (change_version, changed_at, kind, participant_id, registrant_id, event_day)
+    VALUES (nextval('fnb.change_version_seq'), clock_timestamp(), 'participant', OLD.id, OLD.registrant_id,
+            OLD.event_day);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fnb.food_log_tombstone() RETURNS trigger AS $$
+BEGIN
+    IF NOT OLD.multi_entry THEN
+        INSERT INTO fnb.change_tombstones (change_version, changed_at, kind, registrant_id, event_day)
+        VALUES (nextval('fnb.change_version_seq'), clock_timestamp(), 'food_log', OLD.registration_id, OLD.event_day);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+CHANGE_VERSION_TRIGGERS = """
+DROP TRIGGER IF EXISTS participants_change_version ON fnb.participants;
+CREATE TRIGGER participants_change_version
+BEFORE INSERT OR UPDATE ON fnb.participants
+FOR EACH ROW EXECUTE FUNCTION fnb.stamp_change_version();
+
+DROP TRIGGER IF EXISTS participants_tombstone ON fnb.participants;
+CREATE TRIGGER participants_tombstone
+AFTER DELETE ON fnb.participants
+FOR EACH ROW EXECUTE FUNCTION fnb.participant_tombstone();
+
+DROP TRIGGER IF EXISTS food_logs_change_version ON fnb.food_logs;
+CREATE TRIGGER food_logs_change_version
+BEFORE INSERT OR UPDATE ON fnb.food_logs
+FOR EACH ROW EXECUTE FUNCTION fnb.stamp_change_version();
+
+DROP TRIGGER IF EXISTS food_logs_tombstone ON fnb.food_logs;
+CREATE TRIGGER food_logs_tombstone
+AFTER DELETE ON fnb.food_logs
+FOR EACH ROW EXECUTE FUNCTION fnb.food_log_tombstone();
+"""
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE fnb.change_version_seq")
+
+    for table in ('participants', 'food_logs'):
+        op.add_column(table, sa.Column('change_version', sa.BigInteger(), nullable=True), schema='fnb')
+        op.add_column(table, sa.Column('changed_at', sa.DateTime(timezone=True), nullable=True), schema='fnb')
+        # Existing rows become the first versions; the triggers number everything after
+        op.execute(f"UPDATE fnb.{table} SET change_version = nextval('fnb.change_version_seq'), changed_at = now()")
+        op.create_index(f'ix_fnb_{table}_change_version', table, ['change_version'], schema='fnb')
+
+    op.create_table(
+        'change_tombstones',
+        sa.Column('change_version', sa.BigInteger(), nullable=False),
+        sa.Column('changed_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('participant_id', sa.Integer(), nullable=True),
+        sa.Column('registrant_id', sa.String(), nullable=False),
+        sa.Column('event_day', sa.Date(), nullable=True),
+        sa.PrimaryKeyConstraint('change_version', name='change_tombstones_pkey'),
+        schema='fnb'
+    )
+    op.execute(CHANGE_VERSION_FUNCTIONS)
+    op.execute(CHANGE_VERSION_TRIGGERS)
+
+
+def downgrade() -> None:
+    for trigger, table in (('participants_change_version', 'participants'), ('participants_tombstone', 'participants'),
+                           ('food_logs_change_version', 'food_logs'), ('food_logs_tombstone', 'food_logs')):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger} ON fnb.{table}")
+    op.execute("DROP FUNCTION IF EXISTS fnb.stamp_change_version()")
+    op.execute("DROP FUNCTION IF EXISTS fnb.participant_tombstone()")
+    op.execute("DROP FUNCTION IF EXISTS fnb.food_log_tombstone()")
+    op.drop_table('change_tombstones', schema='fnb')
+    for table in ('participants', 'food_logs'):
+        op.drop_index(f'ix_fnb_{table}_change_version', table_name=table, schema='fnb')
+        op.drop_column(table, 'changed_at', schema='fnb')
+        op.drop_column(table, 'change_version', schema='fnb')
+    op.execute("DROP SEQUENCE fnb.change_version_seq")
@@ -0,0 +1,37 @@
+"""add scan_sync_events for offline scanner uploads
+
+Revision ID: add_scan_sync_events
+Revises: add_multi_entry_to_food_logs
+Create Date: 2025-07-04 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_scan_sync_events'
+down_revision: Union[str, None] = 'add_multi_entry_to_food_logs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'scan_sync_events',
+        sa.Column('device_id', sa.String(length=100), nullable=False),
+        sa.Column('seq', sa.BigInteger(), nullable=False),
+        sa.Column('registration_id', sa.String(), nullable=False),
+        sa.Column('meal', sa.String(length=20), nullable=False),
+        sa.Column('scan_time', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('received_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('device_id', 'seq', name='scan_sync_events_pkey'),
+        schema='fnb'
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('scan_sync_events', schema='fnb')
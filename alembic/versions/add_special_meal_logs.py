@@ -0,0 +1,44 @@
+"""add special_meal_logs for meals other than lunch and dinner
+
+Revision ID: add_special_meal_logs
+Revises: limit_food_log_change_versions
+Create Date: 2025-07-13 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_special_meal_logs'
+down_revision: Union[str, None] = 'limit_food_log_change_versions'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'special_meal_logs',
+        sa.Column('registration_id', sa.String(), nullable=False),
+        sa.Column('meal', sa.String(length=20), nullable=False),
+        sa.Column('taken_on', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('event_day', sa.Date(), nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('multi_entry', sa.Boolean(), server_default=sa.text('false'), nullable=False),
+        sa.PrimaryKeyConstraint('registration_id', 'meal', 'taken_on', name='special_meal_logs_pkey'),
+        schema='fnb'
+    )
+    op.create_index('uq_fnb_special_meal_logs_registration_id_event_day_meal', 'special_meal_logs',
+                    ['registration_id', 'event_day', 'meal'], unique=True, schema='fnb',
+                    postgresql_where=sa.text('NOT multi_entry'))
+    op.create_index('ix_fnb_special_meal_logs_event_day_meal', 'special_meal_logs', ['event_day', 'meal'],
+                    schema='fnb')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_fnb_special_meal_logs_event_day_meal', table_name='special_meal_logs', schema='fnb')
+    op.drop_index('uq_fnb_special_meal_logs_registration_id_event_day_meal', table_name='special_meal_logs',
+                  schema='fnb')
+    op.drop_table('special_meal_logs', schema='fnb')
@@ -0,0 +1,50 @@
+"""only version food log writes that change what the roster feed reports
+
+Revision ID: limit_food_log_change_versions
+Revises: lock_roster_change_horizon
+Create Date: 2025-07-13 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'limit_food_log_change_versions'
+down_revision: Union[str, None] = 'lock_roster_change_horizon'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Multi-entry rows and updates that leave the served meals as they were keep their version
+    op.execute("""
+DROP TRIGGER IF EXISTS food_logs_change_version ON fnb.food_logs;
+CREATE TRIGGER food_logs_change_version
+BEFORE INSERT ON fnb.food_logs
+FOR EACH ROW WHEN (NOT NEW.multi_entry)
+EXECUTE FUNCTION fnb.stamp_change_version();
+
+DROP TRIGGER IF EXISTS food_logs_served_change_version ON fnb.food_logs;
+CREATE TRIGGER food_logs_served_change_version
+BEFORE UPDATE ON fnb.food_logs
+FOR EACH ROW WHEN (NOT NEW.multi_entry AND (
+    (OLD.lunch_takenon IS NULL) <> (NEW.lunch_takenon IS NULL)
+    OR (OLD.dinner_takenon IS NULL) <> (NEW.dinner_takenon IS NULL)
+    OR OLD.registration_id IS DISTINCT FROM NEW.registration_id
+    OR OLD.event_day IS DISTINCT FROM NEW.event_day
+    OR OLD.multi_entry
+))
+EXECUTE FUNCTION fnb.stamp_change_version();
+""")
+
+
+def downgrade() -> None:
+    op.execute("""
+DROP TRIGGER IF EXISTS food_logs_served_change_version ON fnb.food_logs;
+DROP TRIGGER IF EXISTS food_logs_change_version ON fnb.food_logs;
+CREATE TRIGGER food_logs_change_version
+BEFORE INSERT OR UPDATE ON fnb.food_logs
+FOR EACH ROW EXECUTE FUNCTION fnb.stamp_change_version();
+""")
@@ -0,0 +1,102 @@
+"""bound the roster change feed by the versions open writers may still commit
+
+Revision ID: lock_roster_change_horizon
+Revises: shard_meal_served_rollup
+Create Date: 2025-07-12 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'lock_roster_change_horizon'
+down_revision: Union[str, None] = 'shard_meal_served_rollup'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The change-version functions as of this revision (app.models.change_tombstone has the current ones)
+CHANGE_VERSION_FUNCTIONS = """
+CREATE OR REPLACE FUNCTION fnb.change_versions_issued() RETURNS bigint AS $$
+    SELECT CASE WHEN is_called THEN last_value ELSE last_value - 1 END FROM fnb.change_version_seq
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION fnb.next_change_version() RETURNS bigint AS $$
+DECLARE
+    issued bigint;
+BEGIN
+    IF coalesce(current_setting('fnb.change_version_floor', true), '') = '' THEN
+        issued := fnb.change_versions_issued();
+        PERFORM pg_advisory_xact_lock_shared(issued);
+        PERFORM set_config('fnb.change_version_floor', issued::text, true);
+    END IF;
+    RETURN nextval('fnb.change_version_seq');
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fnb.stamp_change_version() RETURNS trigger AS $$
+BEGIN
+    NEW.change_version := fnb.next_change_version();
+    NEW.changed_at := clock_timestamp();
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fnb.participant_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO fnb.change_tombstones (change_version, changed_at, kind, participant_id, registrant_id, event_day)
+    VALUES (fnb.next_change_version(), clock_timestamp(), 'participant', OLD.id, OLD.registrant_id,
+            OLD.event_day);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fnb.food_log_tombstone() RETURNS trigger AS $$
+BEGIN
+    IF NOT OLD.multi_entry THEN
+        INSERT INTO fnb.change_tombstones (change_version, changed_at, kind, registrant_id, event_day)
+        VALUES (fnb.next_change_version(), clock_timestamp(), 'food_log', OLD.registration_id, OLD.event_day);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    # The triggers call these functions by name, so replacing them is enough
+    op.execute(CHANGE_VERSION_FUNCTIONS)
+
+
+def downgrade() -> None:
+    op.execute("""
+CREATE OR REPLACE FUNCTION fnb.stamp_change_version() RETURNS trigger AS $$
+BEGIN
+    NEW.change_version := nextval('fnb.change_version_seq');
+    NEW.changed_at := clock_timestamp();
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fnb.participant_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO fnb.change_tombstones (change_version, changed_at, kind, participant_id, registrant_id, event_day)
+    VALUES (nextval('fnb.change_version_seq'), clock_timestamp(), 'participant', OLD.id, OLD.registrant_id,
+            OLD.event_day);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fnb.food_log_tombstone() RETURNS trigger AS $$
+BEGIN
+    IF NOT OLD.multi_entry THEN
+        INSERT INTO fnb.change_tombstones (change_version, changed_at, kind, registrant_id, event_day)
+        VALUES (nextval('fnb.change_version_seq'), clock_timestamp(), 'food_log', OLD.registration_id, OLD.event_day);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+""")
+    op.execute("DROP FUNCTION IF EXISTS fnb.next_change_version()")
+    op.execute("DROP FUNCTION IF EXISTS fnb.change_versions_issued()")
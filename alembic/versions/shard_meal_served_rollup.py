@@ -0,0 +1,88 @@
+"""spread meal_served_rollup buckets over per-connection slots
+
+Revision ID: shard_meal_served_rollup
+Revises: add_roster_change_versions
+Create Date: 2025-07-12 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'shard_meal_served_rollup'
+down_revision: Union[str, None] = 'add_roster_change_versions'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# bump_meal_served as of this revision: each connection counts in its own of 16 slots per bucket
+BUMP_MEAL_SERVED = """
+CREATE OR REPLACE FUNCTION fnb.bump_meal_served(day date, registration text, meal text, taken timestamptz,
+                                                delta integer) RETURNS void AS $$
+    INSERT INTO fnb.meal_served_rollup AS r (event_day, meal, participant_type, bucket_start, slot, served)
+    VALUES (
+        day,
+        meal,
+        COALESCE((SELECT p.participant_type FROM fnb.participants p
+                  WHERE p.registrant_id = registration AND p.event_day = day
+                  LIMIT 1), 'Unscheduled'),
+        to_timestamp(floor(extract(epoch FROM taken) / 900) * 900),
+        pg_backend_pid() % 16,
+        delta
+    )
+    ON CONFLICT ON CONSTRAINT meal_served_rollup_pkey
+    DO UPDATE SET served = r.served + EXCLUDED.served
+$$ LANGUAGE sql;
+"""
+
+# As add_meal_served_rollup left it
+SINGLE_ROW_BUMP_MEAL_SERVED = """
+CREATE OR REPLACE FUNCTION fnb.bump_meal_served(day date, registration text, meal text, taken timestamptz,
+                                                delta integer) RETURNS void AS $$
+    INSERT INTO fnb.meal_served_rollup AS r (event_day, meal, participant_type, bucket_start, served)
+    VALUES (
+        day,
+        meal,
+        COALESCE((SELECT p.participant_type FROM fnb.participants p
+                  WHERE p.registrant_id = registration AND p.event_day = day
+                  LIMIT 1), 'Unscheduled'),
+        to_timestamp(floor(extract(epoch FROM taken) / 900) * 900),
+        delta
+    )
+    ON CONFLICT (event_day, meal, participant_type, bucket_start)
+    DO UPDATE SET served = r.served + EXCLUDED.served
+$$ LANGUAGE sql;
+"""
+
+
+def upgrade() -> None:
+    # Existing counts stay in slot 0
+    op.add_column('meal_served_rollup',
+                  sa.Column('slot', sa.SmallInteger(), server_default=sa.text('0'), nullable=False),
+                  schema='fnb')
+    op.drop_constraint('meal_served_rollup_pkey', 'meal_served_rollup', schema='fnb', type_='primary')
+    op.create_primary_key('meal_served_rollup_pkey', 'meal_served_rollup',
+                          ['event_day', 'meal', 'participant_type', 'bucket_start', 'slot'], schema='fnb')
+    op.execute(BUMP_MEAL_SERVED)
+
+
+def downgrade() -> None:
+    # Fold the slots back into one row per bucket, then restore the single-row counter
+    op.execute("""
+        CREATE TEMPORARY TABLE meal_served_totals ON COMMIT DROP AS
+        SELECT event_day, meal, participant_type, bucket_start, sum(served)::integer AS served
+        FROM fnb.meal_served_rollup
+        GROUP BY event_day, meal, participant_type, bucket_start
+    """)
+    op.execute("DELETE FROM fnb.meal_served_rollup")
+    op.drop_constraint('meal_served_rollup_pkey', 'meal_served_rollup', schema='fnb', type_='primary')
+    op.drop_column('meal_served_rollup', 'slot', schema='fnb')
+    op.create_primary_key('meal_served_rollup_pkey', 'meal_served_rollup',
+                          ['event_day', 'meal', 'participant_type', 'bucket_start'], schema='fnb')
+    op.execute("""
+        INSERT INTO fnb.meal_served_rollup (event_day, meal, participant_type, bucket_start, served)
+        SELECT event_day, meal, participant_type, bucket_start, served FROM meal_served_totals
+    """)
+    op.execute(SINGLE_ROW_BUMP_MEAL_SERVED)
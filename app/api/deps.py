@@ -1,12 +1,3 @@
-from typing import Generator
-from app.db.session import SessionLocal
-
-def get_db() -> Generator:
-    """
-    Dependency for getting database session.
-    """
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close() 
\ No newline at end of file
+# The one request-scoped session provider; re-exported so every router and the
+# auth dependency share it and FastAPI opens a single session per request
+from app.db.session import get_db  # noqa
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import food_log, participants, error_logs, users, meal_timings
+from app.api.v1.endpoints import food_log, participants, error_logs, users, meal_timings, scan, sync, reports, live, admin
 
 api_router = APIRouter()
 
@@ -7,4 +7,9 @@ api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(food_log.router, prefix="/food-log", tags=["food-log"])
 api_router.include_router(participants.router, prefix="/participants", tags=["participants"])
 api_router.include_router(error_logs.router, prefix="/error-logs", tags=["error-logs"])
-api_router.include_router(meal_timings.router, prefix="/meal-timings", tags=["meal-timings"]) 
\ No newline at end of file
+api_router.include_router(meal_timings.router, prefix="/meal-timings", tags=["meal-timings"])
+api_router.include_router(scan.router, prefix="/scan", tags=["scan"])
+api_router.include_router(sync.router, prefix="/sync", tags=["sync"])
+api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
+api_router.include_router(live.router, prefix="/live", tags=["live"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends
+from typing import Dict
+import logging
+
+from app.models.user import User as UserModel
+from app.core.security import get_current_admin, user_cache, token_cache
+from app.core.passwords import login_metrics
+from app.core.roster_cache import roster_cache
+from app.core.error_log_buffer import error_log_buffer
+from app.core.live_counters import live_counters
+from app.crud.export import export_limit
+from app.db.pool_metrics import pool_metrics, request_checkout_metrics
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+@router.get("/metrics", response_model=Dict)
+async def get_metrics(
+    current_user: UserModel = Depends(get_current_admin)
+):
+    """
+    Get in-process performance counters. Admins only (ADMIN_USERNAMES).
+    Counters are per worker process and reset on restart.
+    """
+    return {
+        "user_cache": user_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "login": login_metrics.stats(),
+        "roster_cache": roster_cache.stats(),
+        "error_log_buffer": error_log_buffer.stats(),
+        "live_counters": live_counters.stats(),
+        "exports": export_limit.stats(),
+        "checkouts_per_request": request_checkout_metrics.stats(),
+        "pool": {name: metrics.stats() for name, metrics in pool_metrics.items()}
+    }
@@ -5,37 +5,28 @@ from datetime import datetime, timedelta
 from sqlalchemy import func, Date
 import logging
 
-from app.api.deps import get_db
+from app.db.session import get_db, get_read_db
 from app.crud import error_log as crud
+from app.crud import export
 from app.schemas.error_log import (
     ErrorLogCreate,
     ErrorLogSchema,
     ErrorLogResponse,
     ErrorLogListResponse,
+    ErrorLogBatchResponse,
     DetailResponse
 )
 from app.models.user import User as UserModel
-from app.core.security import get_current_user, create_access_token
+from app.core.security import get_current_user, renew_access_token
 from app.core.config import settings
+from app.core.error_codes import ERROR_CODES
+from app.core.error_log_buffer import error_log_buffer
+from app.core.responses import download_response
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Error code definitions
-ERROR_CODES = {
-    "01": "Invalid registration ID",
-    "02": "Meal time expired",
-    "03": "Duplicate meal entry",
-    "04": "Invalid meal type",
-    "05": "User not authorized",
-    "06": "System error",
-    "07": "Invalid date format",
-    "08": "Database connection error",
-    "09": "Invalid request format",
-    "10": "Resource not found"
-}
-
 @router.get("/error-codes", response_model=Dict[str, str])
 async def get_error_codes():
     """
@@ -43,14 +34,24 @@ async def get_error_codes():
     """
     return ERROR_CODES
 
+def _invalid_error_codes(error_logs: List[ErrorLogCreate]) -> Optional[DetailResponse]:
+    if any(error_log.error_code not in ERROR_CODES for error_log in error_logs):
+        return DetailResponse(detail=f"Invalid error code. Must be one of: {', '.join(ERROR_CODES.keys())}")
+    return None
+
 @router.post("/", response_model=Union[ErrorLogResponse, DetailResponse])
 def create_error_log(
+    response: Response,
     error_log_in: ErrorLogCreate,
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user)
+    current_user: UserModel = Depends(get_current_user),
+    access_token: Optional[str] = Depends(renew_access_token)
 ):
     """
     Create a new error log.
+
+    The entry is queued and written in the background with other error logs,
+    so it may take up to ERROR_LOG_FLUSH_MS to appear in listings. Returns 503
+    if the queue is full.
     
     Error Codes:
     - 01: Invalid registration ID
@@ -64,46 +65,105 @@ def create_error_log(
     - 09: Invalid request format
     - 10: Resource not found
     """
-    try:
-        # Validate error code
-        if error_log_in.error_code not in ERROR_CODES:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid error code. Must be one of: {', '.join(ERROR_CODES.keys())}"
-            )
+    invalid = _invalid_error_codes([error_log_in])
+    if invalid is not None:
+        response.status_code = 400
+        return invalid
 
-        error_log = crud.create_error_log(db, error_log_in)
-        # Generate new token
-        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        new_token = create_access_token(
-            data={"sub": current_user.username}, expires_delta=access_token_expires
-        )
-        return ErrorLogResponse(
-            userid=error_log.user_id,
-            registrant_id=str(error_log.registrant_id),
-            error=error_log.error,
-            error_code=error_log.error_code,
-            scan_time=error_log.scan_time,
-            access_token=new_token
+    if not error_log_buffer.put([error_log_in]):
+        response.status_code = 503
+        return DetailResponse(detail="Error log queue is full, try again later")
+    return ErrorLogResponse(
+        userid=error_log_in.user_id,
+        registrant_id=str(error_log_in.registrant_id),
+        error=error_log_in.error,
+        error_code=error_log_in.error_code,
+        scan_time=error_log_in.scan_time,
+        access_token=access_token
+    )
+
+@router.post("/batch", response_model=Union[ErrorLogBatchResponse, DetailResponse])
+def create_error_logs(
+    response: Response,
+    error_logs_in: List[ErrorLogCreate],
+    current_user: UserModel = Depends(get_current_user),
+    access_token: Optional[str] = Depends(renew_access_token)
+):
+    """
+    Queue many error logs at once, e.g. from a scanner that was offline.
+
+    Items are queued in order; if the queue fills up the remaining items are
+    dropped and counted in the response so the client can resend them.
+    """
+    invalid = _invalid_error_codes(error_logs_in)
+    if invalid is not None:
+        response.status_code = 400
+        return invalid
+
+    accepted = error_log_buffer.put(error_logs_in)
+    return ErrorLogBatchResponse(accepted=accepted, dropped=len(error_logs_in) - accepted, access_token=access_token)
+
+@router.get("/export", response_model=None)
+def export_error_logs(
+    response: Response,
+    start_date_str: Optional[str] = None,
+    end_date_str: Optional[str] = None,
+    error_code: Optional[str] = None,
+    participant_type: Optional[str] = None,
+    format: str = "csv",
+    gzip: bool = False,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user),
+    access_token: Optional[str] = Depends(renew_access_token)
+):
+    """
+    Download error logs as CSV or NDJSON, optionally gzipped, instead of paging the listing.
+
+    Filters: event days start_date_str..end_date_str (YYYY-MM-DD, inclusive),
+    error_code and participant_type. Rows are streamed from a server-side
+    cursor, so exports of any size run in constant memory.
+    """
+    if error_code and error_code not in ERROR_CODES:
+        response.status_code = 400
+        return DetailResponse(detail=f"Invalid error code. Must be one of: {', '.join(ERROR_CODES.keys())}")
+    try:
+        query = export.error_log_export_query(
+            start_date=export.parse_export_date(start_date_str, "start_date"),
+            end_date=export.parse_export_date(end_date_str, "end_date"),
+            error_code=error_code,
+            participant_type=participant_type
         )
-    except Exception as e:
-        logger.error(f"Error creating error log: {str(e)}", exc_info=True)
-        return DetailResponse(detail=f"An error occurred: {str(e)}")
+        chunks = export.stream_export(query, format, gzip)
+    except ValueError as e:
+        response.status_code = 400
+        return DetailResponse(detail=str(e))
+    if not export.export_limit.admit():
+        response.status_code = 429
+        response.headers["Retry-After"] = "30"
+        return DetailResponse(detail="Too many exports in progress. Please try again shortly.")
+    filename = f"error_logs.{format}" + (".gz" if gzip else "")
+    # The export reads through its own engine; give back the connection used for auth first
+    db.close()
+    return download_response(response, chunks, "application/gzip" if gzip else export.MEDIA_TYPES[format], filename)
 
 @router.get("/", response_model=Union[ErrorLogListResponse, DetailResponse])
 def get_error_logs(
     response: Response,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
     user_id: Optional[int] = None,
     registrant_id: Optional[int] = None,
     error_code: Optional[str] = None,
     start_date_str: Optional[str] = None,
-    end_date_str: Optional[str] = None
+    end_date_str: Optional[str] = None,
+    cursor: Optional[str] = None
 ) -> Union[ErrorLogListResponse, DetailResponse]:
     """
-    Retrieve error logs with optional filtering.
+    Retrieve error logs with optional filtering, newest first.
+
+    Page with the returned next_cursor (?cursor=...) rather than skip: each
+    cursor page is an index seek, while skip gets slower the deeper it goes.
     
     Error Codes:
     - 01: Invalid registration ID
@@ -139,22 +199,27 @@ def get_error_logs(
             response.status_code = 400
             return DetailResponse(detail=f"Invalid error code. Must be one of: {', '.join(ERROR_CODES.keys())}")
 
-        error_logs = crud.get_error_logs(
-            db=db,
-            skip=skip,
-            limit=limit,
-            user_id=user_id,
-            registrant_id=registrant_id,
-            error_code=error_code,
-            start_date=start_date,
-            end_date=end_date
-        )
+        try:
+            error_logs, next_cursor = crud.get_error_log_page(
+                db=db,
+                limit=limit,
+                cursor=cursor,
+                skip=skip,
+                user_id=user_id,
+                registrant_id=registrant_id,
+                error_code=error_code,
+                start_date=start_date,
+                end_date=end_date
+            )
+        except ValueError as e:
+            response.status_code = 400
+            return DetailResponse(detail=str(e))
         
         if not error_logs:
             response.status_code = 404
             return DetailResponse(detail="No error logs found matching the criteria.")
 
-        return ErrorLogListResponse(error_logs=error_logs)
+        return ErrorLogListResponse(error_logs=error_logs, next_cursor=next_cursor)
     except Exception as e:
         logger.error(f"Error retrieving error logs: {str(e)}", exc_info=True)
         response.status_code = 500
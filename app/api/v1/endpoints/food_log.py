@@ -4,15 +4,23 @@ from sqlalchemy.types import String
 from datetime import datetime, date
 import logging
 from sqlalchemy import cast, Date, func, text
-from app.db.session import get_db
+from app.db.session import get_db, use_replica
 from app.models.food_log import FoodLog
 from app.models.user import User as UserModel
-from app.schemas.food_log import FoodLogUpdate, FoodLogSchema, FoodLogListResponse, DetailResponse
+from app.schemas.food_log import (
+    FoodLogUpdate,
+    FoodLogSchema,
+    FoodLogListResponse,
+    FoodLogBulkItemResult,
+    FoodLogBulkUpdateResponse,
+    DetailResponse
+)
 from app.crud import food_log as crud
-from app.api import deps
-from app.core.security import get_current_user, create_access_token
-from typing import Union
+from app.crud import export
+from app.core.security import get_current_user, renew_access_token
+from typing import List, Union, Optional
 from app.core.config import settings
+from app.core.responses import download_response, fast_response, row_dict
 from datetime import timedelta
 
 logger = logging.getLogger(__name__)
@@ -24,56 +32,85 @@ def get_food_logs_by_schedule(
     registrationid: str,
     date_str: str,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user)
+    current_user: UserModel = Depends(get_current_user),
+    access_token: Optional[str] = Depends(renew_access_token)
 ):
     """
     Get food logs by registration ID and date.
+    Served from the read replica unless this registration was just written.
     """
     try:
+        use_replica(db, registrationid)
         food_logs = crud.get_food_logs_by_schedule(db, registrationid, date_str)
         if not food_logs:
             response.status_code = 200
             return DetailResponse(detail="No data found")
 
-        # Generate new token
-        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        new_token = create_access_token(
-            data={"sub": current_user.username}, expires_delta=access_token_expires
-        )
-
-        # Convert food logs to schema format
-        food_log_schemas = []
-        for log in food_logs:
-            food_log_schemas.append(FoodLogSchema(
-                name=log.name,
-                registration_id=log.registration_id,
-                date=log.date,
-                lunch=log.lunch,
-                dinner=log.dinner,
-                lunch_takenon=log.lunch_takenon,
-                dinner_takenon=log.dinner_takenon
-            ))
-
-        return FoodLogListResponse(
-            food_logs=food_log_schemas,
-            detail=None,
-            access_token=new_token
-        )
+        # Rows go straight to JSON in the FoodLogListResponse shape, without pydantic
+        return fast_response(response, {
+            "food_logs": [row_dict(log, FoodLogSchema) for log in food_logs],
+            "detail": None,
+            "access_token": access_token
+        })
     except Exception as e:
         logger.error(f"Error searching food logs: {str(e)}", exc_info=True)
         response.status_code = 500
         return DetailResponse(detail=f"An error occurred: {str(e)}")
 
+@router.get("/export", response_model=None)
+def export_food_logs(
+    response: Response,
+    start_date_str: Optional[str] = None,
+    end_date_str: Optional[str] = None,
+    meal: Optional[str] = None,
+    participant_type: Optional[str] = None,
+    format: str = "csv",
+    gzip: bool = False,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user),
+    access_token: Optional[str] = Depends(renew_access_token)
+):
+    """
+    Download food logs as CSV or NDJSON, optionally gzipped, for post-event reporting.
+
+    Filters: event days start_date_str..end_date_str (YYYY-MM-DD, inclusive),
+    meal (only rows where it was taken) and the participant type scheduled that
+    day. Rows are streamed from a server-side cursor, so exports of any size run
+    in constant memory.
+    """
+    try:
+        query = export.food_log_export_query(
+            start_date=export.parse_export_date(start_date_str, "start_date"),
+            end_date=export.parse_export_date(end_date_str, "end_date"),
+            meal=meal.strip().lower() if meal else None,
+            participant_type=participant_type
+        )
+        chunks = export.stream_export(query, format, gzip)
+    except ValueError as e:
+        response.status_code = 400
+        return DetailResponse(detail=str(e))
+    if not export.export_limit.admit():
+        response.status_code = 429
+        response.headers["Retry-After"] = "30"
+        return DetailResponse(detail="Too many exports in progress. Please try again shortly.")
+    filename = f"food_logs.{format}" + (".gz" if gzip else "")
+    # The export reads through its own engine; give back the connection used for auth first
+    db.close()
+    return download_response(response, chunks, "application/gzip" if gzip else export.MEDIA_TYPES[format], filename)
+
 @router.post("/update", response_model=Union[FoodLogSchema, DetailResponse])
 def update_food_log(
     response: Response,
     request: Request,
     update_data: FoodLogUpdate,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user)
+    current_user: UserModel = Depends(get_current_user),
+    access_token: Optional[str] = Depends(renew_access_token)
 ):
     """
     Update food log data for a specific registration ID and date.
+    Fields left out keep their stored value and fields sent as null are cleared, except
+    the meal stamps, which are never cleared; recording a meal already taken returns 409.
     
     Args:
         update_data (FoodLogUpdate): The data to update including registrationid and date
@@ -90,13 +127,7 @@ def update_food_log(
             response.status_code = 400
             return DetailResponse(detail="Cannot create new food log: 'userid' is required for new entries.")
         
-        # Generate new token
-        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        new_token = create_access_token(
-            data={"sub": current_user.username}, expires_delta=access_token_expires
-        )
-        
-        # Convert log to dict and add new token
+        # Convert log to dict and add the renewed token, if any
         log_dict = {
             "name": log.name,
             "registration_id": log.registration_id,
@@ -105,9 +136,12 @@ def update_food_log(
             "dinner": log.dinner,
             "lunch_takenon": log.lunch_takenon,
             "dinner_takenon": log.dinner_takenon,
-            "access_token": new_token
+            "access_token": access_token
         }
         return log_dict
+    except crud.DuplicateMealError as e:
+        response.status_code = 409
+        return DetailResponse(detail=str(e))
     except ValueError as e:
         response.status_code = 400
         return DetailResponse(detail=str(e))
@@ -116,6 +150,40 @@ def update_food_log(
         response.status_code = 500
         return DetailResponse(detail=f"An error occurred: {str(e)}")
 
+@router.post("/bulk-update", response_model=Union[FoodLogBulkUpdateResponse, DetailResponse])
+def bulk_update_food_logs(
+    response: Response,
+    updates: List[FoodLogUpdate],
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user),
+    access_token: Optional[str] = Depends(renew_access_token)
+):
+    """
+    Apply many food log updates at once, e.g. when reconciling paper lists.
+
+    Items are applied in order with the same rules as /update, in chunks of
+    FOOD_LOG_BULK_CHUNK_SIZE per transaction, and each gets its own status.
+    """
+    try:
+        results = crud.bulk_update_food_logs(db, updates)
+        items = [
+            FoodLogBulkItemResult(index=index, registration_id=str(update_data.registration_id),
+                                  status=item_status, detail=detail)
+            for index, (update_data, (item_status, detail)) in enumerate(zip(updates, results))
+        ]
+        statuses = [item.status for item in items]
+        return FoodLogBulkUpdateResponse(
+            results=items,
+            accepted=statuses.count(crud.BULK_ACCEPTED),
+            duplicates=statuses.count(crud.BULK_DUPLICATE),
+            errors=statuses.count(crud.BULK_ERROR),
+            access_token=access_token
+        )
+    except Exception as e:
+        logger.error(f"Error in bulk food log update: {str(e)}", exc_info=True)
+        response.status_code = 500
+        return DetailResponse(detail=f"An error occurred: {str(e)}")
+
 @router.delete("/{registration_id}/{date_str}", response_model=DetailResponse)
 def delete_food_log(
     registration_id: int,
@@ -137,11 +205,8 @@ def delete_food_log(
         # Convert date string to datetime
         search_date = datetime.strptime(date_str, "%Y-%m-%d").date()
         
-        # Find the food log entry
-        food_log = db.query(FoodLog).filter(
-            FoodLog.registration_id == registration_id,
-            func.date(FoodLog.date) == search_date
-        ).first()
+        # Find and delete the food log entry
+        food_log = crud.delete_food_log(db, registration_id, search_date)
         
         if not food_log:
             raise HTTPException(
@@ -149,10 +214,6 @@ def delete_food_log(
                 detail="Food log not found"
             )
         
-        # Delete the entry
-        db.delete(food_log)
-        db.commit()
-        
         return DetailResponse(detail="Food log deleted successfully")
         
     except ValueError as e:
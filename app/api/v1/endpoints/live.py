@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+import logging
+
+from app.db.session import get_db
+from app.models.user import User as UserModel
+from app.core.live_counters import live_counters
+from app.core.security import get_current_user
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+@router.get("/counters", response_class=StreamingResponse)
+def stream_counters(
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    Server-Sent Events stream of today's meals served (per meal) and error logs
+    (per error code) for the kitchen dashboard, instead of polling the search
+    endpoints.
+
+    Sends the current counts on connect, then at most one "counters" event per
+    LIVE_COUNTERS_INTERVAL_MS while they change, plus keepalive comments.
+    """
+    # The stream can stay open for hours; give back the connection used for auth first
+    db.close()
+    return StreamingResponse(
+        live_counters.subscribe(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -5,7 +5,7 @@ from datetime import datetime
 import logging
 
 from app.db.session import get_db
-from app.core.meal_timings import MealTimings
+from app.core.meal_timings import meal_timings
 from app.models.user import User as UserModel
 from app.core.security import get_current_user
 
@@ -23,22 +23,8 @@ async def get_meal_timings(
     Accepts both GET and POST methods.
     """
     try:
-        meal_timings = MealTimings()
-        
-        # Get timings for both meals
-        lunch_start, lunch_end = meal_timings.get_meal_timings('lunch')
-        dinner_start, dinner_end = meal_timings.get_meal_timings('dinner')
-        
-        return {
-            "lunch": {
-                "start_time": lunch_start.strftime("%I:%M %p"),
-                "end_time": lunch_end.strftime("%I:%M %p")
-            },
-            "dinner": {
-                "start_time": dinner_start.strftime("%I:%M %p"),
-                "end_time": dinner_end.strftime("%I:%M %p")
-            }
-        }
+        # Served from the compiled schedule; the YAML is only re-read when it changes
+        return meal_timings.get_timings_response()
     except Exception as e:
         logger.error(f"Error getting meal timings: {str(e)}", exc_info=True)
         raise HTTPException(
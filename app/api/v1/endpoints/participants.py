@@ -1,16 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, Response, Request
+from fastapi import APIRouter, Depends, File, HTTPException, Response, Request, UploadFile
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone, timedelta
 import logging
 from sqlalchemy import cast, Date, text, func, String, literal
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.models.participant import Participant
-from app.schemas.participant import ParticipantBase, ParticipantUpdate, ParticipantResponse, ParticipantListResponse, DetailResponse, ParticipantCreate
+from app.schemas.participant import ParticipantBase, ParticipantUpdate, ParticipantResponse, ParticipantListResponse, DetailResponse, ParticipantCreate, ParticipantImportResponse, RosterChangesResponse
 from app.crud import participant as crud
-from typing import Union
-from app.core.security import get_current_user, create_access_token
+from app.crud import participant_import
+from app.crud import roster_changes
+from typing import Union, Optional
+from app.core.security import get_current_user, renew_access_token
 from app.models.user import User as UserModel
 from app.core.config import settings
+from app.core.responses import fast_response
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -23,34 +26,72 @@ def get_participant_by_schedule(
     response: Response,
     registrationid: str,
     date: str,
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: UserModel = Depends(get_current_user),
+    access_token: Optional[str] = Depends(renew_access_token)
 ):
     """
     Get participant data by registration ID and date.
     """
     try:
-        participant = crud.get_participant_by_schedule(db, registrationid, date)
+        participant = crud.get_scheduled_participant(db, registrationid, date)
         if not participant:
             response.status_code = 200
             return DetailResponse(detail="No data found")
 
-        # Generate new token
-        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        new_token = create_access_token(
-            data={"sub": current_user.username}, expires_delta=access_token_expires
-        )
+        # Encoded directly in the ParticipantListResponse shape, without pydantic
+        return fast_response(response, {
+            "userid": participant.id,
+            "name": participant.participant_type,
+            "registration_id": participant.registrant_id,
+            "date": participant.date,
+            "detail": None,
+            "access_token": access_token
+        })
+    except Exception as e:
+        logger.error(f"Error getting participants: {str(e)}", exc_info=True)
+        response.status_code = 500
+        return DetailResponse(detail=f"An error occurred: {str(e)}")
 
-        return ParticipantListResponse(
-            userid=participant.id,
-            name=participant.participant_type,
-            registration_id=participant.registrant_id,
-            date=participant.date,
-            detail=None,
-            access_token=new_token
+@router.get("/changes", response_model=Union[RosterChangesResponse, DetailResponse])
+def get_roster_changes(
+    response: Response,
+    since: int = 0,
+    limit: int = 1000,
+    date: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user),
+    access_token: Optional[str] = Depends(renew_access_token)
+):
+    """
+    Roster change feed for scanners that validate badges locally.
+
+    Call with since=0 to download the roster, then with the returned
+    next_since to get only what changed: participants added or updated,
+    meals served, and deletions. Repeat straight away while has_more is true.
+    date (YYYY-MM-DD) limits the feed to one event day.
+    """
+    try:
+        day = datetime.strptime(date, "%Y-%m-%d").date() if date else None
+    except ValueError:
+        response.status_code = 400
+        return DetailResponse(detail="Invalid date format. Please use YYYY-MM-DD.")
+    if since < 0 or limit < 1:
+        response.status_code = 400
+        return DetailResponse(detail="since must be 0 or more and limit at least 1.")
+
+    try:
+        # Read on the primary: the horizon has to see the locks of the primary's open writers
+        changes = roster_changes.get_roster_changes(
+            db,
+            since,
+            roster_changes.change_horizon(db),
+            min(limit, settings.ROSTER_CHANGES_MAX_LIMIT),
+            day
         )
+        return fast_response(response, {**changes, "access_token": access_token})
     except Exception as e:
-        logger.error(f"Error getting participants: {str(e)}", exc_info=True)
+        logger.error(f"Error getting roster changes: {str(e)}", exc_info=True)
         response.status_code = 500
         return DetailResponse(detail=f"An error occurred: {str(e)}")
 
@@ -83,4 +124,42 @@ def create_participant(
         raise HTTPException(
             status_code=500,
             detail=f"An error occurred while creating participant: {str(e)}"
-        ) 
\ No newline at end of file
+        ) 
+
+@router.post("/import", response_model=Union[ParticipantImportResponse, DetailResponse])
+def import_participants(
+    response: Response,
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user),
+    access_token: Optional[str] = Depends(renew_access_token)
+):
+    """
+    Bulk import the participant roster from a CSV (header row) or NDJSON file.
+
+    Each row needs registrant_id, date and participant_type. Rows for a
+    registrant and event day already scheduled update it; others are added.
+    Invalid rows are listed in the response instead of failing the import.
+    The format is taken from the file extension unless given.
+    """
+    import_format = format or ("ndjson" if file.filename and file.filename.endswith((".ndjson", ".jsonl")) else "csv")
+    if import_format not in participant_import.IMPORT_FORMATS:
+        response.status_code = 400
+        return DetailResponse(detail=f"Unsupported format. Must be one of: {', '.join(participant_import.IMPORT_FORMATS)}")
+    try:
+        # Starlette spools large uploads to disk, and the import reads the file as COPY consumes it
+        report = participant_import.import_participants(db, file.file, import_format)
+        return ParticipantImportResponse(
+            rows_read=report.rows_read,
+            rows_valid=report.rows_valid,
+            inserted=report.inserted,
+            updated=report.updated,
+            error_count=report.error_count,
+            errors=report.errors,
+            access_token=access_token
+        )
+    except Exception as e:
+        logger.error(f"Error importing participants: {str(e)}", exc_info=True)
+        response.status_code = 500
+        return DetailResponse(detail=f"An error occurred: {str(e)}")
@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Union, Optional
+import logging
+
+from app.db.session import get_read_db
+from app.models.meal_rollup import BUCKET_MINUTES
+from app.models.user import User as UserModel
+from app.schemas.report import MealReportResponse, MealServedBucket, MealServedTotal
+from app.schemas.scan import DetailResponse
+from app.crud import report as crud
+from app.core.event_time import event_now
+from app.core.security import get_current_user, renew_access_token
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+@router.get("/meals", response_model=Union[MealReportResponse, DetailResponse])
+def get_meal_report(
+    response: Response,
+    date_str: Optional[str] = None,
+    meal: Optional[str] = None,
+    participant_type: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: UserModel = Depends(get_current_user),
+    access_token: Optional[str] = Depends(renew_access_token)
+):
+    """
+    Meals served so far on an event day (default today), by participant type
+    and 15-minute bucket, optionally for one meal or participant type.
+    """
+    try:
+        day = datetime.strptime(date_str, "%Y-%m-%d").date() if date_str else event_now().date()
+    except ValueError:
+        response.status_code = 400
+        return DetailResponse(detail="Invalid date format. Please use YYYY-MM-DD.")
+
+    try:
+        buckets = crud.get_meals_served(db, day, meal.strip().lower() if meal else None, participant_type)
+    except ValueError as e:
+        response.status_code = 400
+        return DetailResponse(detail=str(e))
+    except Exception as e:
+        logger.error(f"Error building meal report: {str(e)}", exc_info=True)
+        response.status_code = 500
+        return DetailResponse(detail=f"An error occurred: {str(e)}")
+
+    totals = crud.meal_totals(buckets)
+    return MealReportResponse(
+        event_day=day,
+        bucket_minutes=BUCKET_MINUTES,
+        served=sum(totals.values()),
+        totals=[MealServedTotal(meal=meal_name, participant_type=type_name, served=served)
+                for (meal_name, type_name), served in sorted(totals.items())],
+        buckets=[MealServedBucket.model_validate(bucket) for bucket in buckets],
+        access_token=access_token
+    )
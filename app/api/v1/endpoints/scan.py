@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Union, Optional
+import logging
+
+from app.db.session import get_db, get_async_db
+from app.models.user import User as UserModel
+from app.schemas.scan import ScanRequest, ScanResponse, DetailResponse
+from app.crud import scan as crud
+from app.core.security import get_current_user, get_current_user_async, renew_access_token
+from app.core.config import settings
+from app.core.responses import fast_response
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+def scan(
+    response: Response,
+    scan_in: ScanRequest,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user),
+    access_token: Optional[str] = Depends(renew_access_token)
+):
+    """
+    Validate and record a badge scan in one round trip.
+
+    Replaces the participants/search -> food-log/search -> food-log/update
+    (-> error-logs) sequence. A rejected scan is written to the error log
+    and returned with its error code; it is not an HTTP error.
+    """
+    try:
+        verdict = crud.process_scan(db, scan_in, current_user.id)
+        return fast_response(response, {**verdict.model_dump(), "access_token": access_token})
+    except Exception as e:
+        logger.error(f"Error processing scan: {str(e)}", exc_info=True)
+        db.rollback()
+        response.status_code = 500
+        return DetailResponse(detail=f"An error occurred: {str(e)}")
+
+async def scan_async(
+    response: Response,
+    scan_in: ScanRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user_async),
+    access_token: Optional[str] = Depends(renew_access_token)
+):
+    """
+    Validate and record a badge scan in one round trip.
+
+    Replaces the participants/search -> food-log/search -> food-log/update
+    (-> error-logs) sequence. A rejected scan is written to the error log
+    and returned with its error code; it is not an HTTP error.
+    """
+    try:
+        verdict = await crud.process_scan_async(db, scan_in, current_user.id)
+        return fast_response(response, {**verdict.model_dump(), "access_token": access_token})
+    except Exception as e:
+        logger.error(f"Error processing scan: {str(e)}", exc_info=True)
+        await db.rollback()
+        response.status_code = 500
+        return DetailResponse(detail=f"An error occurred: {str(e)}")
+
+# DB_ASYNC picks the asyncpg or psycopg2 implementation so the two can be load tested side by side
+router.add_api_route(
+    "/",
+    scan_async if settings.DB_ASYNC else scan,
+    methods=["POST"],
+    response_model=Union[ScanResponse, DetailResponse]
+)
@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.orm import Session
+from typing import Union, Optional
+import logging
+
+from app.db.session import get_db
+from app.models.user import User as UserModel
+from app.schemas.sync import ScanSyncRequest, ScanSyncResult, ScanSyncResponse
+from app.schemas.scan import DetailResponse
+from app.crud import sync as crud
+from app.core.security import get_current_user, renew_access_token
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+@router.post("/scans", response_model=Union[ScanSyncResponse, DetailResponse])
+def sync_scans(
+    response: Response,
+    sync_in: ScanSyncRequest,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user),
+    access_token: Optional[str] = Depends(renew_access_token)
+):
+    """
+    Upload scans queued by a scanner while it was offline.
+
+    Each event carries the device's own (device_id, seq); re-uploading an event
+    is reported as a duplicate and not applied again. Events are applied in
+    scan-time order with the same rules as /scan. Device seqs count up from 0
+    or 1; clients can drop every queued event up to their device's high-water
+    mark, which only covers seqs the server holds without a gap before them.
+    """
+    try:
+        results, high_water_marks = crud.sync_scans(db, sync_in.events, current_user.id)
+        items = [
+            ScanSyncResult(device_id=event.device_id, seq=event.seq, status=item_status,
+                           error_code=error_code, detail=detail)
+            for event, (item_status, error_code, detail) in zip(sync_in.events,
+                                                                crud.event_results(sync_in.events, results))
+        ]
+        return ScanSyncResponse(results=items, high_water_marks=high_water_marks, access_token=access_token)
+    except Exception as e:
+        logger.error(f"Error syncing scans: {str(e)}", exc_info=True)
+        db.rollback()
+        response.status_code = 500
+        return DetailResponse(detail=f"An error occurred: {str(e)}")
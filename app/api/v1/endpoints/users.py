@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-import bcrypt
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 import logging
 import os
@@ -8,12 +9,14 @@ from typing import Union, Optional
 from datetime import date, datetime, timedelta
 from sqlalchemy import func
 
-from app.db.session import get_db
+from app.db.session import get_db, get_async_db
 from app.schemas.user import User, UserCreate, UserUpdate
 from app.models.user import User as UserModel
 from app.schemas.food_log import FoodLogListResponse, DetailResponse
-from app.core.security import create_access_token, create_tokens, refresh_access_token
+from app.core.security import create_access_token, create_tokens, refresh_access_token, invalidate_cached_user, oauth2_scheme, revoke_token, get_token_payload
 from app.core.config import settings
+from app.crud import user as user_crud
+from app.core.passwords import hash_password, verify_password_async
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -32,6 +35,14 @@ class LoginResponse(BaseModel):
     token_type: str
     user: User
 
+# login is async, so its DB calls go through asyncpg (DB_ASYNC) or the threadpool, never the event loop
+get_login_db = get_async_db if settings.DB_ASYNC else get_db
+
+async def _run_db(db: Union[Session, AsyncSession], sync_fn, async_fn, *args):
+    if isinstance(db, AsyncSession):
+        return await async_fn(db, *args)
+    return await run_in_threadpool(sync_fn, db, *args)
+
 @router.post("/", response_model=User)
 def create_user(
     *,
@@ -47,18 +58,18 @@ def create_user(
         )
     
     # Hash the password
-    salt = bcrypt.gensalt()
-    hashed_password = bcrypt.hashpw(user_in.password.encode('utf-8'), salt)
+    hashed_password = hash_password(user_in.password)
     
     user = UserModel(
         username=user_in.username,
-        password=hashed_password.decode('utf-8'),  # Store the hashed password
+        password=hashed_password,  # Store the hashed password
         device_id=user_in.device_id,
         email=user_in.email
     )
     db.add(user)
     db.commit()
     db.refresh(user)
+    invalidate_cached_user(user.username)
     return user
 
 @router.get("/{user_id}", response_model=User)
@@ -92,7 +103,7 @@ def get_user_by_username(
 @router.post("/login", response_model=LoginResponse)
 async def login(
     request: Request,
-    db: Session = Depends(get_db)
+    db: Union[Session, AsyncSession] = Depends(get_login_db)
 ):
     """
     Login endpoint that accepts username, password, and device_id and returns JWT tokens.
@@ -115,7 +126,7 @@ async def login(
             )
         
         # Find user by username
-        user = db.query(UserModel).filter(UserModel.username == username).first()
+        user = await _run_db(db, user_crud.get_user_by_username, user_crud.get_user_by_username_async, username)
         if not user:
             logger.error(f"User not found: {username}")
             raise HTTPException(
@@ -124,7 +135,7 @@ async def login(
             )
         
         # Verify password
-        if not bcrypt.checkpw(password.encode('utf-8'), user.password.encode('utf-8')):
+        if not await verify_password_async(password, user.password):
             logger.error(f"Invalid password for user: {username}")
             raise HTTPException(
                 status_code=401,
@@ -149,8 +160,8 @@ async def login(
                 )
         else:
             # If user doesn't have a device_id, set it permanently
-            user.device_id = device_id
-            db.commit()
+            user = await _run_db(db, user_crud.set_device_id, user_crud.set_device_id_async, user, device_id)
+            invalidate_cached_user(user.username)
             logger.info(f"Set permanent device ID for user: {username}")
         
         # Create access and refresh tokens
@@ -172,6 +183,17 @@ async def login(
             detail="Internal server error"
         )
 
+@router.post("/logout", response_model=DetailResponse)
+async def logout(
+    token: str = Depends(oauth2_scheme),
+    payload: dict = Depends(get_token_payload)
+):
+    """
+    Revoke the caller's access token. The token must be valid; anything else is a 401.
+    """
+    revoke_token(token, payload)
+    return DetailResponse(detail="Logged out")
+
 @router.post("/refresh", response_model=dict)
 async def refresh_token(
     refresh_token: str,
@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+class TTLCache:
+    """
+    In-process, thread-safe LRU cache whose entries expire after a TTL.
+
+    Entries are evicted least-recently-used first once maxsize is reached.
+    Values of None are not cached, so get() returning None always means a miss.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value; ttl overrides the cache-wide TTL for this entry"""
+        if value is None or self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None
+            }
+
+class ExpiringSet:
+    """
+    In-process, thread-safe set whose members expire at their own TTL.
+
+    Unlike TTLCache there is no size cap and nothing is evicted early; expired
+    members are dropped in a sweep once the set has doubled since the last one.
+    """
+
+    def __init__(self, min_sweep_size: int = 1024):
+        self.min_sweep_size = min_sweep_size
+        self._expiries: Dict[Hashable, float] = {}
+        self._sweep_at = min_sweep_size
+        self._lock = threading.Lock()
+
+    def add(self, key: Hashable, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._expiries[key] = now + ttl
+            if len(self._expiries) >= self._sweep_at:
+                self._expiries = {member: expires_at for member, expires_at in self._expiries.items() if expires_at > now}
+                self._sweep_at = max(self.min_sweep_size, 2 * len(self._expiries))
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            expires_at = self._expiries.get(key)
+            return expires_at is not None and expires_at > time.monotonic()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._expiries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._expiries.clear()
+            self._sweep_at = self.min_sweep_size
@@ -11,6 +11,12 @@ class Settings(BaseSettings):
     
     # Database settings - explicitly mapped from DATABASE_URL in .env
     database_url: str = Field(alias="DATABASE_URL")
+    # Optional read replica for search and listing endpoints; unset sends everything to DATABASE_URL
+    database_read_url: Optional[str] = Field(default=None, alias="DATABASE_READ_URL")
+    # Reads of a registration written this recently by the same worker go to the primary (replica lag)
+    DB_READ_YOUR_WRITES_SECONDS: int = 10
+    # After a replica connection failure, use the primary for this long before trying again
+    DB_READ_RECHECK_SECONDS: int = 30
     
     # JWT settings
     SECRET_KEY: str = Field(default="your-secret-key-here", alias="JWT_SECRET_KEY")
@@ -18,6 +24,13 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15  # 15 minutes
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     REFRESH_TOKEN_SECRET_KEY: str = Field(default="your-refresh-secret-key-here", alias="JWT_REFRESH_SECRET_KEY")
+    # Access tokens are only renewed once they are this close to expiry
+    TOKEN_RENEWAL_WINDOW_MINUTES: int = 5
+    TOKEN_RENEWAL_BUCKET_SECONDS: int = 60
+    # Verified access token claims cached per worker
+    TOKEN_CACHE_MAX_SIZE: int = 4096
+    # Comma-separated usernames allowed on the /admin endpoints; empty means nobody
+    ADMIN_USERNAMES: str = ""
     
     # Frontend URLs for CORS (both HTTP and HTTPS)
     FRONTEND_URL: str = Field(default="http://localhost:3000", alias="FRONTEND_URL")
@@ -25,12 +38,66 @@ class Settings(BaseSettings):
     
     # Application settings
     port: Optional[int] = Field(8000, alias="PORT")
+
+    # IANA timezone of the event venue; event days and meal windows are local to it
+    EVENT_TIMEZONE: str = "Asia/Karachi"
+    # How often meal_timings.yml is checked for changes
+    MEAL_TIMINGS_RELOAD_SECONDS: int = 5
     
     # Azure specific settings
     AZURE_POSTGRES_SSL_MODE: str = "require"
     AZURE_POSTGRES_CONNECTION_TIMEOUT: int = 10
     AZURE_POSTGRES_POOL_SIZE: int = 20
     AZURE_POSTGRES_MAX_OVERFLOW: int = 30
+    # Seconds to wait for a pooled connection, connection lifetime, and liveness check on checkout
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # Serve the scan path (scan, auth, login) from the asyncpg engine instead of psycopg2
+    DB_ASYNC: bool = False
+
+    # Authenticated user cache used by get_current_user
+    USER_CACHE_TTL_SECONDS: int = 300
+    USER_CACHE_MAX_SIZE: int = 1024
+
+    # bcrypt work is CPU bound; keep it to a few threads per worker
+    PASSWORD_HASH_WORKERS: int = 2
+    LOGIN_CONCURRENCY_LIMIT: int = 2
+    LOGIN_MAX_QUEUE_DEPTH: int = 100
+
+    # Items per multi-row upsert and transaction in /food-log/bulk-update
+    FOOD_LOG_BULK_CHUNK_SIZE: int = 500
+    # Events per transaction in /sync/scans
+    SCAN_SYNC_CHUNK_SIZE: int = 500
+
+    # Write-behind buffer for POST /error-logs/: queued rows, rows per INSERT, flush interval
+    ERROR_LOG_BUFFER_SIZE: int = 10000
+    ERROR_LOG_FLUSH_ROWS: int = 500
+    ERROR_LOG_FLUSH_MS: int = 250
+    # Flushes a failed batch is retried on (one per interval) before its rows are dropped
+    ERROR_LOG_FLUSH_RETRIES: int = 40
+
+    # Rows fetched per server-side cursor round trip in /food-log/export and /error-logs/export
+    EXPORT_CHUNK_ROWS: int = 5000
+    # Exports streaming at once per worker; each holds one connection (counted against max_connections
+    # along with the pools above) and further ones get a 429
+    EXPORT_MAX_CONCURRENT: int = 2
+
+    # Live dashboard counters: at most one push per interval, and a full recount from the database this often
+    LIVE_COUNTERS_INTERVAL_MS: int = 1000
+    LIVE_COUNTERS_RESEED_SECONDS: int = 60
+
+    # Most changes returned per /participants/changes page
+    ROSTER_CHANGES_MAX_LIMIT: int = 5000
+
+    # Validation errors listed in a participant import report (all are counted)
+    PARTICIPANT_IMPORT_MAX_ERRORS: int = 1000
+
+    # In-memory participant roster for the current event day. Each worker reloads it this often,
+    # which is also how long other workers may serve a participant edited through this one
+    ROSTER_CACHE_ENABLED: bool = True
+    ROSTER_CACHE_REFRESH_SECONDS: int = 60
 
     @property
     def get_database_url(self) -> str:
@@ -44,4 +111,9 @@ class Settings(BaseSettings):
             origins.append(self.FRONTEND_URL_HTTPS)
         return origins
 
+    @property
+    def get_admin_usernames(self) -> frozenset[str]:
+        """Usernames allowed on the /admin endpoints"""
+        return frozenset(name.strip() for name in self.ADMIN_USERNAMES.split(",") if name.strip())
+
 settings = Settings() 
\ No newline at end of file
@@ -0,0 +1,18 @@
+# Error codes recorded in fnb.error_logs and returned to scanner clients
+ERROR_CODES = {
+    "01": "Invalid registration ID",
+    "02": "Meal time expired",
+    "03": "Duplicate meal entry",
+    "04": "Invalid meal type",
+    "05": "User not authorized",
+    "06": "System error",
+    "07": "Invalid date format",
+    "08": "Database connection error",
+    "09": "Invalid request format",
+    "10": "Resource not found"
+}
+
+INVALID_REGISTRATION_ID = "01"
+MEAL_TIME_EXPIRED = "02"
+DUPLICATE_MEAL_ENTRY = "03"
+INVALID_MEAL_TYPE = "04"
@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app.core.config import settings
+from app.core.event_time import event_day
+from app.core.live_counters import publish_on_commit
+from app.db.session import SessionLocal
+from app.models.error_log import ErrorLog
+from app.schemas.error_log import ErrorLogCreate
+
+logger = logging.getLogger(__name__)
+
+def _error_log_row(error_log: ErrorLogCreate) -> Dict[str, Any]:
+    return {
+        "user_id": error_log.user_id,
+        "registrant_id": str(error_log.registrant_id),
+        "scan_time": error_log.scan_time,
+        "error": error_log.error,
+        "error_code": error_log.error_code
+    }
+
+class ErrorLogBuffer:
+    """
+    Bounded in-process queue of client error logs, written behind with
+    multi-row inserts every flush_ms or once flush_rows are waiting.
+
+    Error logs are diagnostics: when the queue is full new ones are dropped
+    (and counted) rather than letting them compete with scans for connections.
+    Queued rows are lost if the process dies before a flush.
+
+    A batch the database rejects (a constraint violation, a value too long) is
+    split in halves until the offending rows are found and dropped. A batch
+    that fails otherwise, say while the database is unreachable, is retried
+    first on each flush, max_retries times, and then dropped, so one bad
+    batch cannot hold up the rows queued behind it for good.
+    """
+
+    def __init__(self, maxsize: int, flush_rows: int, flush_ms: int, session_factory=SessionLocal,
+                 max_retries: int = settings.ERROR_LOG_FLUSH_RETRIES):
+        self.maxsize = maxsize
+        self.flush_rows = flush_rows
+        self.flush_ms = flush_ms
+        self.max_retries = max_retries
+        self._session_factory = session_factory
+        self._queue: deque = deque()
+        # A failed batch waiting to be retried, and how many times it has failed
+        self._retry: Optional[Tuple[List[Dict[str, Any]], int]] = None
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self.enqueued = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.written = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self.last_flush_ms: Optional[float] = None
+
+    def put(self, error_logs: List[ErrorLogCreate]) -> int:
+        """Queue error logs in order; returns how many were accepted before the queue filled"""
+        with self._lock:
+            accepted = max(min(len(error_logs), self.maxsize - self._depth()), 0)
+            self._queue.extend(_error_log_row(error_log) for error_log in error_logs[:accepted])
+            self.enqueued += accepted
+            self.dropped += len(error_logs) - accepted
+            depth = self._depth()
+        if depth >= self.flush_rows and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+        return accepted
+
+    def _depth(self) -> int:
+        return len(self._queue) + (len(self._retry[0]) if self._retry is not None else 0)
+
+    def _take(self) -> Tuple[List[Dict[str, Any]], int]:
+        # The batch being retried goes first, so rows are written in the order they came
+        with self._lock:
+            if self._retry is not None:
+                batch, self._retry = self._retry, None
+                return batch
+            return [self._queue.popleft() for _ in range(min(self.flush_rows, len(self._queue)))], 0
+
+    def _requeue(self, rows: List[Dict[str, Any]], failures: int) -> None:
+        # Keep a failed batch for the next flush, or drop it once it has used up its retries
+        with self._lock:
+            if failures <= self.max_retries:
+                self._retry = (rows, failures)
+                return
+            self.dropped += len(rows)
+        logger.error(f"Dropped {len(rows)} error logs after {failures} failed flushes")
+
+    def _write(self, rows: List[Dict[str, Any]]) -> int:
+        """Insert rows in one transaction; rows the database rejects are bisected out and dropped"""
+        started = time.perf_counter()
+        db = self._session_factory()
+        try:
+            db.execute(insert(ErrorLog), rows)
+            publish_on_commit(db, errors=[(event_day(row["scan_time"]), row["error_code"]) for row in rows])
+            db.commit()
+        except (IntegrityError, DataError) as e:
+            db.rollback()
+            if len(rows) == 1:
+                logger.error(f"Dropped error log rejected by the database: {rows[0]}: {str(e)}")
+                with self._lock:
+                    self.rejected += 1
+                    self.dropped += 1
+                return 0
+            middle = len(rows) // 2
+            return self._write(rows[:middle]) + self._write(rows[middle:])
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        with self._lock:
+            self.written += len(rows)
+            self.flushes += 1
+            self.last_flush_ms = round((time.perf_counter() - started) * 1000, 3)
+        return len(rows)
+
+    def flush(self) -> int:
+        """Write everything queued, flush_rows per INSERT; returns rows written"""
+        written = 0
+        while True:
+            rows, failures = self._take()
+            if not rows:
+                return written
+            try:
+                written += self._write(rows)
+            except Exception as e:
+                logger.error(f"Error flushing {len(rows)} error logs: {str(e)}", exc_info=True)
+                self._requeue(rows, failures + 1)
+                with self._lock:
+                    self.flush_errors += 1
+                return written
+
+    async def run(self) -> None:
+        """Flush every flush_ms, or sooner when flush_rows are waiting"""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_ms / 1000)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await run_in_threadpool(self.flush)
+            except Exception as e:
+                logger.error(f"Error in error log flusher: {str(e)}", exc_info=True)
+
+    async def stop(self) -> None:
+        """Final flush on shutdown, after the flusher task is cancelled"""
+        self._loop = None
+        await run_in_threadpool(self.flush)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "depth": self._depth(),
+                "maxsize": self.maxsize,
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "dropped": self.dropped,
+                "rejected": self.rejected,
+                "flushes": self.flushes,
+                "flush_errors": self.flush_errors,
+                "last_flush_ms": self.last_flush_ms
+            }
+
+error_log_buffer = ErrorLogBuffer(
+    settings.ERROR_LOG_BUFFER_SIZE,
+    settings.ERROR_LOG_FLUSH_ROWS,
+    settings.ERROR_LOG_FLUSH_MS
+)
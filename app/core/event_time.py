@@ -0,0 +1,29 @@
+from datetime import date, datetime, time
+from typing import Union
+from zoneinfo import ZoneInfo
+from app.core.config import settings
+
+# Timezone the event runs in; meal windows and event days are all local to it
+EVENT_TZ = ZoneInfo(settings.EVENT_TIMEZONE)
+
+def to_event_time(value: datetime) -> datetime:
+    """
+    Convert a datetime to event-local time.
+    Naive datetimes are taken to already be event-local wall-clock times.
+    """
+    if value.tzinfo is None:
+        return value.replace(tzinfo=EVENT_TZ)
+    return value.astimezone(EVENT_TZ)
+
+def event_day(value: Union[datetime, date]) -> date:
+    """Get the event day a datetime falls on; dates are returned unchanged"""
+    if isinstance(value, datetime):
+        return to_event_time(value).date()
+    return value
+
+def event_now() -> datetime:
+    return datetime.now(EVENT_TZ)
+
+def event_day_start(day: date) -> datetime:
+    """Midnight at the start of an event day, in the event timezone"""
+    return datetime.combine(day, time.min, tzinfo=EVENT_TZ)
@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import AsyncIterator, Dict, Iterable, Optional, Tuple
+
+import orjson
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.event_time import event_day_start, event_now
+from app.db.session import SessionLocal
+from app.models.error_log import ErrorLog
+from app.models.meal_rollup import MealServedRollup
+from app.models.special_meal_log import SpecialMealLog
+
+logger = logging.getLogger(__name__)
+
+# Sent to idle subscribers so proxies do not close the stream
+KEEPALIVE = b": keepalive\n\n"
+
+class LiveCounters:
+    """
+    Meals served and error logs per event day, pushed to dashboards over SSE.
+
+    Writers publish through the session (publish_on_commit), so only committed
+    rows are counted. Publishing just bumps a counter and a version under a
+    lock; once per interval the broadcaster wakes every subscriber if the
+    version moved, and they all send the same cached payload. A burst of scans
+    is one push per interval, and a hundred dashboards cost one encode.
+
+    Counts are per worker process, so they are reseeded from the database
+    (meal_served_rollup, special_meal_logs and error_logs) every
+    reseed_seconds; that also picks up writes made by other workers, and
+    deletions, which are not published.
+    """
+
+    def __init__(self, interval_ms: int, reseed_seconds: int, session_factory=SessionLocal):
+        self.interval_ms = interval_ms
+        self.reseed_seconds = reseed_seconds
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        self._day: date = event_now().date()
+        self._served: Dict[str, int] = defaultdict(int)
+        self._errors: Dict[str, int] = defaultdict(int)
+        self.version = 0
+        self._payload: Optional[Tuple[int, bytes]] = None
+        self._changed: Optional[asyncio.Event] = None
+        self._broadcast_version = 0
+        self._last_reseed = 0.0
+        self.subscribers = 0
+        self.broadcasts = 0
+        self.reseeds = 0
+
+    def _roll_over(self, day: date) -> bool:
+        # Counts are for the current event day; a later day starts from zero
+        if day > self._day:
+            self._day = day
+            self._served.clear()
+            self._errors.clear()
+        return day == self._day
+
+    def record(self, meals: Iterable[Tuple[date, str]] = (), errors: Iterable[Tuple[date, str]] = ()) -> None:
+        """Count committed meals and error logs as (event_day, meal) and (event_day, error_code)"""
+        with self._lock:
+            changed = False
+            for day, meal in meals:
+                if self._roll_over(day):
+                    self._served[meal] += 1
+                    changed = True
+            for day, error_code in errors:
+                if self._roll_over(day):
+                    self._errors[error_code] += 1
+                    changed = True
+            if changed:
+                self.version += 1
+
+    def snapshot(self) -> Tuple[int, bytes]:
+        """Current version and its SSE message, encoded once per version"""
+        with self._lock:
+            if self._payload is None or self._payload[0] != self.version:
+                data = orjson.dumps({
+                    "event_day": self._day,
+                    "served": dict(self._served),
+                    "errors": dict(self._errors)
+                })
+                self._payload = (self.version, b"id: %d\nevent: counters\ndata: %s\n\n" % (self.version, data))
+            return self._payload
+
+    def reseed(self) -> None:
+        """Replace the counts for today with what the database has"""
+        day = event_now().date()
+        db = self._session_factory()
+        try:
+            served = db.execute(
+                select(MealServedRollup.meal, func.sum(MealServedRollup.served))
+                .where(MealServedRollup.event_day == day)
+                .group_by(MealServedRollup.meal)
+            ).all()
+            special = db.execute(
+                select(SpecialMealLog.meal, func.count())
+                .where(SpecialMealLog.event_day == day)
+                .group_by(SpecialMealLog.meal)
+            ).all()
+            errors = db.execute(
+                select(ErrorLog.error_code, func.count())
+                .where(ErrorLog.scan_time >= event_day_start(day),
+                       ErrorLog.scan_time < event_day_start(day + timedelta(days=1)))
+                .group_by(ErrorLog.error_code)
+            ).all()
+        finally:
+            db.close()
+        with self._lock:
+            self._roll_over(day)
+            if day != self._day:
+                return
+            new_served = {meal: int(count) for meal, count in served + special if count}
+            new_errors = {error_code: count for error_code, count in errors}
+            if new_served != dict(self._served) or new_errors != dict(self._errors):
+                self._served = defaultdict(int, new_served)
+                self._errors = defaultdict(int, new_errors)
+                self.version += 1
+            self.reseeds += 1
+
+    async def run(self) -> None:
+        """Broadcast every interval_ms if anything changed, reseeding every reseed_seconds"""
+        self._changed = asyncio.Event()
+        while True:
+            await asyncio.sleep(self.interval_ms / 1000)
+            try:
+                if time.monotonic() - self._last_reseed >= self.reseed_seconds:
+                    self._last_reseed = time.monotonic()
+                    await run_in_threadpool(self.reseed)
+            except Exception as e:
+                logger.error(f"Error reseeding live counters: {str(e)}", exc_info=True)
+            if self.version != self._broadcast_version:
+                self._broadcast_version = self.version
+                self.broadcasts += 1
+                # Wake everyone waiting on the old event; later waits use the new one
+                changed, self._changed = self._changed, asyncio.Event()
+                changed.set()
+
+    async def subscribe(self, keepalive_seconds: float = 15) -> AsyncIterator[bytes]:
+        """SSE messages for one subscriber: the current counts, then one per broadcast that changed them"""
+        self.subscribers += 1
+        try:
+            sent, payload = self.snapshot()
+            yield payload
+            while True:
+                changed = self._changed
+                if changed is None:
+                    await asyncio.sleep(keepalive_seconds)
+                    yield KEEPALIVE
+                    continue
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield KEEPALIVE
+                    continue
+                version, payload = self.snapshot()
+                if version != sent:
+                    sent = version
+                    yield payload
+        finally:
+            self.subscribers -= 1
+
+    def stats(self) -> Dict:
+        return {
+            "event_day": self._day.isoformat(),
+            "version": self.version,
+            "subscribers": self.subscribers,
+            "broadcasts": self.broadcasts,
+            "reseeds": self.reseeds
+        }
+
+live_counters = LiveCounters(settings.LIVE_COUNTERS_INTERVAL_MS, settings.LIVE_COUNTERS_RESEED_SECONDS)
+
+_PENDING = "live_counters_pending"
+
+def publish_on_commit(db: Session, meals: Iterable[Tuple[date, str]] = (),
+                      errors: Iterable[Tuple[date, str]] = ()) -> None:
+    """Count these meals and error logs once db's transaction commits; dropped on rollback"""
+    meals_pending, errors_pending = db.info.setdefault(_PENDING, ([], []))
+    meals_pending.extend(meals)
+    errors_pending.extend(errors)
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(db: Session) -> None:
+    pending = db.info.pop(_PENDING, None)
+    if pending is not None:
+        live_counters.record(*pending)
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending(db: Session) -> None:
+    db.info.pop(_PENDING, None)
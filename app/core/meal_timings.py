@@ -1,35 +1,114 @@
 from datetime import datetime, time
+from time import monotonic
 from typing import Dict, Optional, Tuple
+import logging
+import threading
 import yaml
 import os
 from pathlib import Path
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+REGULAR_MEALS = ('lunch', 'dinner')
+
+def _minutes(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+class MealWindow:
+    """A meal's service hours, parsed once from the YAML config"""
+
+    __slots__ = ('meal_type', 'name', 'description', 'start_time', 'end_time', 'start_minutes', 'end_minutes')
+
+    def __init__(self, meal_type: str, config: Dict):
+        self.meal_type = meal_type
+        self.name = config['name']
+        self.description = config['description']
+        self.start_time = datetime.strptime(config['start_time'], "%H:%M").time()
+        self.end_time = datetime.strptime(config['end_time'], "%H:%M").time()
+        self.start_minutes = _minutes(self.start_time)
+        self.end_minutes = _minutes(self.end_time)
 
 class MealTimings:
-    def __init__(self):
-        self.config = self._load_config()
-        
+    """
+    Meal service hours from meal_timings.yml, compiled into minute-of-day windows.
+
+    The file is parsed once and re-parsed only when its mtime changes; the mtime
+    itself is checked at most every MEAL_TIMINGS_RELOAD_SECONDS.
+    """
+
+    def __init__(self, config_path: Optional[Path] = None):
+        self.config_path = config_path or Path(__file__).parent / "meal_timings.yml"
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._compile(self._load_config())
+
     def _load_config(self) -> Dict:
         """Load meal timing configurations from YAML file"""
-        config_path = Path(__file__).parent / "meal_timings.yml"
         try:
-            with open(config_path, 'r') as file:
+            self._mtime = os.stat(self.config_path).st_mtime
+            with open(self.config_path, 'r') as file:
                 return yaml.safe_load(file)
         except Exception as e:
             raise Exception(f"Error loading meal timings configuration: {str(e)}")
 
-    def _parse_time(self, time_str: str) -> time:
-        """Convert time string to datetime.time object"""
-        return datetime.strptime(time_str, "%H:%M").time()
+    def _compile(self, config: Dict) -> None:
+        meals = {meal_type: MealWindow(meal_type, config[meal_type]) for meal_type in REGULAR_MEALS}
+        for meal_type, meal_config in (config.get('special_meals') or {}).items():
+            if meal_config.get('is_active'):
+                meals[meal_type] = MealWindow(meal_type, meal_config)
+
+        # Swap everything in at once so readers never see a half-loaded config
+        self.config = config
+        self._meals = meals
+        self._early_threshold = config['meal_window']['early_threshold']
+        self._late_threshold = config['meal_window']['late_threshold']
+        self._response = {
+            meal_type: {
+                "start_time": window.start_time.strftime("%I:%M %p"),
+                "end_time": window.end_time.strftime("%I:%M %p")
+            }
+            for meal_type, window in meals.items()
+        }
+
+    def _reload_if_changed(self) -> None:
+        now = monotonic()
+        if now - self._checked_at < settings.MEAL_TIMINGS_RELOAD_SECONDS:
+            return
+        with self._lock:
+            if now - self._checked_at < settings.MEAL_TIMINGS_RELOAD_SECONDS:
+                return
+            self._checked_at = now
+            try:
+                if os.stat(self.config_path).st_mtime != self._mtime:
+                    self._compile(self._load_config())
+                    logger.info("Reloaded meal timings configuration")
+            except Exception as e:
+                # Keep serving the last good schedule
+                logger.error(f"Error reloading meal timings: {str(e)}", exc_info=True)
+
+    def _window(self, meal_type: str) -> MealWindow:
+        self._reload_if_changed()
+        window = self._meals.get(meal_type)
+        if window is None:
+            raise ValueError(f"Invalid meal type: {meal_type}")
+        return window
+
+    def is_served(self, meal_type: str) -> bool:
+        """Whether meal_type is lunch, dinner or a special meal that is currently active"""
+        self._reload_if_changed()
+        return meal_type in self._meals
 
     def get_meal_timings(self, meal_type: str) -> Tuple[time, time]:
         """Get start and end time for a specific meal type"""
-        if meal_type not in ['lunch', 'dinner']:
-            raise ValueError(f"Invalid meal type: {meal_type}")
-        
-        meal_config = self.config[meal_type]
-        start_time = self._parse_time(meal_config['start_time'])
-        end_time = self._parse_time(meal_config['end_time'])
-        return start_time, end_time
+        window = self._window(meal_type)
+        return window.start_time, window.end_time
+
+    def get_timings_response(self) -> Dict:
+        """Start and end times of every served meal, formatted for the meal-timings endpoint"""
+        self._reload_if_changed()
+        return self._response
 
     def is_meal_time_valid(self, meal_type: str, current_time: Optional[datetime] = None) -> bool:
         """
@@ -45,11 +124,9 @@ class MealTimings:
         if current_time is None:
             current_time = datetime.now()
         
-        start_time, end_time = self.get_meal_timings(meal_type)
-        current_time_only = current_time.time()
-        
+        window = self._window(meal_type)
         # Check if current time is within meal service hours
-        return start_time <= current_time_only <= end_time
+        return window.start_time <= current_time.time() <= window.end_time
 
     def is_meal_late(self, meal_type: str, scan_time: datetime) -> bool:
         """
@@ -62,15 +139,8 @@ class MealTimings:
         Returns:
             bool: True if the meal scan is considered late
         """
-        _, end_time = self.get_meal_timings(meal_type)
-        scan_time_only = scan_time.time()
-        
-        # Convert times to minutes for easier comparison
-        end_minutes = end_time.hour * 60 + end_time.minute
-        scan_minutes = scan_time_only.hour * 60 + scan_time_only.minute
-        
-        late_threshold = self.config['meal_window']['late_threshold']
-        return scan_minutes > (end_minutes + late_threshold)
+        window = self._window(meal_type)
+        return _minutes(scan_time) > (window.end_minutes + self._late_threshold)
 
     def is_meal_early(self, meal_type: str, scan_time: datetime) -> bool:
         """
@@ -83,23 +153,16 @@ class MealTimings:
         Returns:
             bool: True if the meal scan is too early
         """
-        start_time, _ = self.get_meal_timings(meal_type)
-        scan_time_only = scan_time.time()
-        
-        # Convert times to minutes for easier comparison
-        start_minutes = start_time.hour * 60 + start_time.minute
-        scan_minutes = scan_time_only.hour * 60 + scan_time_only.minute
-        
-        early_threshold = self.config['meal_window']['early_threshold']
-        return scan_minutes < (start_minutes - early_threshold)
+        window = self._window(meal_type)
+        return _minutes(scan_time) < (window.start_minutes - self._early_threshold)
 
     def get_meal_name(self, meal_type: str) -> str:
         """Get the display name for a meal type"""
-        return self.config[meal_type]['name']
+        return self._window(meal_type).name
 
     def get_meal_description(self, meal_type: str) -> str:
         """Get the description for a meal type"""
-        return self.config[meal_type]['description']
+        return self._window(meal_type).description
 
 # Create a singleton instance
-meal_timings = MealTimings() 
\ No newline at end of file
+meal_timings = MealTimings()
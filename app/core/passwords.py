@@ -0,0 +1,74 @@
+import asyncio
+import bcrypt
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+from fastapi import HTTPException, status
+from app.core.config import settings
+
+# bcrypt releases the GIL, so a small dedicated pool keeps hashing off the event loop
+# without taking threads from the pool Starlette uses for sync endpoints
+_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_login_slots = asyncio.Semaphore(settings.LOGIN_CONCURRENCY_LIMIT)
+
+class LoginMetrics:
+    """Counters for password verification on the login path"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency_limit": settings.LOGIN_CONCURRENCY_LIMIT,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "max_queue_depth": self.max_waiting,
+            "completed": self.completed,
+            "rejected": self.rejected
+        }
+
+login_metrics = LoginMetrics()
+
+def _checkpw(password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+def _hashpw(password: str) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+def hash_password(password: str) -> str:
+    """Hash a password on the bcrypt pool; for sync endpoints running in the threadpool"""
+    return _executor.submit(_hashpw, password).result()
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    """
+    Check a password on the bcrypt pool without blocking the event loop.
+
+    At most LOGIN_CONCURRENCY_LIMIT checks run at once; callers beyond that wait
+    in line, and once LOGIN_MAX_QUEUE_DEPTH are waiting new logins get a 503.
+    """
+    # Only touched from the event loop thread, so the counters need no lock
+    if login_metrics.waiting >= settings.LOGIN_MAX_QUEUE_DEPTH:
+        login_metrics.rejected += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts in progress, please retry"
+        )
+
+    login_metrics.waiting += 1
+    login_metrics.max_waiting = max(login_metrics.max_waiting, login_metrics.waiting)
+    try:
+        await _login_slots.acquire()
+    finally:
+        login_metrics.waiting -= 1
+
+    login_metrics.in_flight += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, _checkpw, password, hashed_password)
+    finally:
+        login_metrics.in_flight -= 1
+        login_metrics.completed += 1
+        _login_slots.release()
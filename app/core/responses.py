@@ -0,0 +1,55 @@
+from typing import Any, Dict, Iterator, Type
+
+import orjson
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+# Headers the JSON response sets itself; everything else on the injected Response is carried over
+_OWN_HEADERS = (b"content-length", b"content-type")
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+class ORJSONResponse(Response):
+    """
+    JSON response encoded with orjson. UTC datetimes end in "Z", as pydantic
+    writes them, so clients see the same payload as before.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+
+def row_dict(row: Any, model: Type[BaseModel]) -> Dict[str, Any]:
+    """The attributes of an ORM row that a response model exposes, without validating them"""
+    return {name: getattr(row, name) for name in model.model_fields}
+
+def fast_response(response: Response, content: Dict[str, Any]) -> ORJSONResponse:
+    """
+    Encode trusted content straight to JSON for the hot endpoints.
+
+    Returning a Response skips FastAPI's response_model validation and
+    serialization (the route's response_model still documents the shape), so
+    content must already match it: build it from ORM rows we wrote ourselves,
+    not from client input. The status code and headers set on the endpoint's
+    injected Response, such as X-Access-Token, are kept.
+    """
+    fast = ORJSONResponse(content, status_code=response.status_code or 200)
+    _copy_headers(response, fast)
+    return fast
+
+def _copy_headers(source: Response, target: Response) -> None:
+    target.raw_headers.extend(
+        (name, value) for name, value in source.raw_headers if name not in _OWN_HEADERS
+    )
+
+def download_response(response: Response, chunks: Iterator[bytes], media_type: str,
+                      filename: str) -> StreamingResponse:
+    """Stream chunks as a file download, keeping the headers set on the injected Response"""
+    download = StreamingResponse(chunks, media_type=media_type,
+                                 headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+    _copy_headers(response, download)
+    return download
@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Dict, NamedTuple, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.event_time import event_now
+from app.db.session import SessionLocal
+from app.models.participant import Participant
+
+logger = logging.getLogger(__name__)
+
+class RosterEntry(NamedTuple):
+    """Read-only participant row; has the same attribute names as the Participant model"""
+    id: int
+    registrant_id: str
+    date: Optional[datetime]
+    event_day: Optional[date]
+    participant_type: Optional[str]
+
+class RosterCache:
+    """
+    The participant roster for one event day, held in memory.
+
+    The roster is fixed before doors open, so scans look participants up in a
+    dict keyed by registration ID instead of querying fnb.participants. Callers
+    fall back to the database on a miss or for any other day.
+
+    Writes invalidate entries in the worker that made them; other workers keep
+    serving their copy until their next reload, up to
+    ROSTER_CACHE_REFRESH_SECONDS later. Every invalidation bumps a generation,
+    and a load that overlapped one is discarded rather than installed, since
+    its rows may predate the write.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._day: Optional[date] = None
+        self._entries: Dict[str, RosterEntry] = {}
+        self._generation = 0
+        self.loaded_at: Optional[datetime] = None
+        self.load_seconds: Optional[float] = None
+        self.memory_bytes = 0
+        self.loads = 0
+        self.discarded_loads = 0
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, db: Session, day: date) -> int:
+        """
+        Bulk-load every participant entry for an event day, replacing the current
+        roster. Returns the number of entries, or 0 if an invalidation came in
+        while loading and the roster was left as it was.
+        """
+        started = time.perf_counter()
+        with self._lock:
+            generation = self._generation
+        rows = db.execute(
+            select(
+                Participant.id,
+                Participant.registrant_id,
+                Participant.date,
+                Participant.event_day,
+                Participant.participant_type
+            ).where(Participant.event_day == day).order_by(Participant.id)
+        ).all()
+
+        entries: Dict[str, RosterEntry] = {}
+        for row in rows:
+            # Keep the first entry per registration ID, as the DB lookup does
+            entries.setdefault(row.registrant_id, RosterEntry(*row))
+
+        with self._lock:
+            if self._generation != generation:
+                self.discarded_loads += 1
+                logger.info(f"Discarded the roster load for {day}: participants changed while loading")
+                return 0
+            self._day = day
+            self._entries = entries
+            self.loaded_at = event_now()
+            self.load_seconds = round(time.perf_counter() - started, 4)
+            self.memory_bytes = _footprint(entries)
+            self.loads += 1
+
+        logger.info(f"Loaded {len(entries)} participants for {day} in {self.load_seconds}s")
+        return len(entries)
+
+    def get(self, registration_id: str, day: date) -> Optional[RosterEntry]:
+        with self._lock:
+            entry = self._entries.get(registration_id) if day == self._day else None
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return entry
+
+    def invalidate(self, registration_id: Optional[str] = None) -> None:
+        """Forget one registration ID (so lookups go to the DB) or, with no ID, the whole roster"""
+        with self._lock:
+            self._generation += 1
+            if registration_id is None:
+                self._day = None
+                self._entries = {}
+            else:
+                self._entries.pop(registration_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "day": self._day,
+                "entries": len(self._entries),
+                "loaded_at": self.loaded_at,
+                "load_seconds": self.load_seconds,
+                "memory_bytes": self.memory_bytes,
+                "loads": self.loads,
+                "discarded_loads": self.discarded_loads,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+def _footprint(entries: Dict[str, RosterEntry]) -> int:
+    """Approximate bytes held by the roster dict, its keys and entries"""
+    size = sys.getsizeof(entries)
+    for key, entry in entries.items():
+        size += sys.getsizeof(key) + sys.getsizeof(entry)
+        size += sum(sys.getsizeof(value) for value in entry if value is not None)
+    return size
+
+roster_cache = RosterCache()
+
+def refresh_roster() -> None:
+    """Load today's roster in a session of its own"""
+    db = SessionLocal()
+    try:
+        roster_cache.load(db, event_now().date())
+    finally:
+        db.close()
+
+async def run_roster_refresher() -> None:
+    """Reload the roster at startup and then every ROSTER_CACHE_REFRESH_SECONDS"""
+    while True:
+        try:
+            await run_in_threadpool(refresh_roster)
+        except Exception as e:
+            logger.error(f"Error loading participant roster: {str(e)}", exc_info=True)
+        await asyncio.sleep(settings.ROSTER_CACHE_REFRESH_SECONDS)
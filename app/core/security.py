@@ -1,13 +1,18 @@
 from datetime import datetime, timedelta
 from typing import Optional, Tuple
-from fastapi import Depends, HTTPException, status
+import hashlib
+import time
+from fastapi import Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
-from app.db.session import get_db
+from app.db.session import get_db, get_async_db
 from app.models.user import User
+from app.crud import user as user_crud
+from app.core.cache import ExpiringSet, TTLCache
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -15,6 +20,22 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/users/login")
 
+# Scanner accounts rarely change, so authenticated users are served from memory for a short TTL
+user_cache = TTLCache(maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+# Verified token claims keyed by token digest; each entry expires with its token
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_MAX_SIZE, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+# Digests of revoked tokens, kept until the token would have expired anyway. Not an LRU: only
+# verified tokens are added, so its size is bounded by the tokens issued within one token lifetime,
+# and a burst of logouts cannot evict a revocation that is still needed
+revoked_tokens = ExpiringSet()
+
+# Renewed access tokens are returned in this response header
+ACCESS_TOKEN_HEADER = "X-Access-Token"
+
+# One renewed token per user per bucket, so a burst of requests near expiry signs once
+renewed_token_cache = TTLCache(maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.TOKEN_RENEWAL_BUCKET_SECONDS)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -44,28 +65,126 @@ def create_tokens(data: dict) -> Tuple[str, str]:
     refresh_token = create_refresh_token(data)
     return access_token, refresh_token
 
-async def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+def _decode_access_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         if payload.get("type") != "access":
-            raise credentials_exception
+            raise _credentials_exception()
         username: str = payload.get("sub")
         if username is None:
-            raise credentials_exception
+            raise _credentials_exception()
     except JWTError:
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.username == username).first()
+        raise _credentials_exception()
+    return payload
+
+async def get_token_payload(token: str = Depends(oauth2_scheme)) -> dict:
+    """
+    Verify the bearer access token and return its claims.
+
+    Signatures are checked once per token per worker; later requests with the
+    same token are served from token_cache until the token expires.
+    """
+    digest = _token_digest(token)
+    if digest in revoked_tokens:
+        raise _credentials_exception()
+    payload = token_cache.get(digest)
+    if payload is None:
+        payload = _decode_access_token(token)
+        token_cache.set(digest, payload, ttl=payload["exp"] - time.time())
+    return payload
+
+def revoke_token(token: str, payload: dict) -> None:
+    """
+    Reject an access token from now on in this worker (e.g. on logout).
+
+    payload must be the token's verified claims (from get_token_payload), so
+    only genuine tokens are recorded, each until it expires. Revocations are
+    in-process; other workers stop accepting the token when it expires.
+    """
+    digest = _token_digest(token)
+    token_cache.invalidate(digest)
+    revoked_tokens.add(digest, ttl=payload["exp"] - time.time())
+
+def issue_renewed_token(username: str) -> str:
+    """Return the user's access token for the current renewal bucket, signing it at most once per bucket"""
+    key = (username, int(time.time() // settings.TOKEN_RENEWAL_BUCKET_SECONDS))
+    token = renewed_token_cache.get(key)
+    if token is None:
+        token = create_access_token(data={"sub": username})
+        renewed_token_cache.set(key, token)
+    return token
+
+async def renew_access_token(
+    response: Response,
+    payload: dict = Depends(get_token_payload)
+) -> Optional[str]:
+    """
+    Sliding renewal for authenticated endpoints.
+
+    Returns None while the caller's token has more than TOKEN_RENEWAL_WINDOW_MINUTES
+    left. Inside the window it returns a fresh token and sets it in the
+    X-Access-Token response header.
+    """
+    if payload["exp"] - time.time() > settings.TOKEN_RENEWAL_WINDOW_MINUTES * 60:
+        return None
+    token = issue_renewed_token(payload["sub"])
+    response.headers[ACCESS_TOKEN_HEADER] = token
+    return token
+
+def _detached_copy(user: User) -> User:
+    """Copy the loaded columns into a transient User that can outlive the request's session"""
+    return User(**{column.key: getattr(user, column.key) for column in User.__mapper__.column_attrs})
+
+def invalidate_cached_user(username: str) -> None:
+    """Drop a user from the cache after its record changes (device binding, creation, disabling)"""
+    user_cache.invalidate(username)
+
+# Sync on purpose: FastAPI runs it in the threadpool so the user lookup does not block the event loop
+def get_current_user(
+    db: Session = Depends(get_db),
+    payload: dict = Depends(get_token_payload)
+) -> User:
+    username = payload["sub"]
+    user = user_cache.get(username)
+    if user is None:
+        db_user = user_crud.get_user_by_username(db, username)
+        if db_user is None:
+            raise _credentials_exception()
+        user = _detached_copy(db_user)
+        user_cache.set(username, user)
+    return user
+
+def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    """The current user, if listed in ADMIN_USERNAMES; guards the operational /admin endpoints"""
+    if current_user.username not in settings.get_admin_usernames:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    payload: dict = Depends(get_token_payload)
+) -> User:
+    username = payload["sub"]
+    user = user_cache.get(username)
     if user is None:
-        raise credentials_exception
+        db_user = await user_crud.get_user_by_username_async(db, username)
+        if db_user is None:
+            raise _credentials_exception()
+        user = _detached_copy(db_user)
+        user_cache.set(username, user)
     return user
 
 async def refresh_access_token(refresh_token: str, db: Session) -> str:
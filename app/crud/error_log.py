@@ -1,24 +1,82 @@
 from sqlalchemy.orm import Session
-from datetime import datetime, date
-from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, date, timedelta
+from typing import List, Optional, Tuple
+import base64
+import json
+from app.core.event_time import event_day, event_day_start
+from app.core.live_counters import publish_on_commit
 from app.models.error_log import ErrorLog
 from app.schemas.error_log import ErrorLogCreate
-from sqlalchemy import func
+from sqlalchemy import select, tuple_
 
-def create_error_log(db: Session, error_log: ErrorLogCreate) -> ErrorLog:
-    """
-    Create a new error log entry in the database.
-    """
-    db_error_log = ErrorLog(
+Cursor = Tuple[datetime, int]
+
+def _new_error_log(error_log: ErrorLogCreate) -> ErrorLog:
+    return ErrorLog(
         user_id=error_log.user_id,
         registrant_id=error_log.registrant_id,
         scan_time=error_log.scan_time,
         error=error_log.error,
         error_code=error_log.error_code
     )
+
+def encode_cursor(error_log: ErrorLog) -> str:
+    """Opaque page token pointing just past error_log in (scan_time, id) descending order"""
+    payload = json.dumps([error_log.scan_time.isoformat(), error_log.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(token: str) -> Cursor:
+    try:
+        scan_time, id_ = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        return datetime.fromisoformat(scan_time), int(id_)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+def _error_logs_query(
+    skip: int,
+    limit: int,
+    user_id: Optional[int],
+    registrant_id: Optional[int],
+    error_code: Optional[str],
+    start_date: Optional[date],
+    end_date: Optional[date],
+    cursor: Optional[Cursor] = None
+):
+    # Legacy rows without a scan_time have no place in the timeline (and would sort first under
+    # DESC), so the listing and its cursor only cover rows that have one
+    query = select(ErrorLog).where(ErrorLog.scan_time.is_not(None))
+
+    if user_id is not None:
+        query = query.where(ErrorLog.user_id == user_id)
+    if registrant_id is not None:
+        query = query.where(ErrorLog.registrant_id == registrant_id)
+    if error_code is not None:
+        query = query.where(ErrorLog.error_code == error_code)
+    # Event days as half-open scan_time ranges so the (..., scan_time) indexes can be used
+    if start_date is not None:
+        query = query.where(ErrorLog.scan_time >= event_day_start(start_date))
+    if end_date is not None:
+        query = query.where(ErrorLog.scan_time < event_day_start(end_date + timedelta(days=1)))
+
+    if cursor is not None:
+        # Keyset pagination: seek past the previous page on ix_fnb_error_logs_scan_time_id instead of OFFSET
+        query = query.where(tuple_(ErrorLog.scan_time, ErrorLog.id) < tuple_(*cursor))
+
+    return query.order_by(ErrorLog.scan_time.desc(), ErrorLog.id.desc()).offset(skip).limit(limit)
+
+def create_error_log(db: Session, error_log: ErrorLogCreate, commit: bool = True) -> ErrorLog:
+    """
+    Create a new error log entry in the database.
+    With commit=False the entry is only added to the session, to be inserted
+    (batched with others) when the caller commits.
+    """
+    db_error_log = _new_error_log(error_log)
     db.add(db_error_log)
-    db.commit()
-    db.refresh(db_error_log)
+    publish_on_commit(db, errors=[(event_day(error_log.scan_time), error_log.error_code)])
+    if commit:
+        db.commit()
+        db.refresh(db_error_log)
     return db_error_log
 
 def get_error_logs(
@@ -29,35 +87,80 @@ def get_error_logs(
     registrant_id: Optional[int] = None,
     error_code: Optional[str] = None,
     start_date: Optional[date] = None,
-    end_date: Optional[date] = None
+    end_date: Optional[date] = None,
+    cursor: Optional[str] = None
 ) -> list[ErrorLog]:
     """
-    Retrieve error logs with optional filtering.
+    Retrieve error logs with optional filtering, newest first.
     
     Args:
         db (Session): Database session
-        skip (int): Number of records to skip
+        skip (int): Number of records to skip (prefer cursor; OFFSET cost grows with depth)
         limit (int): Maximum number of records to return
         user_id (int, optional): Filter by user ID
         registrant_id (int, optional): Filter by registrant ID
         error_code (str, optional): Filter by error code (e.g., "01", "02", "03")
-        start_date (date, optional): Filter by start date
-        end_date (date, optional): Filter by end date
+        start_date (date, optional): First event day to include
+        end_date (date, optional): Last event day to include
+        cursor (str, optional): Token from the previous page; the page starts after it
         
     Returns:
         list[ErrorLog]: List of error log entries
+
+    Raises:
+        ValueError: If the cursor is not valid
     """
-    query = db.query(ErrorLog)
-    
-    if user_id is not None:
-        query = query.filter(ErrorLog.user_id == user_id)
-    if registrant_id is not None:
-        query = query.filter(ErrorLog.registrant_id == registrant_id)
-    if error_code is not None:
-        query = query.filter(ErrorLog.error_code == error_code)
-    if start_date is not None:
-        query = query.filter(func.date(ErrorLog.scan_time) >= start_date)
-    if end_date is not None:
-        query = query.filter(func.date(ErrorLog.scan_time) <= end_date)
-        
-    return query.order_by(ErrorLog.scan_time.desc()).offset(skip).limit(limit).all() 
\ No newline at end of file
+    query = _error_logs_query(skip, limit, user_id, registrant_id, error_code, start_date, end_date,
+                              decode_cursor(cursor) if cursor else None)
+    return db.execute(query).scalars().all()
+
+def get_error_log_page(db: Session, limit: int = 100, cursor: Optional[str] = None,
+                       **filters) -> Tuple[List[ErrorLog], Optional[str]]:
+    """
+    One page of get_error_logs plus the cursor for the next page (None on the last page).
+    Every page is an index seek, so deep pages cost the same as the first.
+    """
+    error_logs = get_error_logs(db, limit=limit + 1, cursor=cursor, **filters)
+    if len(error_logs) > limit:
+        return error_logs[:limit], encode_cursor(error_logs[limit - 1])
+    return error_logs, None
+
+async def create_error_log_async(db: AsyncSession, error_log: ErrorLogCreate) -> ErrorLog:
+    """
+    Create a new error log entry in the database.
+    """
+    db_error_log = _new_error_log(error_log)
+    db.add(db_error_log)
+    publish_on_commit(db, errors=[(event_day(error_log.scan_time), error_log.error_code)])
+    await db.commit()
+    await db.refresh(db_error_log)
+    return db_error_log
+
+async def get_error_logs_async(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    user_id: Optional[int] = None,
+    registrant_id: Optional[int] = None,
+    error_code: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    cursor: Optional[str] = None
+) -> list[ErrorLog]:
+    """
+    Retrieve error logs with optional filtering. See get_error_logs.
+    """
+    query = _error_logs_query(skip, limit, user_id, registrant_id, error_code, start_date, end_date,
+                              decode_cursor(cursor) if cursor else None)
+    result = await db.execute(query)
+    return result.scalars().all()
+
+async def get_error_log_page_async(db: AsyncSession, limit: int = 100, cursor: Optional[str] = None,
+                                   **filters) -> Tuple[List[ErrorLog], Optional[str]]:
+    """
+    One page of error logs plus the cursor for the next page. See get_error_log_page.
+    """
+    error_logs = await get_error_logs_async(db, limit=limit + 1, cursor=cursor, **filters)
+    if len(error_logs) > limit:
+        return error_logs[:limit], encode_cursor(error_logs[limit - 1])
+    return error_logs, None
@@ -0,0 +1,185 @@
+import csv
+import io
+import threading
+import zlib
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, Optional
+
+import orjson
+from sqlalchemy import and_, exists, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+from app.core.event_time import event_day_start
+from app.crud.food_log import MEALS
+from app.db.session import export_engine
+from app.models.error_log import ErrorLog
+from app.models.food_log import FoodLog
+from app.models.participant import Participant
+
+EXPORT_FORMATS = ("csv", "ndjson")
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+class ExportLimit:
+    """
+    Turns exports away while every export_engine connection is streaming one.
+
+    The pool itself caps the connections; checking first means a client gets
+    a 429 to retry rather than a download that stalls for DB_POOL_TIMEOUT.
+    Two requests racing for the last connection can both pass, in which case
+    the second waits on the pool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.admitted = 0
+        self.rejected = 0
+
+    def admit(self) -> bool:
+        pool = export_engine.pool
+        with self._lock:
+            if isinstance(pool, QueuePool) and pool.checkedout() >= pool.size():
+                self.rejected += 1
+                return False
+            self.admitted += 1
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_concurrent": settings.EXPORT_MAX_CONCURRENT,
+                "admitted": self.admitted,
+                "rejected": self.rejected
+            }
+
+export_limit = ExportLimit()
+
+def parse_export_date(value: Optional[str], name: str) -> Optional[date]:
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError(f"Invalid {name} format. Please use YYYY-MM-DD.")
+
+def _in_event_days(column, start_date: Optional[date], end_date: Optional[date]):
+    # Half-open range so the column's index can be used, as in the error log listing
+    conditions = []
+    if start_date is not None:
+        conditions.append(column >= event_day_start(start_date))
+    if end_date is not None:
+        conditions.append(column < event_day_start(end_date + timedelta(days=1)))
+    return conditions
+
+def food_log_export_query(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    meal: Optional[str] = None,
+    participant_type: Optional[str] = None
+):
+    """
+    Food logs in date order with the participant type scheduled for that day.
+    meal keeps only rows where that meal was taken.
+    """
+    if meal is not None and meal not in MEALS:
+        raise ValueError(f"Invalid meal. Must be one of: {', '.join(MEALS)}")
+
+    scheduled_type = (
+        select(Participant.participant_type)
+        .where(Participant.registrant_id == FoodLog.registration_id, Participant.event_day == FoodLog.event_day)
+        .limit(1)
+        .scalar_subquery()
+    )
+    query = select(
+        FoodLog.registration_id,
+        FoodLog.name,
+        FoodLog.date,
+        FoodLog.event_day,
+        FoodLog.lunch,
+        FoodLog.lunch_takenon,
+        FoodLog.dinner,
+        FoodLog.dinner_takenon,
+        FoodLog.multi_entry,
+        scheduled_type.label("participant_type")
+    ).where(*_in_event_days(FoodLog.date, start_date, end_date))
+
+    if meal is not None:
+        query = query.where(getattr(FoodLog, f"{meal}_takenon").isnot(None))
+    if participant_type is not None:
+        query = query.where(scheduled_type == participant_type)
+    return query.order_by(FoodLog.date, FoodLog.registration_id)
+
+def error_log_export_query(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    error_code: Optional[str] = None,
+    participant_type: Optional[str] = None
+):
+    """Error logs in scan order; participant_type keeps registrants ever scheduled as that type"""
+    query = select(
+        ErrorLog.id,
+        ErrorLog.user_id,
+        ErrorLog.registrant_id,
+        ErrorLog.scan_time,
+        ErrorLog.error_code,
+        ErrorLog.error
+    ).where(*_in_event_days(ErrorLog.scan_time, start_date, end_date))
+
+    if error_code is not None:
+        query = query.where(ErrorLog.error_code == error_code)
+    if participant_type is not None:
+        query = query.where(exists().where(and_(
+            Participant.registrant_id == ErrorLog.registrant_id,
+            Participant.participant_type == participant_type
+        )))
+    return query.order_by(ErrorLog.scan_time, ErrorLog.id)
+
+def _csv_value(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+def _encode_csv(rows) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+def _encode_ndjson(columns, rows) -> bytes:
+    return b"".join(orjson.dumps(dict(zip(columns, row)), option=orjson.OPT_UTC_Z) + b"\n" for row in rows)
+
+def _export_chunks(query, export_format: str, engine: Engine, chunk_size: int) -> Iterator[bytes]:
+    with engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=chunk_size).execute(query)
+        columns = list(result.keys())
+        if export_format == "csv":
+            yield _encode_csv([columns])
+        for rows in result.partitions():
+            yield _encode_csv(rows) if export_format == "csv" else _encode_ndjson(columns, rows)
+
+def _gzip(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    # wbits=31 writes a gzip container rather than a raw zlib stream
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def stream_export(
+    query,
+    export_format: str = "csv",
+    compress: bool = False,
+    engine: Optional[Engine] = None,
+    chunk_size: int = settings.EXPORT_CHUNK_ROWS
+) -> Iterator[bytes]:
+    """
+    Stream the rows of an export query as CSV (with a header row) or NDJSON bytes.
+
+    Rows are fetched chunk_size at a time through a server-side cursor and
+    encoded (and gzipped, with compress) chunk by chunk, so memory stays flat
+    however many rows match. The query runs on its own connection from
+    export_engine, which is closed when the stream ends.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format. Must be one of: {', '.join(EXPORT_FORMATS)}")
+    chunks = _export_chunks(query, export_format, engine or export_engine, chunk_size)
+    return _gzip(chunks) if compress else chunks
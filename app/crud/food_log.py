@@ -1,18 +1,154 @@
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import cast, Date, func, text
+from sqlalchemy.orm import Session, aliased, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import cast, Date, func, text, select, and_, or_, exists, literal, literal_column, null
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.types import String
 from datetime import datetime, timezone, date
 from app.models.food_log import FoodLog
 from app.models.participant import Participant
 from app.schemas.food_log import FoodLogUpdate, FoodLogCreate
 from app.core.special_registrations import is_special_registration
+from app.core.config import settings
+from app.core.event_time import event_day, to_event_time
+from app.db.session import record_write
+from app.core.live_counters import publish_on_commit
 import logging
 import datetime
-from typing import Union, Optional
+from typing import List, Optional, Tuple, Union
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+def _food_logs_for_day_query(registrationid: str, search_date):
+    # event_day is stored, so this is a probe on ix_fnb_food_logs_registration_id_event_day
+    return select(FoodLog).where(
+        FoodLog.registration_id == registrationid,
+        FoodLog.event_day == search_date
+    )
+
+def _is_multi_entry(update_data: FoodLogUpdate) -> bool:
+    """Special registrations and the name "master" get a new entry for every meal."""
+    return is_special_registration(update_data.registration_id) or bool(update_data.name and update_data.name.lower() == "master")
+
+class DuplicateMealError(ValueError):
+    """The meal was already recorded for this registration on this event day"""
+
+MEALS = ("lunch", "dinner")
+
+def _food_log_values(update_data: FoodLogUpdate, multi_entry: bool) -> dict:
+    # Core INSERT bypasses the model's @validates hook, so event_day is set here;
+    # naive dates are event-local, as everywhere else
+    return {
+        "registration_id": str(update_data.registration_id),
+        "date": to_event_time(update_data.date),
+        "event_day": event_day(update_data.date),
+        "name": update_data.name,
+        "lunch": update_data.lunch,
+        "dinner": update_data.dinner,
+        "lunch_takenon": update_data.lunch_takenon,
+        "dinner_takenon": update_data.dinner_takenon,
+        "multi_entry": multi_entry
+    }
+
+def _insert_food_logs_query(values):
+    # A replayed special/master entry has the same (registration_id, date) key as the one it
+    # repeats; it is skipped, so it returns no row and counts as a duplicate
+    return insert(FoodLog).values(values).on_conflict_do_nothing(index_elements=[FoodLog.registration_id, FoodLog.date])
+
+def _insert_food_log_query(update_data: FoodLogUpdate):
+    return _insert_food_logs_query(_food_log_values(update_data, multi_entry=True))
+
+# Columns a regular update overwrites when the request sets them (null clears them); meal stamps are
+# only ever filled in, since they are the record of a meal served and the duplicate check relies on them
+UPDATABLE_COLUMNS = ("name", "lunch", "dinner")
+
+def _set_columns(update_data: FoodLogUpdate) -> Tuple[str, ...]:
+    return tuple(column for column in UPDATABLE_COLUMNS if column in update_data.model_fields_set)
+
+def _meal_recorded(flag, stamp):
+    return or_(stamp.is_not(None), func.coalesce(flag, 0) != 0)
+
+def _meal_not_taken(excluded, meal: str):
+    # A meal is recorded once, by its flag or its stamp; re-sending the same stamp (a retried request) is not a duplicate
+    stamp, taken = excluded[f"{meal}_takenon"], getattr(FoodLog, f"{meal}_takenon")
+    return or_(
+        ~_meal_recorded(excluded[meal], stamp),
+        ~_meal_recorded(getattr(FoodLog, meal), taken),
+        taken == stamp
+    )
+
+def _unless_multi_entry_at(values: dict):
+    # ON CONFLICT only covers the regular-entry index, so a multi-entry row at exactly this
+    # (registration_id, date) would fail the primary key; skip the insert instead, as a duplicate
+    table = FoodLog.__table__
+    return select(*(literal(value, table.c[name].type).label(name) for name, value in values.items())).where(
+        ~exists().where(
+            FoodLog.registration_id == values["registration_id"],
+            FoodLog.date == values["date"],
+            FoodLog.multi_entry.is_(True)
+        )
+    )
+
+def _upsert_food_log_query(values, columns: Tuple[str, ...]):
+    """
+    INSERT ... ON CONFLICT (registration_id, event_day) DO UPDATE for regular
+    registrations; values is one row or a list of rows with distinct keys that
+    all set the same columns. Of the UPDATABLE_COLUMNS only those in columns are
+    overwritten, the rest keep their stored value, and a meal stamp is only
+    filled in, never cleared. The conflict update only applies when it would
+    not record a meal already taken, so a duplicate returns no row.
+    """
+    if isinstance(values, dict):
+        query = insert(FoodLog).from_select(list(values), _unless_multi_entry_at(values))
+    else:
+        query = insert(FoodLog).values(values)
+    excluded = query.excluded
+    set_ = {column: excluded[column] for column in columns}
+    for meal in MEALS:
+        stamp = f"{meal}_takenon"
+        set_[stamp] = func.coalesce(excluded[stamp], getattr(FoodLog, stamp))
+    return query.on_conflict_do_update(
+        index_elements=[FoodLog.registration_id, FoodLog.event_day],
+        index_where=text("NOT multi_entry"),
+        set_=set_,
+        where=and_(*(_meal_not_taken(excluded, meal) for meal in MEALS))
+    )
+
+_prior = aliased(FoodLog)
+
+# The key of each row a multi-row upsert writes, for subqueries in its RETURNING; a column
+# of FoodLog itself would put the table in the subquery's FROM instead of correlating
+_WRITTEN_KEY = {
+    column: literal_column(f"{FoodLog.__table__.fullname}.{column}") for column in ("registration_id", "event_day")
+}
+
+def _prior_stamp(values: dict, meal: str):
+    # A subquery in RETURNING reads the table as it was before the statement,
+    # so this is the stamp the upsert found (NULL for a new row). values is the
+    # written row's values, or _WRITTEN_KEY for a multi-row upsert
+    return select(getattr(_prior, f"{meal}_takenon")).where(
+        _prior.registration_id == values["registration_id"],
+        _prior.event_day == values["event_day"],
+        _prior.multi_entry.is_(False)
+    ).scalar_subquery()
+
+def _record_food_log_query(update_data: FoodLogUpdate):
+    """
+    The one statement update_food_log runs. Returns the written row followed
+    by each meal's stamp from before the write, or no row for a duplicate meal.
+    """
+    if _is_multi_entry(update_data):
+        return _insert_food_log_query(update_data).returning(FoodLog, *(null() for _ in MEALS))
+    values = _food_log_values(update_data, multi_entry=False)
+    return _upsert_food_log_query(values, _set_columns(update_data)).returning(FoodLog, *(_prior_stamp(values, meal) for meal in MEALS))
+
+def _duplicate_meal_error(update_data: FoodLogUpdate) -> DuplicateMealError:
+    meals = [meal for meal in MEALS if getattr(update_data, f"{meal}_takenon") is not None or getattr(update_data, meal)]
+    return DuplicateMealError(
+        f"Duplicate meal entry: {' and '.join(meals) or 'meal'} already recorded for "
+        f"registration_id={update_data.registration_id} on {event_day(update_data.date)}"
+    )
+
 def get_food_logs_by_schedule(db: Session, registrationid: Union[str, int], date_str: str):
     """
     Get food log data by registration ID and date.
@@ -35,90 +171,243 @@ def get_food_logs_by_schedule(db: Session, registrationid: Union[str, int], date
         if isinstance(registrationid, int):
             registrationid = str(registrationid)
         
+        query = _food_logs_for_day_query(registrationid, search_date)
+
         # For special registrations, return all entries for the day
         if is_special_registration(registrationid):
-            food_logs = db.query(FoodLog).filter(
-                FoodLog.registration_id == registrationid,
-                func.date(FoodLog.date) == search_date
-            ).all()
+            food_logs = db.execute(query).scalars().all()
             return food_logs if food_logs else None
         
         # For regular registrations, return the first entry
-        food_log = db.query(FoodLog).filter(
-            FoodLog.registration_id == registrationid,
-            func.date(FoodLog.date) == search_date
-        ).first()
+        food_log = db.execute(query.limit(1)).scalars().first()
 
         return [food_log] if food_log else None
     except Exception as e:
         raise ValueError(f"Error searching food logs: {str(e)}")
 
-def update_food_log(db: Session, update_data: FoodLogUpdate) -> Optional[FoodLog]:
+def _meals_served(day: date, update_data: FoodLogUpdate, prior_stamps) -> List[Tuple[date, str]]:
+    # A retried request re-sends a stamp that is already stored; only meals with no prior stamp are newly served
+    return [
+        (day, meal) for meal, prior in zip(MEALS, prior_stamps)
+        if getattr(update_data, f"{meal}_takenon") is not None and prior is None
+    ]
+
+def update_food_log(db: Session, update_data: FoodLogUpdate, commit: bool = True) -> FoodLog:
     """
-    Update food log data for a specific registration ID and date.
+    Record food log data for a specific registration ID and event day in one statement.
     For special registration IDs and the name "master", creates a new entry each time.
+    Regular registrations are upserted: fields left unset keep their stored value,
+    fields set to null are cleared (meal stamps excepted).
     
     Args:
         db (Session): Database session
         update_data (FoodLogUpdate): Data to update
+        commit (bool): Commit (or roll back) here; False leaves the transaction to the caller
         
     Returns:
         FoodLog: Updated or new food log entry
+
+    Raises:
+        DuplicateMealError: If a meal in update_data was already recorded that day
     """
     try:
         logger.info(f"Processing food log update for registration_id={update_data.registration_id} and date={update_data.date}")
-        
-        # Use registration_id as is, without conversion
-        registration_id = update_data.registration_id
-
-        # Check if it's a special registration or if the name is "master"
-        if is_special_registration(registration_id) or (update_data.name and update_data.name.lower() == "master"):
-            logger.info("Processing special registration or master")
-            # For special registrations and master, always create a new entry
-            food_log = FoodLog(
-                registration_id=registration_id,
-                date=update_data.date,
-                name=update_data.name,
-                lunch=update_data.lunch,
-                dinner=update_data.dinner,
-                lunch_takenon=update_data.lunch_takenon,
-                dinner_takenon=update_data.dinner_takenon
+
+        row = db.execute(_record_food_log_query(update_data), execution_options={"populate_existing": True}).first()
+        if row is None:
+            raise _duplicate_meal_error(update_data)
+        food_log = row[0]
+        publish_on_commit(db, meals=_meals_served(food_log.event_day, update_data, row[1:]))
+
+        if commit:
+            # RETURNING already loaded the row; detach it so commit does not expire it into another SELECT
+            db.expunge(food_log)
+            db.commit()
+        record_write(update_data.registration_id)
+        return food_log
+    except DuplicateMealError:
+        # The upsert wrote nothing, so a caller's open transaction is still usable
+        if commit:
+            db.rollback()
+        raise
+    except Exception as e:
+        logger.error(f"Error in update_food_log: {str(e)}", exc_info=True)
+        if commit:
+            db.rollback()
+        raise ValueError(f"Error updating food log: {str(e)}")
+
+def delete_food_log(db: Session, registration_id: Union[str, int], search_date) -> Optional[FoodLog]:
+    """
+    Delete the food log entry for a registration ID on an event day.
+
+    Returns:
+        FoodLog: The deleted entry, or None if there was none
+    """
+    food_log = db.execute(
+        _food_logs_for_day_query(str(registration_id), search_date).limit(1)
+    ).scalars().first()
+    if food_log:
+        db.delete(food_log)
+        db.commit()
+    return food_log
+
+BULK_ACCEPTED = "accepted"
+BULK_DUPLICATE = "duplicate"
+BULK_ERROR = "error"
+
+def _bulk_rounds(updates: List[Tuple[int, FoodLogUpdate]]) -> List[List[Tuple[int, FoodLogUpdate]]]:
+    """
+    Split a chunk into rounds in which each (registration_id, event_day) appears
+    once, since one ON CONFLICT DO UPDATE statement cannot touch a row twice.
+    Later updates of the same key land in later rounds, keeping their order.
+    """
+    rounds: List[List[Tuple[int, FoodLogUpdate]]] = []
+    seen: dict = {}
+    for index, update_data in updates:
+        key = (str(update_data.registration_id), event_day(update_data.date))
+        round_number = seen.get(key, 0)
+        seen[key] = round_number + 1
+        if round_number == len(rounds):
+            rounds.append([])
+        rounds[round_number].append((index, update_data))
+    return rounds
+
+def _apply_bulk_chunk(db: Session, chunk: List[Tuple[int, FoodLogUpdate]], results: list) -> None:
+    # A replayed special/master scan has the same (registration_id, date) key as the
+    # entry it repeats; repeats within the chunk are marked here, stored ones are skipped by the insert
+    served: List[Tuple[date, str]] = []
+    multi = {}
+    for index, update_data in chunk:
+        if _is_multi_entry(update_data):
+            key = (str(update_data.registration_id), to_event_time(update_data.date))
+            if key in multi:
+                results[index] = (BULK_DUPLICATE, str(_duplicate_meal_error(update_data)))
+            else:
+                multi[key] = (index, update_data)
+    if multi:
+        inserted = {
+            (registration_id, to_event_time(date_))
+            for registration_id, date_ in db.execute(
+                _insert_food_logs_query([_food_log_values(update_data, multi_entry=True) for _, update_data in multi.values()])
+                .returning(FoodLog.registration_id, FoodLog.date)
             )
-            db.add(food_log)
-        else:
-            logger.info("Processing regular registration")
-            # Check for existing entry first
-            food_log = db.query(FoodLog).filter(
-                FoodLog.registration_id == registration_id,
-                func.date(FoodLog.date) == update_data.date
-            ).first()
-            
-            if food_log:
-                logger.info("Updating existing entry for regular registration")
-                # Update existing entry
-                food_log.lunch = update_data.lunch
-                food_log.dinner = update_data.dinner
-                food_log.lunch_takenon = update_data.lunch_takenon
-                food_log.dinner_takenon = update_data.dinner_takenon
-                food_log.name = update_data.name
+        }
+        for key, (index, update_data) in multi.items():
+            if key in inserted:
+                results[index] = (BULK_ACCEPTED, None)
+                served.extend(_meals_served(event_day(update_data.date), update_data, (None,) * len(MEALS)))
             else:
-                logger.info("Creating new entry for regular registration")
-                # Create new entry only if none exists
-                food_log = FoodLog(
-                    registration_id=registration_id,
-                    date=update_data.date,
-                    name=update_data.name,
-                    lunch=update_data.lunch,
-                    dinner=update_data.dinner,
-                    lunch_takenon=update_data.lunch_takenon,
-                    dinner_takenon=update_data.dinner_takenon
+                results[index] = (BULK_DUPLICATE, str(_duplicate_meal_error(update_data)))
+
+    regular = [(index, update_data) for index, update_data in chunk if not _is_multi_entry(update_data)]
+    for round_ in _bulk_rounds(regular):
+        # One statement per set of columns the items set, since the conflict update is per statement
+        groups: dict = {}
+        for index, update_data in round_:
+            groups.setdefault(_set_columns(update_data), []).append((index, update_data))
+        # (registration_id, event_day) of each row written, with its meal stamps from before the write
+        written = {}
+        for columns, group in groups.items():
+            written.update(
+                ((registration_id, day), prior_stamps) for registration_id, day, *prior_stamps in db.execute(
+                    _upsert_food_log_query([_food_log_values(update_data, multi_entry=False) for _, update_data in group],
+                                           columns)
+                    .returning(FoodLog.registration_id, FoodLog.event_day,
+                               *(_prior_stamp(_WRITTEN_KEY, meal) for meal in MEALS))
                 )
-                db.add(food_log)
-        
-        db.commit()
-        db.refresh(food_log)
+            )
+        for index, update_data in round_:
+            key = (str(update_data.registration_id), event_day(update_data.date))
+            if key in written:
+                results[index] = (BULK_ACCEPTED, None)
+                served.extend(_meals_served(key[1], update_data, written[key]))
+            else:
+                results[index] = (BULK_DUPLICATE, str(_duplicate_meal_error(update_data)))
+    publish_on_commit(db, meals=served)
+
+def bulk_update_food_logs(db: Session, updates: List[FoodLogUpdate],
+                          chunk_size: int = settings.FOOD_LOG_BULK_CHUNK_SIZE) -> List[Tuple[str, Optional[str]]]:
+    """
+    Apply many food log updates with multi-row upserts, one transaction per chunk.
+
+    Each item follows the same rules as update_food_log. If a chunk fails as a
+    whole it is rolled back and replayed one item at a time, so a bad item only
+    fails itself.
+
+    Args:
+        db (Session): Database session
+        updates (List[FoodLogUpdate]): Updates in the order they were recorded
+        chunk_size (int): Items per statement batch and transaction
+
+    Returns:
+        List[Tuple[str, Optional[str]]]: (status, detail) per item, in input order
+    """
+    results: List[Tuple[str, Optional[str]]] = [None] * len(updates)
+    indexed = list(enumerate(updates))
+    for start in range(0, len(indexed), chunk_size):
+        chunk = indexed[start:start + chunk_size]
+        try:
+            _apply_bulk_chunk(db, chunk, results)
+            db.commit()
+        except Exception as e:
+            logger.warning(f"Bulk food log chunk at item {start} failed, applying items one by one: {str(e)}")
+            db.rollback()
+            for index, update_data in chunk:
+                try:
+                    update_food_log(db, update_data)
+                    results[index] = (BULK_ACCEPTED, None)
+                except DuplicateMealError as e:
+                    results[index] = (BULK_DUPLICATE, str(e))
+                except ValueError as e:
+                    results[index] = (BULK_ERROR, str(e))
+            continue
+        for index, update_data in chunk:
+            if results[index][0] == BULK_ACCEPTED:
+                record_write(update_data.registration_id)
+    return results
+
+async def get_food_logs_by_schedule_async(db: AsyncSession, registrationid: Union[str, int], date_str: str):
+    """
+    Get food log data by registration ID and date. See get_food_logs_by_schedule.
+    """
+    try:
+        search_date = date.fromisoformat(date_str.strip())
+        registrationid = str(registrationid)
+        query = _food_logs_for_day_query(registrationid, search_date)
+
+        if is_special_registration(registrationid):
+            result = await db.execute(query)
+            food_logs = result.scalars().all()
+            return food_logs if food_logs else None
+
+        result = await db.execute(query.limit(1))
+        food_log = result.scalars().first()
+        return [food_log] if food_log else None
+    except Exception as e:
+        raise ValueError(f"Error searching food logs: {str(e)}")
+
+async def update_food_log_async(db: AsyncSession, update_data: FoodLogUpdate) -> FoodLog:
+    """
+    Record food log data for a specific registration ID and event day in one statement. See update_food_log.
+    """
+    try:
+        logger.info(f"Processing food log update for registration_id={update_data.registration_id} and date={update_data.date}")
+
+        result = await db.execute(_record_food_log_query(update_data), execution_options={"populate_existing": True})
+        row = result.first()
+        if row is None:
+            raise _duplicate_meal_error(update_data)
+        food_log = row[0]
+        publish_on_commit(db, meals=_meals_served(food_log.event_day, update_data, row[1:]))
+
+        db.expunge(food_log)
+        await db.commit()
+        record_write(update_data.registration_id)
         return food_log
+    except DuplicateMealError:
+        await db.rollback()
+        raise
     except Exception as e:
-        logger.error(f"Error in update_food_log: {str(e)}", exc_info=True)
-        db.rollback()
-        raise ValueError(f"Error updating food log: {str(e)}") 
\ No newline at end of file
+        logger.error(f"Error in update_food_log_async: {str(e)}", exc_info=True)
+        await db.rollback()
+        raise ValueError(f"Error updating food log: {str(e)}")
@@ -1,50 +1,125 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, text, cast
-from sqlalchemy.types import String
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from app.models.participant import Participant
 from app.schemas.participant import ParticipantCreate, ParticipantUpdate
+from app.core.roster_cache import roster_cache
 from datetime import date
+from typing import Union
 
-def get_participant(db: Session, registrant_id: int):
-    return db.query(Participant).filter(Participant.registrant_id == registrant_id).first()
+def normalize_registration_id(registrationid: Union[str, int]) -> str:
+    """Registration IDs are stored as strings; scanners may send them as numbers or with whitespace"""
+    return str(registrationid).strip()
+
+def _participant_query(registrant_id: Union[str, int]):
+    return select(Participant).where(Participant.registrant_id == normalize_registration_id(registrant_id)).limit(1)
+
+def _participants_query(skip: int, limit: int):
+    return select(Participant).offset(skip).limit(limit)
+
+def _participant_by_schedule_query(registrationid: Union[str, int], date_str: str):
+    # Convert date string to date object
+    search_date = date.fromisoformat(date_str.strip())
+
+    # Plain column comparisons so ix_fnb_participants_registrant_id_event_day can be used
+    return select(Participant).where(
+        Participant.registrant_id == normalize_registration_id(registrationid),
+        Participant.event_day == search_date
+    ).limit(1)
+
+def get_participant(db: Session, registrant_id: Union[str, int]):
+    return db.execute(_participant_query(registrant_id)).scalars().first()
 
 def get_participants(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Participant).offset(skip).limit(limit).all()
+    return db.execute(_participants_query(skip, limit)).scalars().all()
 
 def create_participant(db: Session, participant: ParticipantCreate):
     db_participant = Participant(**participant.dict())
     db.add(db_participant)
     db.commit()
     db.refresh(db_participant)
+    roster_cache.invalidate(db_participant.registrant_id)
     return db_participant
 
-def update_participant(db: Session, registrant_id: int, participant: ParticipantUpdate):
+def update_participant(db: Session, registrant_id: Union[str, int], participant: ParticipantUpdate):
     db_participant = get_participant(db, registrant_id)
     if db_participant:
         for key, value in participant.dict(exclude_unset=True).items():
             setattr(db_participant, key, value)
         db.commit()
         db.refresh(db_participant)
+        roster_cache.invalidate(db_participant.registrant_id)
     return db_participant
 
-def delete_participant(db: Session, registrant_id: int):
+def delete_participant(db: Session, registrant_id: Union[str, int]):
     db_participant = get_participant(db, registrant_id)
     if db_participant:
         db.delete(db_participant)
         db.commit()
+        roster_cache.invalidate(db_participant.registrant_id)
     return db_participant
 
-def get_participant_by_schedule(db: Session, registrationid: int, date_str: str):
+def get_participant_by_schedule(db: Session, registrationid: Union[str, int], date_str: str):
     """
     Get participant data by registration ID and date.
     """
-    # Convert date string to date object
-    search_date = date.fromisoformat(date_str.strip())
-    
-    # Build the main query - convert UTC to PKT by adding 5 hours
-    query = db.query(Participant).filter(
-        cast(Participant.registrant_id, String) == str(registrationid),
-        func.date(Participant.date + text("INTERVAL '5 hours'")) == search_date
-    )
-    
-    return query.first() 
\ No newline at end of file
+    return db.execute(_participant_by_schedule_query(registrationid, date_str)).scalars().first()
+
+def get_scheduled_participant(db: Session, registrationid: Union[str, int], date_str: str):
+    """
+    Get participant data by registration ID and date, from the in-memory roster when it covers the day.
+    """
+    entry = roster_cache.get(normalize_registration_id(registrationid), date.fromisoformat(date_str.strip()))
+    if entry is not None:
+        return entry
+    return get_participant_by_schedule(db, registrationid, date_str)
+
+async def get_participant_async(db: AsyncSession, registrant_id: Union[str, int]):
+    result = await db.execute(_participant_query(registrant_id))
+    return result.scalars().first()
+
+async def get_participants_async(db: AsyncSession, skip: int = 0, limit: int = 100):
+    result = await db.execute(_participants_query(skip, limit))
+    return result.scalars().all()
+
+async def create_participant_async(db: AsyncSession, participant: ParticipantCreate):
+    db_participant = Participant(**participant.dict())
+    db.add(db_participant)
+    await db.commit()
+    await db.refresh(db_participant)
+    roster_cache.invalidate(db_participant.registrant_id)
+    return db_participant
+
+async def update_participant_async(db: AsyncSession, registrant_id: Union[str, int], participant: ParticipantUpdate):
+    db_participant = await get_participant_async(db, registrant_id)
+    if db_participant:
+        for key, value in participant.dict(exclude_unset=True).items():
+            setattr(db_participant, key, value)
+        await db.commit()
+        await db.refresh(db_participant)
+        roster_cache.invalidate(db_participant.registrant_id)
+    return db_participant
+
+async def delete_participant_async(db: AsyncSession, registrant_id: Union[str, int]):
+    db_participant = await get_participant_async(db, registrant_id)
+    if db_participant:
+        await db.delete(db_participant)
+        await db.commit()
+        roster_cache.invalidate(db_participant.registrant_id)
+    return db_participant
+
+async def get_participant_by_schedule_async(db: AsyncSession, registrationid: Union[str, int], date_str: str):
+    """
+    Get participant data by registration ID and date.
+    """
+    result = await db.execute(_participant_by_schedule_query(registrationid, date_str))
+    return result.scalars().first()
+
+async def get_scheduled_participant_async(db: AsyncSession, registrationid: Union[str, int], date_str: str):
+    """
+    Get participant data by registration ID and date, from the in-memory roster when it covers the day.
+    """
+    entry = roster_cache.get(normalize_registration_id(registrationid), date.fromisoformat(date_str.strip()))
+    if entry is not None:
+        return entry
+    return await get_participant_by_schedule_async(db, registrationid, date_str)
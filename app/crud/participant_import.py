@@ -0,0 +1,231 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import IO, Callable, Dict, Iterator, List, Optional, Tuple
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.event_time import event_day, to_event_time
+from app.core.roster_cache import roster_cache
+from app.crud.participant import normalize_registration_id
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "ndjson")
+PROGRESS_EVERY = 10000
+
+_STAGING_TABLE = """
+    CREATE TEMP TABLE participant_import (
+        line integer NOT NULL,
+        registrant_id text NOT NULL,
+        date timestamptz NOT NULL,
+        event_day date NOT NULL,
+        participant_type varchar(50) NOT NULL
+    ) ON COMMIT DROP
+"""
+
+_COPY = "COPY participant_import (line, registrant_id, date, event_day, participant_type) FROM STDIN WITH (FORMAT csv)"
+
+# One statement: the last row per (registrant_id, event_day) wins, existing schedule rows are
+# updated in place and the rest inserted
+_MERGE = text("""
+    WITH incoming AS (
+        SELECT DISTINCT ON (registrant_id, event_day) registrant_id, date, event_day, participant_type
+        FROM participant_import
+        ORDER BY registrant_id, event_day, line DESC
+    ), updated AS (
+        UPDATE fnb.participants p
+        SET date = i.date, participant_type = i.participant_type
+        FROM incoming i
+        WHERE p.registrant_id = i.registrant_id AND p.event_day = i.event_day
+        RETURNING p.registrant_id, p.event_day
+    ), inserted AS (
+        INSERT INTO fnb.participants (registrant_id, date, event_day, participant_type)
+        SELECT i.registrant_id, i.date, i.event_day, i.participant_type
+        FROM incoming i
+        WHERE NOT EXISTS (
+            SELECT 1 FROM updated u WHERE u.registrant_id = i.registrant_id AND u.event_day = i.event_day
+        )
+        RETURNING 1
+    )
+    SELECT (SELECT count(*) FROM inserted) AS inserted, (SELECT count(DISTINCT (registrant_id, event_day)) FROM updated) AS updated
+""")
+
+class ImportReport:
+    """Counts and the first validation errors of a participant import"""
+
+    def __init__(self, max_errors: int):
+        self.max_errors = max_errors
+        self.rows_read = 0
+        self.rows_valid = 0
+        self.inserted = 0
+        self.updated = 0
+        self.error_count = 0
+        self.errors: List[Dict] = []
+
+    def add_error(self, line: int, error: str) -> None:
+        # Only the first max_errors are kept so a bad file cannot grow memory
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "error": error})
+
+def _parse_row(row: Dict) -> Tuple[str, datetime, str]:
+    registrant_id = normalize_registration_id(row.get("registrant_id") or "")
+    if not registrant_id:
+        raise ValueError("registrant_id is required")
+
+    raw_date = row.get("date")
+    if not raw_date:
+        raise ValueError("date is required")
+    try:
+        scheduled = to_event_time(datetime.fromisoformat(str(raw_date).strip()))
+    except ValueError:
+        raise ValueError(f"Invalid date: {raw_date}")
+
+    participant_type = str(row.get("participant_type") or "").strip()
+    if not participant_type:
+        raise ValueError("participant_type is required")
+    if len(participant_type) > 50:
+        raise ValueError("participant_type is longer than 50 characters")
+    return registrant_id, scheduled, participant_type
+
+# Bytes that are not UTF-8 decode to this, so the rows holding them can be reported
+_REPLACEMENT = "\ufffd"
+_INVALID_UTF8 = "Invalid UTF-8"
+
+def _read_csv_rows(lines: IO[str]) -> Iterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    # strict: bad quoting is an error for that row instead of being read as part of a field
+    reader = csv.DictReader(lines, strict=True)
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            yield reader.reader.line_num, None, f"Invalid CSV: {str(e)}"
+            continue
+        if any(_REPLACEMENT in str(value) for value in row.values()):
+            yield reader.line_num, None, _INVALID_UTF8
+        else:
+            yield reader.line_num, row, None
+
+def _read_rows(stream: IO[bytes], import_format: str) -> Iterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """Yield (line, row, error) one at a time from a CSV or NDJSON byte stream"""
+    lines = io.TextIOWrapper(stream, encoding="utf-8-sig", errors="replace", newline="")
+    if import_format == "csv":
+        yield from _read_csv_rows(lines)
+        return
+    for line, raw in enumerate(lines, start=1):
+        if not raw.strip():
+            continue
+        if _REPLACEMENT in raw:
+            yield line, None, _INVALID_UTF8
+            continue
+        try:
+            row = json.loads(raw)
+        except ValueError as e:
+            yield line, None, f"Invalid JSON: {str(e)}"
+            continue
+        if isinstance(row, dict):
+            yield line, row, None
+        else:
+            yield line, None, "Expected a JSON object"
+
+class _CopyStream:
+    """
+    File-like object that psycopg2's copy_expert reads from. Rows are parsed,
+    validated and encoded only as COPY asks for more data, so the upload is
+    never held in memory.
+    """
+
+    def __init__(self, rows: Iterator, report: ImportReport, progress: Optional[Callable[[ImportReport], None]]):
+        self._rows = rows
+        self._report = report
+        self._progress = progress
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        self._pending = ""
+
+    def _next_chunk(self) -> bool:
+        for line, row, error in self._rows:
+            self._report.rows_read += 1
+            if self._progress and self._report.rows_read % PROGRESS_EVERY == 0:
+                self._progress(self._report)
+            if error is None:
+                try:
+                    registrant_id, scheduled, participant_type = _parse_row(row)
+                except ValueError as e:
+                    error = str(e)
+            if error is not None:
+                self._report.add_error(line, error)
+                continue
+            self._report.rows_valid += 1
+            self._writer.writerow([line, registrant_id, scheduled.isoformat(), event_day(scheduled).isoformat(),
+                                   participant_type])
+            return True
+        return False
+
+    def read(self, size: int = -1) -> str:
+        while (size < 0 or len(self._pending) < size) and self._next_chunk():
+            self._pending += self._buffer.getvalue()
+            self._buffer.seek(0)
+            self._buffer.truncate()
+        if size < 0:
+            size = len(self._pending)
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+def import_participants(
+    db: Session,
+    stream: IO[bytes],
+    import_format: str = "csv",
+    progress: Optional[Callable[[ImportReport], None]] = None,
+    max_errors: int = settings.PARTICIPANT_IMPORT_MAX_ERRORS
+) -> ImportReport:
+    """
+    Bulk import a participant roster from a CSV (with a header row) or NDJSON stream.
+
+    Rows need registrant_id, date and participant_type. Valid rows are streamed
+    through COPY into a temporary staging table and merged into fnb.participants
+    in one statement: a row for a registrant and event day that is already
+    scheduled updates it, anything else is inserted. Invalid rows are reported,
+    not fatal.
+
+    Args:
+        db (Session): Database session on Postgres
+        stream (IO[bytes]): The uploaded file
+        import_format (str): "csv" or "ndjson"
+        progress: Called with the report every PROGRESS_EVERY rows read
+        max_errors (int): Validation errors kept in the report (all are counted)
+
+    Returns:
+        ImportReport: Rows read, valid rows, inserted and updated counts and errors
+    """
+    if import_format not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported import format: {import_format}")
+
+    report = ImportReport(max_errors)
+    try:
+        db.execute(text(_STAGING_TABLE))
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(_COPY, _CopyStream(_read_rows(stream, import_format), report, progress))
+        finally:
+            cursor.close()
+        report.inserted, report.updated = db.execute(_MERGE).one()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if progress:
+            progress(report)
+
+    roster_cache.invalidate()
+    logger.info(f"Imported participants: {report.rows_valid}/{report.rows_read} valid rows, "
+                f"{report.inserted} inserted, {report.updated} updated, {report.error_count} errors")
+    return report
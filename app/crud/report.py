@@ -0,0 +1,44 @@
+from collections import defaultdict
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Row, func, select
+from sqlalchemy.orm import Session
+
+from app.crud.food_log import MEALS
+from app.models.meal_rollup import MealServedRollup
+
+def get_meals_served(
+    db: Session,
+    day: date,
+    meal: Optional[str] = None,
+    participant_type: Optional[str] = None
+) -> List[Row]:
+    """
+    Meals served on an event day per 15-minute bucket, meal and participant type.
+
+    Reads only fnb.meal_served_rollup, summing each bucket's slots, so the cost
+    depends on the number of buckets, not on how many scans there were.
+    """
+    if meal is not None and meal not in MEALS:
+        raise ValueError(f"Invalid meal. Must be one of: {', '.join(MEALS)}")
+
+    served = func.sum(MealServedRollup.served)
+    query = select(
+        MealServedRollup.bucket_start, MealServedRollup.meal, MealServedRollup.participant_type, served.label("served")
+    ).where(MealServedRollup.event_day == day)
+    if meal is not None:
+        query = query.where(MealServedRollup.meal == meal)
+    if participant_type is not None:
+        query = query.where(MealServedRollup.participant_type == participant_type)
+    query = query.group_by(
+        MealServedRollup.bucket_start, MealServedRollup.meal, MealServedRollup.participant_type
+    ).having(served > 0).order_by(MealServedRollup.bucket_start, MealServedRollup.meal, MealServedRollup.participant_type)
+    return db.execute(query).all()
+
+def meal_totals(buckets: List[Row]) -> Dict[Tuple[str, str], int]:
+    """Served so far per (meal, participant_type)"""
+    totals: Dict[Tuple[str, str], int] = defaultdict(int)
+    for bucket in buckets:
+        totals[(bucket.meal, bucket.participant_type)] += bucket.served
+    return dict(totals)
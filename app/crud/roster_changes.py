@@ -0,0 +1,111 @@
+from datetime import date
+from typing import Dict, Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.models.change_tombstone import ChangeTombstone
+from app.models.food_log import FoodLog
+from app.models.participant import Participant
+
+_ISSUED = text("SELECT fnb.change_versions_issued()")
+
+# Lowest floor key held by a transaction that is still writing roster changes (see models.change_tombstone)
+_OPEN_FLOOR = text("""
+    SELECT min((classid::bigint << 32) | objid::bigint)
+    FROM pg_locks
+    WHERE locktype = 'advisory' AND objsubid = 1
+      AND database = (SELECT oid FROM pg_database WHERE datname = current_database())
+""")
+
+def change_horizon(db: Session) -> int:
+    """
+    Changes with a version up to this one are safe to hand out.
+
+    Versions are assigned when a row is written, not when it commits, so a
+    long transaction (a roster import, say) can commit versions lower than
+    ones a device has already seen. Each open writer holds a lock keyed below
+    every version it takes, so stopping at the lowest such key never skips
+    one. Transactions that do not write roster changes (exports, idle
+    sessions) do not hold the feed back.
+
+    The versions issued are read before the locks: a version issued by then
+    was taken after its writer locked, so that writer is either still listed
+    or committed. Runs on the primary at READ COMMITTED; the replica cannot
+    see the primary's locks.
+    """
+    issued = db.execute(_ISSUED).scalar()
+    floor = db.execute(_OPEN_FLOOR).scalar()
+    return issued if floor is None else min(issued, floor)
+
+def _newer(model, since: int, horizon: int, limit: int, day: Optional[date]):
+    query = select(model).where(model.change_version > since, model.change_version <= horizon)
+    if day is not None:
+        query = query.where(model.event_day == day)
+    return query.order_by(model.change_version).limit(limit + 1)
+
+def get_roster_changes(
+    db: Session,
+    since: int,
+    horizon: int,
+    limit: int = 1000,
+    day: Optional[date] = None
+) -> Dict:
+    """
+    Roster changes after version `since`, oldest first, for scanners that keep
+    a local copy: participants added or changed, the served state of regular
+    food log entries, and deletions of either.
+
+    since=0 returns the whole roster (in pages of `limit`). Clients store
+    next_since and ask again from there; has_more means another page is ready.
+
+    Args:
+        db (Session): Database session on the primary
+        since (int): Last change version the client has applied
+        horizon (int): From change_horizon(db)
+        limit (int): Maximum number of changes to return
+        day (date, optional): Only changes for this event day
+
+    Returns:
+        dict: participants, served and deleted lists, next_since and has_more
+    """
+    participants = db.execute(_newer(Participant, since, horizon, limit, day)).scalars().all()
+    food_logs = db.execute(
+        _newer(FoodLog, since, horizon, limit, day).where(FoodLog.multi_entry.is_(False))
+    ).scalars().all()
+    tombstones = db.execute(_newer(ChangeTombstone, since, horizon, limit, day)).scalars().all()
+
+    changes = sorted(participants + food_logs + tombstones, key=lambda change: change.change_version)
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    result = {
+        "participants": [],
+        "served": [],
+        "deleted": [],
+        "next_since": changes[-1].change_version if changes else since,
+        "has_more": has_more
+    }
+    for change in changes:
+        if isinstance(change, Participant):
+            result["participants"].append({
+                "id": change.id,
+                "registrant_id": change.registrant_id,
+                "event_day": change.event_day,
+                "participant_type": change.participant_type
+            })
+        elif isinstance(change, FoodLog):
+            result["served"].append({
+                "registration_id": change.registration_id,
+                "event_day": change.event_day,
+                "lunch": change.lunch_takenon is not None,
+                "dinner": change.dinner_takenon is not None
+            })
+        else:
+            result["deleted"].append({
+                "kind": change.kind,
+                "id": change.participant_id,
+                "registrant_id": change.registrant_id,
+                "event_day": change.event_day
+            })
+    return result
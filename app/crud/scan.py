@@ -0,0 +1,160 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Optional, Tuple
+import logging
+
+from app.core.error_codes import (
+    ERROR_CODES,
+    INVALID_REGISTRATION_ID,
+    MEAL_TIME_EXPIRED,
+    DUPLICATE_MEAL_ENTRY,
+    INVALID_MEAL_TYPE
+)
+from app.core.meal_timings import meal_timings
+from app.core.event_time import to_event_time, event_now, event_day_start
+from app.core.special_registrations import is_special_registration
+from app.core.responses import row_dict
+from app.crud import error_log as error_log_crud
+from app.crud import food_log as food_log_crud
+from app.crud import participant as participant_crud
+from app.crud import special_meal_log as special_meal_crud
+from app.schemas.error_log import ErrorLogCreate
+from app.schemas.food_log import FoodLogUpdate, FoodLogSchema
+from app.schemas.scan import ScanRequest, ScanVerdict
+
+logger = logging.getLogger(__name__)
+
+def _is_unlimited(scan: ScanRequest) -> bool:
+    """Special registrations and "master" badges may take any number of meals."""
+    return is_special_registration(scan.registration_id) or bool(scan.name and scan.name.lower() == "master")
+
+def _check_meal(scan: ScanRequest, scan_time: datetime) -> Optional[Tuple[str, str]]:
+    """Return (error_code, detail) if the meal type or meal window rules reject the scan."""
+    if not meal_timings.is_served(scan.meal):
+        return INVALID_MEAL_TYPE, f"Invalid meal type: {scan.meal}"
+    if meal_timings.is_meal_early(scan.meal, scan_time):
+        return MEAL_TIME_EXPIRED, f"{meal_timings.get_meal_name(scan.meal)} service has not started yet"
+    if meal_timings.is_meal_late(scan.meal, scan_time):
+        return MEAL_TIME_EXPIRED, ERROR_CODES[MEAL_TIME_EXPIRED]
+    return None
+
+def _error_log(scan: ScanRequest, user_id: int, scan_time: datetime, error_code: str, detail: str) -> ErrorLogCreate:
+    return ErrorLogCreate(
+        user_id=user_id,
+        registrant_id=scan.registration_id,
+        scan_time=scan_time,
+        error=detail,
+        error_code=error_code
+    )
+
+def _food_log_update(scan: ScanRequest, scan_time: datetime) -> FoodLogUpdate:
+    # Only the scanned meal (and the name, if the scanner sent one) is set; the upsert keeps
+    # the other fields and rejects a second stamp.
+    # Unlimited badges get a row per scan, keyed by the scan time rather than the day
+    fields = {scan.meal: 1, f"{scan.meal}_takenon": scan_time}
+    if scan.name is not None:
+        fields["name"] = scan.name
+    return FoodLogUpdate(
+        registration_id=scan.registration_id,
+        date=scan_time if _is_unlimited(scan) else event_day_start(scan_time.date()),
+        **fields
+    )
+
+def _verdict(scan: ScanRequest, scan_time: datetime, participant_type: Optional[str] = None,
+             error: Optional[Tuple[str, str]] = None, food_log=None) -> ScanVerdict:
+    # Built from the validated request and our own row, so skip re-validating them
+    return ScanVerdict.model_construct(
+        accepted=error is None,
+        registration_id=scan.registration_id,
+        meal=scan.meal,
+        scan_time=scan_time,
+        participant_type=participant_type,
+        error_code=error[0] if error else None,
+        detail=error[1] if error else None,
+        food_log=FoodLogSchema.model_construct(**row_dict(food_log, FoodLogSchema)) if food_log is not None else None
+    )
+
+def process_scan(db: Session, scan: ScanRequest, user_id: int, commit: bool = True) -> ScanVerdict:
+    """
+    Validate a badge scan and record it in a single transaction.
+
+    Checks the meal type, the meal window and the participant's eligibility for
+    the day, then upserts the food log (lunch and dinner) or records the special
+    meal; either statement itself rejects duplicate meals. Rejected scans are
+    written to the error log.
+
+    Args:
+        db (Session): Database session
+        scan (ScanRequest): The scan to process
+        user_id (int): ID of the scanner account recording the scan
+        commit (bool): Commit each write; False leaves the transaction to the caller (batch sync)
+
+    Returns:
+        ScanVerdict: Whether the meal was accepted, with the error code if not
+    """
+    # Meal windows and event days are judged in event-local time
+    scan_time = to_event_time(scan.scan_time) if scan.scan_time else event_now()
+    scan_day = scan_time.date().isoformat()
+    participant_type = None
+
+    error = _check_meal(scan, scan_time)
+    if error is None and not _is_unlimited(scan):
+        participant = participant_crud.get_scheduled_participant(db, scan.registration_id, scan_day)
+        if participant is None:
+            error = INVALID_REGISTRATION_ID, ERROR_CODES[INVALID_REGISTRATION_ID]
+        else:
+            participant_type = participant.participant_type
+
+    food_log = None
+    if error is None:
+        try:
+            if scan.meal in food_log_crud.MEALS:
+                food_log = food_log_crud.update_food_log(db, _food_log_update(scan, scan_time), commit=commit)
+            else:
+                special_meal_crud.record_special_meal(db, scan.registration_id, scan.meal, scan_time, name=scan.name,
+                                                      multi_entry=_is_unlimited(scan), commit=commit)
+        except food_log_crud.DuplicateMealError:
+            error = DUPLICATE_MEAL_ENTRY, ERROR_CODES[DUPLICATE_MEAL_ENTRY]
+
+    if error is not None:
+        error_log_crud.create_error_log(db, _error_log(scan, user_id, scan_time, *error), commit=commit)
+        return _verdict(scan, scan_time, participant_type, error=error)
+
+    logger.info(f"Accepted {scan.meal} scan for registration_id={scan.registration_id}")
+    return _verdict(scan, scan_time, participant_type, food_log=food_log)
+
+async def process_scan_async(db: AsyncSession, scan: ScanRequest, user_id: int) -> ScanVerdict:
+    """
+    Validate a badge scan and record it in a single transaction. See process_scan.
+    """
+    # Meal windows and event days are judged in event-local time
+    scan_time = to_event_time(scan.scan_time) if scan.scan_time else event_now()
+    scan_day = scan_time.date().isoformat()
+    participant_type = None
+
+    error = _check_meal(scan, scan_time)
+    if error is None and not _is_unlimited(scan):
+        participant = await participant_crud.get_scheduled_participant_async(db, scan.registration_id, scan_day)
+        if participant is None:
+            error = INVALID_REGISTRATION_ID, ERROR_CODES[INVALID_REGISTRATION_ID]
+        else:
+            participant_type = participant.participant_type
+
+    food_log = None
+    if error is None:
+        try:
+            if scan.meal in food_log_crud.MEALS:
+                food_log = await food_log_crud.update_food_log_async(db, _food_log_update(scan, scan_time))
+            else:
+                await special_meal_crud.record_special_meal_async(db, scan.registration_id, scan.meal, scan_time,
+                                                                  name=scan.name, multi_entry=_is_unlimited(scan))
+        except food_log_crud.DuplicateMealError:
+            error = DUPLICATE_MEAL_ENTRY, ERROR_CODES[DUPLICATE_MEAL_ENTRY]
+
+    if error is not None:
+        await error_log_crud.create_error_log_async(db, _error_log(scan, user_id, scan_time, *error))
+        return _verdict(scan, scan_time, participant_type, error=error)
+
+    logger.info(f"Accepted {scan.meal} scan for registration_id={scan.registration_id}")
+    return _verdict(scan, scan_time, participant_type, food_log=food_log)
@@ -0,0 +1,61 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert
+from datetime import datetime
+
+from app.core.event_time import event_day
+from app.core.live_counters import publish_on_commit
+from app.crud.food_log import DuplicateMealError
+from app.models.special_meal_log import SpecialMealLog
+
+def _record_special_meal_query(registration_id: str, meal: str, taken_on: datetime, name, multi_entry: bool):
+    # Either unique key makes this a duplicate: the meal already served that day, or a replayed unlimited scan
+    return insert(SpecialMealLog).values(
+        registration_id=registration_id,
+        meal=meal,
+        taken_on=taken_on,
+        event_day=event_day(taken_on),
+        name=name,
+        multi_entry=multi_entry
+    ).on_conflict_do_nothing().returning(SpecialMealLog.event_day)
+
+def _duplicate_special_meal_error(registration_id: str, meal: str, taken_on: datetime) -> DuplicateMealError:
+    return DuplicateMealError(
+        f"Duplicate meal entry: {meal} already recorded for registration_id={registration_id} on {event_day(taken_on)}"
+    )
+
+def record_special_meal(db: Session, registration_id: str, meal: str, taken_on: datetime,
+                        name=None, multi_entry: bool = False, commit: bool = True) -> None:
+    """
+    Record a special meal served, in one statement.
+
+    Args:
+        db (Session): Database session
+        registration_id (str): Registration the meal was served to
+        meal (str): Special meal type, as configured in meal_timings.yml
+        taken_on (datetime): When it was served, event-local
+        name (str, optional): Name sent by the scanner
+        multi_entry (bool): Special registration or "master" badge, which may take the meal again
+        commit (bool): Commit here; False leaves the transaction to the caller
+
+    Raises:
+        DuplicateMealError: If the meal was already recorded that day
+    """
+    day = db.execute(_record_special_meal_query(registration_id, meal, taken_on, name, multi_entry)).scalar()
+    if day is None:
+        raise _duplicate_special_meal_error(registration_id, meal, taken_on)
+    publish_on_commit(db, meals=[(day, meal)])
+    if commit:
+        db.commit()
+
+async def record_special_meal_async(db: AsyncSession, registration_id: str, meal: str, taken_on: datetime,
+                                    name=None, multi_entry: bool = False) -> None:
+    """
+    Record a special meal served, in one statement. See record_special_meal.
+    """
+    result = await db.execute(_record_special_meal_query(registration_id, meal, taken_on, name, multi_entry))
+    day = result.scalar()
+    if day is None:
+        raise _duplicate_special_meal_error(registration_id, meal, taken_on)
+    publish_on_commit(db, meals=[(day, meal)])
+    await db.commit()
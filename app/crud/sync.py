@@ -0,0 +1,149 @@
+from sqlalchemy import exists, func, select
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.dialects.postgresql import insert
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from app.core.config import settings
+from app.core.event_time import to_event_time
+from app.crud import scan as scan_crud
+from app.models.scan_sync import ScanSyncEvent
+from app.schemas.sync import ScanSyncEventIn
+
+logger = logging.getLogger(__name__)
+
+SYNC_ACCEPTED = "accepted"
+SYNC_REJECTED = "rejected"
+SYNC_DUPLICATE = "duplicate"
+SYNC_ERROR = "error"
+
+EventKey = Tuple[str, int]
+EventResult = Tuple[str, Optional[str], Optional[str]]
+
+def _record_events_query(events: List[ScanSyncEventIn], user_id: int):
+    # Events already uploaded hit the (device_id, seq) key and are not returned
+    return insert(ScanSyncEvent).values([
+        {
+            "device_id": event.device_id,
+            "seq": event.seq,
+            "registration_id": event.registration_id,
+            "meal": event.meal,
+            "scan_time": to_event_time(event.scan_time),
+            "user_id": user_id
+        }
+        for event in events
+    ]).on_conflict_do_nothing(
+        index_elements=[ScanSyncEvent.device_id, ScanSyncEvent.seq]
+    ).returning(ScanSyncEvent.device_id, ScanSyncEvent.seq)
+
+def _apply_event(db: Session, event: ScanSyncEventIn, user_id: int) -> EventResult:
+    verdict = scan_crud.process_scan(db, event, user_id, commit=False)
+    if verdict.accepted:
+        return SYNC_ACCEPTED, None, None
+    return SYNC_REJECTED, verdict.error_code, verdict.detail
+
+def _apply_chunk(db: Session, chunk: List[ScanSyncEventIn], user_id: int, results: Dict[EventKey, EventResult]) -> None:
+    new_events = {tuple(row) for row in db.execute(_record_events_query(chunk, user_id))}
+    for event in chunk:
+        key = (event.device_id, event.seq)
+        if key in new_events:
+            results[key] = _apply_event(db, event, user_id)
+        else:
+            results[key] = SYNC_DUPLICATE, None, "Already synced"
+    db.commit()
+
+def _apply_one(db: Session, event: ScanSyncEventIn, user_id: int, results: Dict[EventKey, EventResult]) -> None:
+    key = (event.device_id, event.seq)
+    try:
+        if db.execute(_record_events_query([event], user_id)).first() is None:
+            results[key] = SYNC_DUPLICATE, None, "Already synced"
+        else:
+            results[key] = _apply_event(db, event, user_id)
+        db.commit()
+    except Exception as e:
+        logger.error(f"Error syncing scan {key}: {str(e)}", exc_info=True)
+        db.rollback()
+        results[key] = SYNC_ERROR, None, str(e)
+
+def _stored_runs_query(device_ids: List[str]):
+    # Per device, its lowest stored seq and the end of the unbroken run of seqs that starts there
+    following = aliased(ScanSyncEvent)
+    first = select(func.min(following.seq)).where(following.device_id == ScanSyncEvent.device_id).scalar_subquery()
+    return select(ScanSyncEvent.device_id, first, func.min(ScanSyncEvent.seq)).where(
+        ScanSyncEvent.device_id.in_(device_ids),
+        ~exists().where(following.device_id == ScanSyncEvent.device_id, following.seq == ScanSyncEvent.seq + 1)
+    ).group_by(ScanSyncEvent.device_id)
+
+def _high_water_marks(db: Session, events: List[ScanSyncEventIn],
+                      results: Dict[EventKey, EventResult]) -> Dict[str, int]:
+    """
+    Per device, the highest seq such that it and every seq before it are stored.
+
+    Read from scan_sync_events after the upload is applied, so seqs the device
+    has not sent yet (or sent in a failed upload) hold the mark back. Device
+    seqs count up from 0 or 1; a device whose lowest stored seq is above that
+    gets no mark. An event that failed in this upload also caps the mark, in
+    case it sits below everything stored.
+    """
+    failed: Dict[str, int] = {}
+    for (device_id, seq), (status, _, _) in results.items():
+        if status == SYNC_ERROR:
+            failed[device_id] = min(seq, failed.get(device_id, seq))
+
+    marks: Dict[str, int] = {}
+    for device_id, first, run_end in db.execute(_stored_runs_query(sorted({event.device_id for event in events}))):
+        if first > 1:
+            continue
+        mark = min(run_end, failed[device_id] - 1) if device_id in failed else run_end
+        if mark >= first:
+            marks[device_id] = mark
+    return marks
+
+def event_results(events: List[ScanSyncEventIn], results: Dict[EventKey, EventResult]) -> List[EventResult]:
+    """The result for each uploaded event, in upload order; later copies of an event in the same upload are duplicates"""
+    seen = set()
+    ordered = []
+    for event in events:
+        key = (event.device_id, event.seq)
+        ordered.append((SYNC_DUPLICATE, None, "Already synced") if key in seen else results[key])
+        seen.add(key)
+    return ordered
+
+def sync_scans(db: Session, events: List[ScanSyncEventIn], user_id: int,
+               chunk_size: int = settings.SCAN_SYNC_CHUNK_SIZE) -> Tuple[Dict[EventKey, EventResult], Dict[str, int]]:
+    """
+    Apply a batch of scans queued by offline scanners.
+
+    Events are deduplicated on (device_id, seq), both within the batch and
+    against earlier uploads, then applied in scan-time order with the same
+    rules as a live scan. Each chunk of events is one transaction; a chunk that
+    fails as a whole is replayed one event per transaction.
+
+    Args:
+        db (Session): Database session
+        events (List[ScanSyncEventIn]): Uploaded scan events
+        user_id (int): ID of the scanner account uploading them
+        chunk_size (int): Events per transaction
+
+    Returns:
+        Tuple of (status, error_code, detail) per (device_id, seq), and the
+        high-water mark per device (see _high_water_marks); see event_results
+        for one result per event
+    """
+    unique: Dict[EventKey, ScanSyncEventIn] = {}
+    for event in events:
+        unique.setdefault((event.device_id, event.seq), event)
+    ordered = sorted(unique.values(), key=lambda event: (to_event_time(event.scan_time), event.device_id, event.seq))
+
+    results: Dict[EventKey, EventResult] = {}
+    for start in range(0, len(ordered), chunk_size):
+        chunk = ordered[start:start + chunk_size]
+        try:
+            _apply_chunk(db, chunk, user_id, results)
+        except Exception as e:
+            logger.warning(f"Scan sync chunk at event {start} failed, applying events one by one: {str(e)}")
+            db.rollback()
+            for event in chunk:
+                _apply_one(db, event, user_id, results)
+
+    return results, _high_water_marks(db, list(unique.values()), results)
@@ -0,0 +1,26 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import Optional
+from app.models.user import User
+
+def _user_by_username_query(username: str):
+    return select(User).where(User.username == username).limit(1)
+
+def get_user_by_username(db: Session, username: str) -> Optional[User]:
+    return db.execute(_user_by_username_query(username)).scalars().first()
+
+def set_device_id(db: Session, user: User, device_id: str) -> User:
+    user.device_id = device_id
+    db.commit()
+    db.refresh(user)
+    return user
+
+async def get_user_by_username_async(db: AsyncSession, username: str) -> Optional[User]:
+    result = await db.execute(_user_by_username_query(username))
+    return result.scalars().first()
+
+async def set_device_id_async(db: AsyncSession, user: User, device_id: str) -> User:
+    user.device_id = device_id
+    await db.commit()
+    return user
@@ -3,4 +3,8 @@ from app.db.base import Base  # noqa
 from app.models.user import User  # noqa
 from app.models.food_log import FoodLog  # noqa
 from app.models.participant import Participant  # noqa
-from app.models.error_log import ErrorLog  # noqa 
\ No newline at end of file
+from app.models.error_log import ErrorLog  # noqa
+from app.models.scan_sync import ScanSyncEvent  # noqa
+from app.models.meal_rollup import MealServedRollup  # noqa
+from app.models.change_tombstone import ChangeTombstone  # noqa
+from app.models.special_meal_log import SpecialMealLog  # noqa
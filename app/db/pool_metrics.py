@@ -0,0 +1,172 @@
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Checkouts made while handling the current request; None outside a request
+_request_checkouts: ContextVar[Optional[List[int]]] = ContextVar("request_checkouts", default=None)
+
+class RequestCheckoutMetrics:
+    """Distribution of pooled connections checked out per HTTP request"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.checkouts = 0
+        self.max_per_request = 0
+        self.histogram: Dict[str, int] = {"0": 0, "1": 0, "2": 0, "3+": 0}
+
+    def record(self, checkouts: int) -> None:
+        with self._lock:
+            self.requests += 1
+            self.checkouts += checkouts
+            self.max_per_request = max(self.max_per_request, checkouts)
+            self.histogram[str(checkouts) if checkouts < 3 else "3+"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "checkouts": self.checkouts,
+                "mean_per_request": round(self.checkouts / self.requests, 3) if self.requests else None,
+                "max_per_request": self.max_per_request,
+                "histogram": dict(self.histogram)
+            }
+
+request_checkout_metrics = RequestCheckoutMetrics()
+
+def _count_request_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+    # Sync endpoints run in the threadpool with a copy of the request's context,
+    # so the list set by the middleware is shared and can be appended to
+    checkouts = _request_checkouts.get()
+    if checkouts is not None:
+        checkouts.append(1)
+
+def track_request_checkouts(engine) -> None:
+    """Count this engine's pool checkouts against the request that made them"""
+    event.listen(engine, "checkout", _count_request_checkout)
+
+class RequestCheckoutMiddleware:
+    """Records how many pooled connections each HTTP request checked out"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        checkouts: List[int] = []
+        token = _request_checkouts.set(checkouts)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_checkouts.reset(token)
+            request_checkout_metrics.record(len(checkouts))
+
+class PoolMetrics:
+    """Checkout wait, usage and timeout counters for one engine's connection pool"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.overflow_checkouts = 0
+        self.peak_checked_out = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        with self._lock:
+            self.checkouts += 1
+            checked_out = self.pool.checkedout()
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+            if checked_out > self.pool.size():
+                self.overflow_checkouts += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.checkins += 1
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def stats(self) -> Dict[str, Any]:
+        pool = self.pool
+        with self._lock:
+            return {
+                "pool_size": pool.size() if pool is not None else None,
+                "max_overflow": getattr(pool, "_max_overflow", None),
+                "checked_out": pool.checkedout() if pool is not None else 0,
+                "idle": pool.checkedin() if pool is not None else 0,
+                "overflow": max(pool.overflow(), 0) if pool is not None else 0,
+                "peak_checked_out": self.peak_checked_out,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "overflow_checkouts": self.overflow_checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_mean": round(self.wait_seconds_total * 1000 / self.checkouts, 3) if self.checkouts else None,
+                "wait_ms_max": round(self.wait_seconds_max * 1000, 3)
+            }
+
+pool_metrics: Dict[str, PoolMetrics] = {}
+
+class _InstrumentedPoolMixin:
+    """Times how long callers wait for a connection and counts pool timeouts"""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        if self.metrics is not None:
+            self.metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # dispose() and pre-ping invalidation swap in a fresh pool; keep reporting to the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        if self.metrics is not None:
+            self.metrics.pool = pool
+        return pool
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+def instrument_pool(name: str, engine) -> PoolMetrics:
+    """Attach pool metrics to a (sync) engine and register them under name for /admin/metrics"""
+    metrics = PoolMetrics(name)
+    metrics.pool = engine.pool
+    engine.pool.metrics = metrics
+    event.listen(engine, "checkout", metrics._on_checkout)
+    event.listen(engine, "checkin", metrics._on_checkin)
+    event.listen(engine, "connect", metrics._on_connect)
+    pool_metrics[name] = metrics
+    return metrics
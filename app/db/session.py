@@ -1,32 +1,185 @@
+import logging
+from time import monotonic
+
+from fastapi import Depends
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import QueuePool
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.db.pool_metrics import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    instrument_pool,
+    track_request_checkouts
+)
+
+logger = logging.getLogger(__name__)
+
+def _create_pooled_engine(database_url: str):
+    """psycopg2 engine with connection pooling and timeout settings optimized for Azure PostgreSQL"""
+    return create_engine(
+        database_url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.AZURE_POSTGRES_POOL_SIZE,
+        max_overflow=settings.AZURE_POSTGRES_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,  # Seconds to wait before giving up on getting a connection from the pool
+        pool_pre_ping=settings.DB_POOL_PRE_PING,  # Connection health check on checkout
+        pool_recycle=settings.DB_POOL_RECYCLE,  # Recycle connections older than this many seconds
+        connect_args={
+            "connect_timeout": settings.AZURE_POSTGRES_CONNECTION_TIMEOUT,  # Seconds to wait for establishing a connection
+            "keepalives": 1,  # Enable TCP keepalive
+            "keepalives_idle": 30,  # Seconds between TCP keepalive probes
+            "keepalives_interval": 10,  # Seconds between TCP keepalive retransmits
+            "keepalives_count": 5,  # Number of TCP keepalive retransmits
+            "sslmode": settings.AZURE_POSTGRES_SSL_MODE  # Require SSL for Azure PostgreSQL
+        }
+    )
 
-# Create engine with connection pooling and timeout settings optimized for Azure PostgreSQL
-engine = create_engine(
-    settings.database_url,
-    poolclass=QueuePool,
-    pool_size=20,  # Increased pool size for better performance
-    max_overflow=30,  # Increased max overflow for handling more concurrent connections
-    pool_timeout=30,  # Seconds to wait before giving up on getting a connection from the pool
-    pool_pre_ping=True,  # Enable connection health checks
-    pool_recycle=1800,  # Recycle connections after 30 minutes
+engine = _create_pooled_engine(settings.database_url)
+instrument_pool("sync", engine)
+track_request_checkouts(engine)
+
+# Read replica for read-only endpoints (see get_read_db); None when DATABASE_READ_URL is unset
+read_engine = _create_pooled_engine(settings.database_read_url) if settings.database_read_url else None
+if read_engine is not None:
+    instrument_pool("read", read_engine)
+    track_request_checkouts(read_engine)
+
+# Exports read through a server-side cursor for as long as the download takes, so they get a small
+# pool of their own (on the replica when there is one) instead of tying up the request pool. No
+# overflow: the pool is the hard cap on export connections (see crud.export.export_limit)
+export_engine = create_engine(
+    settings.database_read_url or settings.database_url,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.EXPORT_MAX_CONCURRENT,
+    max_overflow=0,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_recycle=settings.DB_POOL_RECYCLE,
     connect_args={
-        "connect_timeout": 10,  # Seconds to wait for establishing a connection
-        "keepalives": 1,  # Enable TCP keepalive
-        "keepalives_idle": 30,  # Seconds between TCP keepalive probes
-        "keepalives_interval": 10,  # Seconds between TCP keepalive retransmits
-        "keepalives_count": 5,  # Number of TCP keepalive retransmits
-        "sslmode": "require"  # Require SSL for Azure PostgreSQL
+        "connect_timeout": settings.AZURE_POSTGRES_CONNECTION_TIMEOUT,
+        "sslmode": settings.AZURE_POSTGRES_SSL_MODE
     }
 )
+instrument_pool("export", export_engine)
+
+class ReplicaHealth:
+    """Takes the replica out of rotation for a while after a connection failure"""
+
+    def __init__(self, recheck_seconds: int):
+        self.recheck_seconds = recheck_seconds
+        self._down_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return monotonic() >= self._down_until
+
+    def mark_down(self) -> None:
+        self._down_until = monotonic() + self.recheck_seconds
+
+replica_health = ReplicaHealth(settings.DB_READ_RECHECK_SECONDS)
+
+# Registrations written recently by this worker; their reads stay on the primary until the replica catches up.
+# Per process: with several workers, a read served by a worker that did not make the write can be up to
+# the replica lag stale. Deployments that need read-your-writes across requests run one worker per instance
+# when DATABASE_READ_URL is set (or leave it unset)
+recent_writes = TTLCache(maxsize=10000, ttl=settings.DB_READ_YOUR_WRITES_SECONDS)
+
+def record_write(registration_id) -> None:
+    recent_writes.set(str(registration_id), True)
+
+class RoutingSession(Session):
+    """
+    Sends reads to the replica once the session is marked read_only, everything
+    else (and every flush) to the primary.
+    """
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            read_engine is not None
+            and self.info.get("read_only")
+            and not self._flushing
+            and replica_health.available
+        ):
+            return read_engine
+        return super().get_bind(mapper, clause=clause, **kw)
+
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
+
+def use_replica(db: Session, *registration_ids) -> bool:
+    """
+    Route the rest of this session's reads to the replica.
+
+    Stays on the primary when there is no replica, the replica is marked down,
+    or one of registration_ids was written recently by this worker
+    (read-your-writes; see recent_writes). A replica connection is taken
+    straight away so an unreachable replica, or an exhausted replica pool,
+    falls back to the primary instead of failing the request.
+    """
+    if read_engine is None or not replica_health.available:
+        return False
+    if any(recent_writes.get(str(registration_id)) is not None for registration_id in registration_ids):
+        return False
+    db.info["read_only"] = True
+    try:
+        db.connection(bind_arguments={"bind": read_engine})
+    except (DBAPIError, PoolTimeoutError) as e:
+        logger.warning(f"Read replica unavailable, using primary: {str(e)}")
+        # A full pool is load, not an outage, so only connection failures take the replica out of rotation
+        if isinstance(e, DBAPIError):
+            replica_health.mark_down()
+        db.info.pop("read_only", None)
+        db.rollback()
+        return False
+    return True
+
+def get_async_database_url(database_url: str) -> str:
+    """Rewrite a psycopg2 DATABASE_URL for asyncpg, which takes ssl as a connect arg instead of sslmode"""
+    url = make_url(database_url).set(drivername="postgresql+asyncpg").difference_update_query(["sslmode"])
+    return url.render_as_string(hide_password=False)
+
+# asyncpg engine for the async request path (enabled with DB_ASYNC); connects lazily
+async_engine = create_async_engine(
+    get_async_database_url(settings.database_url),
+    poolclass=InstrumentedAsyncQueuePool,
+    pool_size=settings.AZURE_POSTGRES_POOL_SIZE,
+    max_overflow=settings.AZURE_POSTGRES_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    connect_args={
+        "timeout": settings.AZURE_POSTGRES_CONNECTION_TIMEOUT,  # Seconds to wait for establishing a connection
+        "ssl": settings.AZURE_POSTGRES_SSL_MODE  # Require SSL for Azure PostgreSQL
+    }
+)
+
+# Objects stay usable after commit so async code never triggers an implicit (blocking) refresh
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+instrument_pool("async", async_engine.sync_engine)
+track_request_checkouts(async_engine.sync_engine)
 
 def get_db():
+    """
+    Request-scoped database session. Every router and get_current_user depend on
+    this one function, so FastAPI's dependency cache gives each request one session.
+    """
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+def get_read_db(db: Session = Depends(get_db)) -> Session:
+    """
+    The request session with reads routed to the replica, for read-only endpoints.
+    Endpoints that must see a registration's latest write call use_replica on get_db instead.
+    """
+    use_replica(db)
+    return db
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
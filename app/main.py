@@ -9,10 +9,16 @@ import logging
 from passlib.context import CryptContext
 import os
 from dotenv import load_dotenv
+import asyncio
 
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.core.security import ACCESS_TOKEN_HEADER
+from app.core.roster_cache import run_roster_refresher
+from app.core.error_log_buffer import error_log_buffer
+from app.core.live_counters import live_counters
 from app.db.session import engine, SessionLocal
+from app.db.pool_metrics import RequestCheckoutMiddleware
 from app.db.base import Base
 
 # Load environment variables
@@ -38,9 +44,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],  # Explicitly specify allowed methods
     allow_headers=["Authorization", "Content-Type", "Accept"],  # Explicitly specify allowed headers
-    expose_headers=["Content-Type"]
+    expose_headers=["Content-Type", ACCESS_TOKEN_HEADER]
 )
 
+# Track pooled connections checked out per request
+app.add_middleware(RequestCheckoutMiddleware)
+
 # Custom exception handler
 @app.exception_handler(Exception)
 async def custom_exception_handler(request: Request, exc: Exception):
@@ -54,9 +63,25 @@ async def custom_exception_handler(request: Request, exc: Exception):
         response.headers["Access-Control-Allow-Origin"] = origin
     response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
     response.headers["Access-Control-Allow-Headers"] = "Authorization, Content-Type, Accept"
-    response.headers["Access-Control-Expose-Headers"] = "Content-Type"
+    response.headers["Access-Control-Expose-Headers"] = f"Content-Type, {ACCESS_TOKEN_HEADER}"
     return response
 
+background_tasks = []
+
+@app.on_event("startup")
+async def start_background_tasks():
+    if settings.ROSTER_CACHE_ENABLED:
+        background_tasks.append(asyncio.create_task(run_roster_refresher()))
+    background_tasks.append(asyncio.create_task(error_log_buffer.run()))
+    background_tasks.append(asyncio.create_task(live_counters.run()))
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    for task in background_tasks:
+        task.cancel()
+    # Write out error logs still queued
+    await error_log_buffer.stop()
+
 # Password verification function
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
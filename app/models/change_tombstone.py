@@ -0,0 +1,116 @@
+from sqlalchemy import DDL, BigInteger, Column, Date, DateTime, Integer, Sequence, String, event
+from app.db.base_class import Base
+
+# Shared by participants, food_logs and tombstones, so one number orders every roster change
+change_version_seq = Sequence("change_version_seq", schema="fnb", metadata=Base.metadata)
+
+class ChangeTombstone(Base):
+    """A deleted participant or food log, kept so the roster change feed can report the deletion"""
+    __tablename__ = "change_tombstones"
+    __table_args__ = {"schema": "fnb"}
+
+    change_version = Column(BigInteger, primary_key=True)
+    changed_at = Column(DateTime(timezone=True), nullable=False)
+    kind = Column(String(20), nullable=False)  # participant or food_log
+    participant_id = Column(Integer)
+    registrant_id = Column(String, nullable=False)
+    event_day = Column(Date)
+
+# Versions are taken when a row is written but become visible when it commits, so a reader
+# must not pass a version an open transaction may still commit. On its first roster change a
+# transaction takes a shared advisory lock keyed by the number of versions issued so far; every
+# version it takes is above that key, so readers stop at the lowest key held (see crud.roster_changes).
+# Only transactions that write these tables hold such a lock; single-bigint advisory lock keys in
+# this database are reserved for it.
+# Migrations keep their own copy of this SQL as it was at their revision.
+CHANGE_VERSION_FUNCTIONS = DDL("""
+CREATE OR REPLACE FUNCTION fnb.change_versions_issued() RETURNS bigint AS $$
+    SELECT CASE WHEN is_called THEN last_value ELSE last_value - 1 END FROM fnb.change_version_seq
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION fnb.next_change_version() RETURNS bigint AS $$
+DECLARE
+    issued bigint;
+BEGIN
+    IF coalesce(current_setting('fnb.change_version_floor', true), '') = '' THEN
+        issued := fnb.change_versions_issued();
+        PERFORM pg_advisory_xact_lock_shared(issued);
+        PERFORM set_config('fnb.change_version_floor', issued::text, true);
+    END IF;
+    RETURN nextval('fnb.change_version_seq');
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fnb.stamp_change_version() RETURNS trigger AS $$
+BEGIN
+    NEW.change_version := fnb.next_change_version();
+    NEW.changed_at := clock_timestamp();
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fnb.participant_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO fnb.change_tombstones (change_version, changed_at, kind, participant_id, registrant_id, event_day)
+    VALUES (fnb.next_change_version(), clock_timestamp(), 'participant', OLD.id, OLD.registrant_id,
+            OLD.event_day);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fnb.food_log_tombstone() RETURNS trigger AS $$
+BEGIN
+    IF NOT OLD.multi_entry THEN
+        INSERT INTO fnb.change_tombstones (change_version, changed_at, kind, registrant_id, event_day)
+        VALUES (fnb.next_change_version(), clock_timestamp(), 'food_log', OLD.registration_id, OLD.event_day);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+""")
+
+# Food logs are on the scan path, so they are only versioned when the feed's view of them changes:
+# a regular entry is added, or one of its meals goes from unserved to served (or back). Multi-entry
+# rows, which the feed leaves out, and updates that only touch names, flags or an existing stamp
+# skip the trigger function, with its advisory lock and sequence call, in the WHEN clause.
+CHANGE_VERSION_TRIGGERS = DDL("""
+DROP TRIGGER IF EXISTS participants_change_version ON fnb.participants;
+CREATE TRIGGER participants_change_version
+BEFORE INSERT OR UPDATE ON fnb.participants
+FOR EACH ROW EXECUTE FUNCTION fnb.stamp_change_version();
+
+DROP TRIGGER IF EXISTS participants_tombstone ON fnb.participants;
+CREATE TRIGGER participants_tombstone
+AFTER DELETE ON fnb.participants
+FOR EACH ROW EXECUTE FUNCTION fnb.participant_tombstone();
+
+DROP TRIGGER IF EXISTS food_logs_change_version ON fnb.food_logs;
+CREATE TRIGGER food_logs_change_version
+BEFORE INSERT ON fnb.food_logs
+FOR EACH ROW WHEN (NOT NEW.multi_entry)
+EXECUTE FUNCTION fnb.stamp_change_version();
+
+DROP TRIGGER IF EXISTS food_logs_served_change_version ON fnb.food_logs;
+CREATE TRIGGER food_logs_served_change_version
+BEFORE UPDATE ON fnb.food_logs
+FOR EACH ROW WHEN (NOT NEW.multi_entry AND (
+    (OLD.lunch_takenon IS NULL) <> (NEW.lunch_takenon IS NULL)
+    OR (OLD.dinner_takenon IS NULL) <> (NEW.dinner_takenon IS NULL)
+    OR OLD.registration_id IS DISTINCT FROM NEW.registration_id
+    OR OLD.event_day IS DISTINCT FROM NEW.event_day
+    OR OLD.multi_entry
+))
+EXECUTE FUNCTION fnb.stamp_change_version();
+
+DROP TRIGGER IF EXISTS food_logs_tombstone ON fnb.food_logs;
+CREATE TRIGGER food_logs_tombstone
+AFTER DELETE ON fnb.food_logs
+FOR EACH ROW EXECUTE FUNCTION fnb.food_log_tombstone();
+""")
+
+def _creating_tombstones(ddl, target, bind, tables=None, **kw) -> bool:
+    return tables is not None and ChangeTombstone.__table__ in tables
+
+# create_all (tests, fresh databases) installs the triggers along with the tombstone table; migrations do it themselves
+for ddl in (CHANGE_VERSION_FUNCTIONS, CHANGE_VERSION_TRIGGERS):
+    event.listen(Base.metadata, "after_create", ddl.execute_if(dialect="postgresql", callable_=_creating_tombstones))
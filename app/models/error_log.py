@@ -1,10 +1,17 @@
-from sqlalchemy import Column, Integer, DateTime, Text, ForeignKey, String
+from sqlalchemy import Column, Integer, DateTime, Text, ForeignKey, String, Index
 from app.db.base_class import Base
 from datetime import datetime
 
 class ErrorLog(Base):
     __tablename__ = "error_logs"
-    __table_args__ = {"schema": "fnb"}
+    __table_args__ = (
+        # Backs keyset pagination of the error log listing (newest first)
+        Index('ix_fnb_error_logs_scan_time_id', 'scan_time', 'id'),
+        # The listing's common filters, each followed by a scan_time range
+        Index('ix_fnb_error_logs_error_code_scan_time', 'error_code', 'scan_time'),
+        Index('ix_fnb_error_logs_user_id_scan_time', 'user_id', 'scan_time'),
+        {"schema": "fnb"}
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, index=True)
@@ -1,17 +1,36 @@
-from sqlalchemy import Column, Integer, String, DateTime, PrimaryKeyConstraint
+from sqlalchemy import BigInteger, Boolean, Column, Integer, String, DateTime, Date, Index, PrimaryKeyConstraint, text
+from sqlalchemy.orm import validates
 from app.db.base import Base
+from app.core.event_time import event_day
 
 class FoodLog(Base):
     __tablename__ = "food_logs"
     __table_args__ = (
         PrimaryKeyConstraint('registration_id', 'date', name='food_logs_pkey'),
+        Index('ix_fnb_food_logs_registration_id_event_day', 'registration_id', 'event_day'),
+        # One regular entry per registration and day; conflict target of the food log upsert
+        Index('uq_fnb_food_logs_registration_id_event_day', 'registration_id', 'event_day',
+              unique=True, postgresql_where=text('NOT multi_entry'), sqlite_where=text('NOT multi_entry')),
         {"schema": "fnb"}
     )
 
     name = Column(String)
     registration_id = Column(String, nullable=False, index=True)
     date = Column(DateTime(timezone=True), nullable=False, index=True)
+    # Event-local day of `date`, stored so lookups can use a plain index instead of date(...)
+    event_day = Column(Date, nullable=False)
     lunch = Column(Integer)
     dinner = Column(Integer)
     lunch_takenon = Column(DateTime(timezone=True))
-    dinner_takenon = Column(DateTime(timezone=True)) 
\ No newline at end of file
+    dinner_takenon = Column(DateTime(timezone=True))
+    # Special registrations and "master" badges get a row per meal instead of one per day
+    multi_entry = Column(Boolean, nullable=False, default=False, server_default=text('false'))
+    # Set by trigger when a regular entry's served meals change; orders the roster change feed
+    # (see models.change_tombstone)
+    change_version = Column(BigInteger, index=True)
+    changed_at = Column(DateTime(timezone=True))
+
+    @validates('date')
+    def _set_event_day(self, key, value):
+        self.event_day = event_day(value) if value is not None else None
+        return value
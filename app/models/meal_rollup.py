@@ -0,0 +1,97 @@
+from sqlalchemy import DDL, Column, Date, DateTime, Integer, PrimaryKeyConstraint, SmallInteger, String, event, text
+from app.db.base_class import Base
+
+# Meals served are counted in buckets of this many minutes
+BUCKET_MINUTES = 15
+# participant_type of food logs whose registration is not on that day's schedule
+UNSCHEDULED = "Unscheduled"
+# Counter rows per bucket; each database connection writes to one of them
+ROLLUP_SLOTS = 16
+
+class MealServedRollup(Base):
+    """
+    Meals served per event day, meal, participant type and 15-minute bucket.
+
+    Kept up to date by the food_logs trigger below, in the transaction of the
+    write itself, so reports read a few hundred rows instead of counting scans.
+    The participant type is the one scheduled when the meal was recorded.
+
+    Each bucket is spread over ROLLUP_SLOTS rows, chosen by the writing
+    connection, and readers sum them. With a single row per bucket, every scan
+    in the lunch rush would queue on the same row lock until its transaction
+    committed, and 500-item sync and bulk chunks would hold it throughout
+    (and deadlock when they reach buckets in different orders).
+    """
+    __tablename__ = "meal_served_rollup"
+    __table_args__ = (
+        PrimaryKeyConstraint('event_day', 'meal', 'participant_type', 'bucket_start', 'slot',
+                             name='meal_served_rollup_pkey'),
+        {"schema": "fnb"}
+    )
+
+    event_day = Column(Date, nullable=False)
+    meal = Column(String(20), nullable=False)
+    participant_type = Column(String(50), nullable=False)
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    slot = Column(SmallInteger, nullable=False, server_default=text('0'))
+    served = Column(Integer, nullable=False, server_default=text('0'))
+
+# For each meal, a *_takenon that appears counts +1 in its bucket and one that goes away (or moves) -1.
+# Works for inserts, upserts, bulk writes and deletes alike. The slot follows the connection, so a
+# transaction keeps to one row per bucket and concurrent ones mostly touch different rows; a -1 may
+# land in another slot than its +1, which is fine since only the sum is read.
+# Migrations keep their own copy of this SQL as it was at their revision.
+ROLLUP_FUNCTIONS = DDL(f"""
+CREATE OR REPLACE FUNCTION fnb.bump_meal_served(day date, registration text, meal text, taken timestamptz,
+                                                delta integer) RETURNS void AS $$
+    INSERT INTO fnb.meal_served_rollup AS r (event_day, meal, participant_type, bucket_start, slot, served)
+    VALUES (
+        day,
+        meal,
+        COALESCE((SELECT p.participant_type FROM fnb.participants p
+                  WHERE p.registrant_id = registration AND p.event_day = day
+                  LIMIT 1), '{UNSCHEDULED}'),
+        to_timestamp(floor(extract(epoch FROM taken) / {BUCKET_MINUTES * 60}) * {BUCKET_MINUTES * 60}),
+        pg_backend_pid() % {ROLLUP_SLOTS},
+        delta
+    )
+    ON CONFLICT ON CONSTRAINT meal_served_rollup_pkey
+    DO UPDATE SET served = r.served + EXCLUDED.served
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION fnb.food_logs_meal_rollup() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        IF OLD.lunch_takenon IS NOT NULL AND (TG_OP = 'DELETE' OR NEW.lunch_takenon IS DISTINCT FROM OLD.lunch_takenon) THEN
+            PERFORM fnb.bump_meal_served(OLD.event_day, OLD.registration_id, 'lunch', OLD.lunch_takenon, -1);
+        END IF;
+        IF OLD.dinner_takenon IS NOT NULL AND (TG_OP = 'DELETE' OR NEW.dinner_takenon IS DISTINCT FROM OLD.dinner_takenon) THEN
+            PERFORM fnb.bump_meal_served(OLD.event_day, OLD.registration_id, 'dinner', OLD.dinner_takenon, -1);
+        END IF;
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        IF NEW.lunch_takenon IS NOT NULL AND (TG_OP = 'INSERT' OR NEW.lunch_takenon IS DISTINCT FROM OLD.lunch_takenon) THEN
+            PERFORM fnb.bump_meal_served(NEW.event_day, NEW.registration_id, 'lunch', NEW.lunch_takenon, 1);
+        END IF;
+        IF NEW.dinner_takenon IS NOT NULL AND (TG_OP = 'INSERT' OR NEW.dinner_takenon IS DISTINCT FROM OLD.dinner_takenon) THEN
+            PERFORM fnb.bump_meal_served(NEW.event_day, NEW.registration_id, 'dinner', NEW.dinner_takenon, 1);
+        END IF;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+""")
+
+ROLLUP_TRIGGER = DDL("""
+DROP TRIGGER IF EXISTS food_logs_meal_rollup ON fnb.food_logs;
+CREATE TRIGGER food_logs_meal_rollup
+AFTER INSERT OR UPDATE OF lunch_takenon, dinner_takenon OR DELETE ON fnb.food_logs
+FOR EACH ROW EXECUTE FUNCTION fnb.food_logs_meal_rollup();
+""")
+
+def _creating_rollup(ddl, target, bind, tables=None, **kw) -> bool:
+    return tables is not None and MealServedRollup.__table__ in tables
+
+# create_all (tests, fresh databases) installs the trigger along with the rollup table; migrations do it themselves
+for ddl in (ROLLUP_FUNCTIONS, ROLLUP_TRIGGER):
+    event.listen(Base.metadata, "after_create", ddl.execute_if(dialect="postgresql", callable_=_creating_rollup))
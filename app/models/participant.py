@@ -1,12 +1,27 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, Date, Index
+from sqlalchemy.orm import validates
 from datetime import datetime
 from app.db.base_class import Base
+from app.core.event_time import event_day
 
 class Participant(Base):
     __tablename__ = "participants"
-    __table_args__ = {"schema": "fnb"}
+    __table_args__ = (
+        Index('ix_fnb_participants_registrant_id_event_day', 'registrant_id', 'event_day'),
+        {"schema": "fnb"}
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     registrant_id = Column(String, index=True)
     date = Column(DateTime(timezone=True), index=True)
-    participant_type = Column(String(50), index=True)
\ No newline at end of file
+    # Event-local day of `date`, stored so the schedule lookup is a single index probe
+    event_day = Column(Date)
+    participant_type = Column(String(50), index=True)
+    # Set by trigger on every write; orders the roster change feed (see models.change_tombstone)
+    change_version = Column(BigInteger, index=True)
+    changed_at = Column(DateTime(timezone=True))
+
+    @validates('date')
+    def _set_event_day(self, key, value):
+        self.event_day = event_day(value) if value is not None else None
+        return value
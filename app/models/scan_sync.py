@@ -0,0 +1,18 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, PrimaryKeyConstraint, String, func
+from app.db.base_class import Base
+
+class ScanSyncEvent(Base):
+    """Scan events uploaded by offline scanners, keyed by the device's own sequence number"""
+    __tablename__ = "scan_sync_events"
+    __table_args__ = (
+        PrimaryKeyConstraint('device_id', 'seq', name='scan_sync_events_pkey'),
+        {"schema": "fnb"}
+    )
+
+    device_id = Column(String(100), nullable=False)
+    seq = Column(BigInteger, nullable=False)
+    registration_id = Column(String, nullable=False)
+    meal = Column(String(20), nullable=False)
+    scan_time = Column(DateTime(timezone=True), nullable=False)
+    user_id = Column(Integer)
+    received_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
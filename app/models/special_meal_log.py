@@ -0,0 +1,28 @@
+from sqlalchemy import Boolean, Column, Date, DateTime, Index, PrimaryKeyConstraint, String, text
+from app.db.base_class import Base
+
+class SpecialMealLog(Base):
+    """
+    A special meal (special_meals in meal_timings.yml, e.g. breakfast) served to a registration.
+
+    food_logs has columns for lunch and dinner only, so special meals are
+    recorded here, a row per meal served.
+    """
+    __tablename__ = "special_meal_logs"
+    __table_args__ = (
+        # A replayed scan of an unlimited badge has the same key as the one it repeats
+        PrimaryKeyConstraint('registration_id', 'meal', 'taken_on', name='special_meal_logs_pkey'),
+        # Once per registration, day and meal, except for unlimited badges
+        Index('uq_fnb_special_meal_logs_registration_id_event_day_meal', 'registration_id', 'event_day', 'meal',
+              unique=True, postgresql_where=text('NOT multi_entry'), sqlite_where=text('NOT multi_entry')),
+        Index('ix_fnb_special_meal_logs_event_day_meal', 'event_day', 'meal'),
+        {"schema": "fnb"}
+    )
+
+    registration_id = Column(String, nullable=False)
+    meal = Column(String(20), nullable=False)
+    taken_on = Column(DateTime(timezone=True), nullable=False)
+    event_day = Column(Date, nullable=False)
+    name = Column(String)
+    # Special registrations and "master" badges may take the meal any number of times
+    multi_entry = Column(Boolean, nullable=False, server_default=text('false'))
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, field_validator
 from datetime import datetime
 from typing import Optional, List, Union
 import re
@@ -13,7 +13,8 @@ class ErrorLogBase(BaseModel):
     error_code: str
     scan_time: datetime
 
-    @validator('error_code')
+    @field_validator('error_code')
+    @classmethod
     def validate_error_code(cls, v):
         if not re.match(r'^[0-9]{2}$', v):
             raise ValueError('Error code must be a two-digit number (e.g., 01, 02, 03)')
@@ -34,15 +35,23 @@ class ErrorLogResponse(BaseModel):
     error: str
     error_code: str
     scan_time: datetime
-    access_token: str
+    access_token: Optional[str] = None
 
     class Config:
         from_attributes = True
 
 class ErrorLogListResponse(BaseModel):
-    error_logs: List[ErrorLogResponse]
+    error_logs: List[ErrorLogSchema]
+    # Pass as ?cursor= to get the next page; None on the last page
+    next_cursor: Optional[str] = None
     detail: Optional[str] = None
-    access_token: str
+    access_token: Optional[str] = None
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+class ErrorLogBatchResponse(BaseModel):
+    # The first `accepted` items were queued; the rest were dropped because the buffer was full
+    accepted: int
+    dropped: int
+    access_token: Optional[str] = None
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
 from typing import Optional, List, Union, Any
 
@@ -22,7 +22,8 @@ class FoodLogBase(BaseModel):
     lunch_takenon: Optional[datetime] = None
     dinner_takenon: Optional[datetime] = None
 
-    @validator('registration_id', pre=True)
+    @field_validator('registration_id', mode='before')
+    @classmethod
     def convert_registration_id(cls, v):
         # Convert to string if it's not None
         return str(v) if v is not None else v
@@ -53,7 +54,20 @@ class FoodLogSchema(FoodLogBase):
 class FoodLogListResponse(BaseModel):
     food_logs: List[FoodLogSchema]
     detail: Optional[str] = None
-    access_token: str
+    access_token: Optional[str] = None
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+class FoodLogBulkItemResult(BaseModel):
+    index: int
+    registration_id: str
+    status: str  # accepted, duplicate or error
+    detail: Optional[str] = None
+
+class FoodLogBulkUpdateResponse(BaseModel):
+    results: List[FoodLogBulkItemResult]
+    accepted: int
+    duplicates: int
+    errors: int
+    access_token: Optional[str] = None
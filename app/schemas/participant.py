@@ -1,6 +1,6 @@
-from pydantic import BaseModel
-from datetime import datetime
-from typing import Optional, Union
+from pydantic import BaseModel, field_validator
+from datetime import date, datetime
+from typing import List, Optional, Union
 
 # Schema for detail responses when no data is found
 class DetailResponse(BaseModel):
@@ -32,10 +32,16 @@ class ParticipantDataResponse(BaseModel):
         from_attributes = True
 
 class ParticipantBase(BaseModel):
-    registrant_id: int
+    registrant_id: Union[str, int]
     date: datetime
     participant_type: str
 
+    @field_validator('registrant_id', mode='before')
+    @classmethod
+    def convert_registrant_id(cls, v):
+        # Stored as a string, like food_logs.registration_id
+        return str(v).strip() if v is not None else v
+
 class ParticipantCreate(ParticipantBase):
     pass
 
@@ -51,4 +57,43 @@ class ParticipantListResponse(BaseModel):
     access_token: Optional[str] = None
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+class ParticipantImportError(BaseModel):
+    line: int
+    error: str
+
+class ParticipantImportResponse(BaseModel):
+    rows_read: int
+    rows_valid: int
+    inserted: int
+    updated: int
+    error_count: int
+    errors: List[ParticipantImportError]
+    access_token: Optional[str] = None
+
+class RosterParticipant(BaseModel):
+    id: int
+    registrant_id: str
+    event_day: Optional[date] = None
+    participant_type: Optional[str] = None
+
+class RosterServed(BaseModel):
+    registration_id: str
+    event_day: date
+    lunch: bool
+    dinner: bool
+
+class RosterDeletion(BaseModel):
+    kind: str  # participant or food_log
+    id: Optional[int] = None  # participant id, for kind participant
+    registrant_id: str
+    event_day: Optional[date] = None
+
+class RosterChangesResponse(BaseModel):
+    participants: List[RosterParticipant]
+    served: List[RosterServed]
+    deleted: List[RosterDeletion]
+    next_since: int
+    has_more: bool
+    access_token: Optional[str] = None
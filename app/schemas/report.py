@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from datetime import date, datetime
+from typing import List, Optional
+
+class MealServedBucket(BaseModel):
+    bucket_start: datetime
+    meal: str
+    participant_type: str
+    served: int
+
+    class Config:
+        from_attributes = True
+
+class MealServedTotal(BaseModel):
+    meal: str
+    participant_type: str
+    served: int
+
+class MealReportResponse(BaseModel):
+    event_day: date
+    bucket_minutes: int
+    served: int
+    totals: List[MealServedTotal]
+    buckets: List[MealServedBucket]
+    access_token: Optional[str] = None
@@ -0,0 +1,37 @@
+from pydantic import BaseModel, field_validator
+from datetime import datetime
+from typing import Optional, Union
+from app.schemas.food_log import FoodLogSchema
+
+class DetailResponse(BaseModel):
+    detail: str
+
+class ScanRequest(BaseModel):
+    registration_id: Union[str, int]
+    meal: str
+    scan_time: Optional[datetime] = None
+    name: Optional[str] = None
+
+    @field_validator('registration_id', mode='before')
+    @classmethod
+    def convert_registration_id(cls, v):
+        # Registration IDs are stored as strings throughout fnb
+        return str(v).strip() if v is not None else v
+
+    @field_validator('meal')
+    @classmethod
+    def normalize_meal(cls, v):
+        return v.strip().lower()
+
+class ScanVerdict(BaseModel):
+    accepted: bool
+    registration_id: str
+    meal: str
+    scan_time: datetime
+    participant_type: Optional[str] = None
+    error_code: Optional[str] = None
+    detail: Optional[str] = None
+    food_log: Optional[FoodLogSchema] = None
+
+class ScanResponse(ScanVerdict):
+    access_token: Optional[str] = None
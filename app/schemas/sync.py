@@ -0,0 +1,26 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Dict, List, Optional
+from app.schemas.scan import ScanRequest
+
+class ScanSyncEventIn(ScanRequest):
+    device_id: str = Field(..., min_length=1, max_length=100)
+    seq: int = Field(..., ge=0)
+    scan_time: datetime  # Client-stamped; required for replayed scans
+
+class ScanSyncRequest(BaseModel):
+    events: List[ScanSyncEventIn]
+
+class ScanSyncResult(BaseModel):
+    device_id: str
+    seq: int
+    status: str  # accepted, rejected, duplicate or error
+    error_code: Optional[str] = None
+    detail: Optional[str] = None
+
+class ScanSyncResponse(BaseModel):
+    results: List[ScanSyncResult]
+    # Per device, the highest seq such that it and every earlier seq are stored; clients may drop those.
+    # Devices whose earlier seqs are missing (gaps, failures) are left out or get a lower mark
+    high_water_marks: Dict[str, int]
+    access_token: Optional[str] = None
@@ -0,0 +1,85 @@
+import argparse
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+from typing import Union
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.event_time import EVENT_TZ
+from app.core.responses import fast_response, row_dict
+from app.models.food_log import FoodLog
+from app.schemas.food_log import DetailResponse, FoodLogListResponse, FoodLogSchema
+from app.schemas.scan import ScanRequest, ScanResponse, ScanVerdict
+
+SEARCH_RESPONSE = TypeAdapter(Union[FoodLogListResponse, DetailResponse])
+SCAN_RESPONSE = TypeAdapter(Union[ScanResponse, DetailResponse])
+
+def _food_logs(count):
+    day = datetime(2025, 7, 10, tzinfo=EVENT_TZ)
+    return [
+        FoodLog(name="Participant", registration_id=str(1000 + i), date=day, event_day=day.date(), lunch=1, dinner=None,
+                lunch_takenon=day + timedelta(hours=12, seconds=i), dinner_takenon=None, multi_entry=False)
+        for i in range(count)
+    ]
+
+def _route_encode(adapter, content):
+    # What FastAPI does with a returned model: validate against response_model, then jsonable_encoder + json.dumps
+    validated = adapter.validate_python(content, from_attributes=True)
+    return JSONResponse(jsonable_encoder(validated)).body
+
+def search_before(food_logs):
+    content = FoodLogListResponse(
+        food_logs=[FoodLogSchema(**row_dict(log, FoodLogSchema)) for log in food_logs],
+        detail=None,
+        access_token=None
+    )
+    return _route_encode(SEARCH_RESPONSE, content)
+
+def search_after(food_logs):
+    return fast_response(Response(), {
+        "food_logs": [row_dict(log, FoodLogSchema) for log in food_logs],
+        "detail": None,
+        "access_token": None
+    }).body
+
+def scan_before(scan, food_log):
+    verdict = ScanVerdict(accepted=True, registration_id=scan.registration_id, meal=scan.meal,
+                          scan_time=scan.scan_time, participant_type="Delegate",
+                          food_log=FoodLogSchema.from_orm(food_log))
+    return _route_encode(SCAN_RESPONSE, ScanResponse(**verdict.dict(), access_token=None))
+
+def scan_after(scan, food_log):
+    verdict = ScanVerdict.model_construct(accepted=True, registration_id=scan.registration_id, meal=scan.meal,
+                                          scan_time=scan.scan_time, participant_type="Delegate", error_code=None,
+                                          detail=None,
+                                          food_log=FoodLogSchema.model_construct(**row_dict(food_log, FoodLogSchema)))
+    return fast_response(Response(), {**verdict.model_dump(), "access_token": None}).body
+
+def _report(name, before, after, number):
+    before_us = min(timeit.repeat(before, number=number, repeat=5)) / number * 1e6
+    after_us = min(timeit.repeat(after, number=number, repeat=5)) / number * 1e6
+    print(f"{name:<24} before {before_us:9.1f} us   after {after_us:9.1f} us   {before_us / after_us:5.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-response encode time of the old and fast response paths")
+    parser.add_argument("--number", type=int, default=2000, help="Responses encoded per timing run")
+    args = parser.parse_args()
+
+    food_logs = _food_logs(1)
+    scan = ScanRequest(registration_id="1000", meal="lunch", scan_time=food_logs[0].lunch_takenon)
+    _report("scan", lambda: scan_before(scan, food_logs[0]), lambda: scan_after(scan, food_logs[0]), args.number)
+    for count in (1, 3, 50):
+        rows = _food_logs(count)
+        _report(f"food-log/search x{count}", lambda: search_before(rows), lambda: search_after(rows),
+                max(args.number // count, 10))
+
+if __name__ == "__main__":
+    main()
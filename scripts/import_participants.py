@@ -0,0 +1,50 @@
+import argparse
+import os
+import sys
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.crud.participant_import import IMPORT_FORMATS, import_participants
+
+def print_progress(report):
+    print(f"\r{report.rows_read} rows read, {report.rows_valid} valid, {report.error_count} errors",
+          end="", file=sys.stderr, flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import the participant roster from a CSV or NDJSON file")
+    parser.add_argument("path", help="CSV file with a header row, or NDJSON file (one object per line)")
+    parser.add_argument("--format", choices=IMPORT_FORMATS,
+                        help="File format; defaults to ndjson for .ndjson/.jsonl files, otherwise csv")
+    args = parser.parse_args()
+
+    import_format = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+
+    # Create database engine
+    engine = create_engine(settings.database_url)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SessionLocal()
+
+    try:
+        with open(args.path, "rb") as stream:
+            report = import_participants(db, stream, import_format, progress=print_progress)
+        print(file=sys.stderr)
+        print(f"Inserted: {report.inserted}")
+        print(f"Updated: {report.updated}")
+        print(f"Invalid rows: {report.error_count}")
+        for error in report.errors:
+            print(f"  line {error['line']}: {error['error']}")
+        if report.error_count > len(report.errors):
+            print(f"  ... and {report.error_count - len(report.errors)} more")
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -4,4 +4,46 @@ from pathlib import Path
 
 # Add the project root directory to the Python path
 project_root = str(Path(__file__).parent.parent)
-sys.path.insert(0, project_root) 
\ No newline at end of file
+sys.path.insert(0, project_root) 
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+@pytest.fixture
+def sqlite_db():
+    """In-memory SQLite session with the fnb schema attached, for crud tests that need no Postgres features"""
+    from app.db.base_model import Base
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def attach_fnb_schema(dbapi_connection, connection_record):
+        dbapi_connection.execute("ATTACH DATABASE ':memory:' AS fnb")
+
+    Base.metadata.create_all(engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield db
+    finally:
+        db.close()
+        engine.dispose()
+
+@pytest.fixture
+def pg_engine():
+    """Engine for a disposable Postgres database from TEST_DATABASE_URL; tests needing real Postgres skip without it"""
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL not set")
+    from app.db.base_model import Base
+
+    engine = create_engine(url, pool_size=10)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE SCHEMA IF NOT EXISTS fnb")
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    try:
+        yield engine
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
@@ -0,0 +1,71 @@
+import pytest
+from types import SimpleNamespace
+
+from app.core import cache as cache_module
+from app.core import security
+from app.core.cache import ExpiringSet, TTLCache
+from app.models.user import User
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now.value)
+    return now
+
+def test_entries_expire(clock):
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    clock.value += 61
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_per_entry_ttl(clock):
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1, ttl=5)
+    clock.value += 6
+    assert cache.get("a") is None
+
+def test_expiring_set_keeps_members_until_they_expire(clock):
+    members = ExpiringSet(min_sweep_size=4)
+    members.add("old", ttl=5)
+    members.add("a", ttl=60)
+    members.add("b", ttl=60)
+    assert "old" in members
+
+    clock.value += 6
+    assert "old" not in members and "a" in members
+    # The fourth member triggers a sweep, which drops only the expired one
+    members.add("c", ttl=60)
+    assert len(members) == 3
+    assert all(member in members for member in ("a", "b", "c"))
+
+def test_evicts_least_recently_used(clock):
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+def test_get_current_user_is_cached(monkeypatch):
+    security.user_cache.clear()
+    lookups = []
+
+    def get_user_by_username(db, username):
+        lookups.append(username)
+        return User(id=1, username=username, password="x")
+
+    monkeypatch.setattr(security.user_crud, "get_user_by_username", get_user_by_username)
+    payload = {"sub": "scanner1", "type": "access"}
+
+    assert security.get_current_user(db=None, payload=payload).id == 1
+    assert security.get_current_user(db=None, payload=payload).username == "scanner1"
+    assert lookups == ["scanner1"]
+
+    security.invalidate_cached_user("scanner1")
+    security.get_current_user(db=None, payload=payload)
+    assert lookups == ["scanner1", "scanner1"]
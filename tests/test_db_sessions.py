@@ -0,0 +1,93 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from app.api.v1.endpoints import admin, error_logs, food_log, live, meal_timings, participants, reports, scan, sync, users
+from app.db import session
+from app.db.pool_metrics import (
+    InstrumentedQueuePool,
+    RequestCheckoutMiddleware,
+    RequestCheckoutMetrics,
+    instrument_pool,
+    pool_metrics,
+    track_request_checkouts
+)
+import app.db.pool_metrics as pool_metrics_module
+
+DB_PROVIDERS = {session.get_db, session.get_async_db}
+
+def _providers(dependant):
+    found = {dependant.call} if getattr(dependant.call, "__name__", None) in ("get_db", "get_async_db") else set()
+    for dependency in dependant.dependencies:
+        found |= _providers(dependency)
+    return found
+
+def test_every_route_uses_one_session_provider():
+    for module in (admin, error_logs, food_log, live, meal_timings, participants, reports, scan, sync, users):
+        for route in module.router.routes:
+            providers = _providers(route.dependant)
+            assert providers <= DB_PROVIDERS and len(providers) <= 1, f"{module.__name__} {route.path}"
+
+def test_auth_and_endpoint_share_one_checkout(monkeypatch):
+    engine = create_engine("sqlite://", poolclass=QueuePool, connect_args={"check_same_thread": False})
+    track_request_checkouts(engine)
+    local_session = sessionmaker(bind=engine)
+    metrics = RequestCheckoutMetrics()
+    monkeypatch.setattr(pool_metrics_module, "request_checkout_metrics", metrics)
+
+    def get_db():
+        db = local_session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def current_user(db=Depends(get_db)):
+        return db.execute(text("select 1")).scalar()
+
+    app = FastAPI()
+    app.add_middleware(RequestCheckoutMiddleware)
+
+    @app.get("/")
+    def read(user=Depends(current_user), db=Depends(get_db)):
+        return {"value": db.execute(text("select 2")).scalar() + user}
+
+    with TestClient(app) as client:
+        assert client.get("/").json() == {"value": 3}
+    stats = metrics.stats()
+    assert stats["requests"] == 1
+    assert stats["checkouts"] == 1
+    engine.dispose()
+
+def test_pool_metrics_record_usage_and_timeouts():
+    engine = create_engine("sqlite://", poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=1,
+                           pool_timeout=0.05, connect_args={"check_same_thread": False})
+    metrics = instrument_pool("test", engine)
+    try:
+        first = engine.connect()
+        second = engine.connect()
+        assert metrics.stats()["overflow"] == 1
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+        first.close()
+        second.close()
+
+        stats = metrics.stats()
+        assert stats["checkouts"] == 2
+        assert stats["checkins"] == 2
+        assert stats["overflow_checkouts"] == 1
+        assert stats["peak_checked_out"] == 2
+        assert stats["timeouts"] == 1
+        assert stats["wait_ms_max"] >= 50
+        assert stats["checked_out"] == 0
+
+        engine.dispose()
+        with engine.connect():
+            assert metrics.stats()["checked_out"] == 1
+    finally:
+        pool_metrics.pop("test", None)
+        engine.dispose()
@@ -0,0 +1,109 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.event_time import event_day_start
+from app.crud import error_log as crud
+from app.models.error_log import ErrorLog
+from app.schemas.error_log import ErrorLogCreate
+
+SCAN_TIME = datetime(2025, 7, 10, 12, 0)
+
+def _seed(db, count):
+    # Five logs share each scan_time so pages have to break ties on id
+    for i in range(count):
+        crud.create_error_log(db, ErrorLogCreate(
+            user_id=1, registrant_id="1001", scan_time=SCAN_TIME + timedelta(minutes=i // 5),
+            error="Meal already taken", error_code="03"
+        ))
+
+def test_cursor_pages_have_no_duplicates_or_gaps(sqlite_db):
+    _seed(sqlite_db, 23)
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = crud.get_error_log_page(sqlite_db, limit=5, cursor=cursor)
+        seen.extend(page)
+        if cursor is None:
+            break
+
+    expected = sorted(crud.get_error_logs(sqlite_db, limit=100), key=lambda log: (log.scan_time, log.id), reverse=True)
+    assert [log.id for log in seen] == [log.id for log in expected]
+    assert len(seen) == 23
+
+def test_cursor_pages_respect_filters(sqlite_db):
+    _seed(sqlite_db, 6)
+    page, cursor = crud.get_error_log_page(sqlite_db, limit=5, error_code="03")
+    assert len(page) == 5 and cursor is not None
+    page, cursor = crud.get_error_log_page(sqlite_db, limit=5, cursor=cursor, error_code="03")
+    assert len(page) == 1 and cursor is None
+    assert crud.get_error_log_page(sqlite_db, limit=5, error_code="04") == ([], None)
+
+def test_rows_without_scan_time_are_left_out(sqlite_db):
+    sqlite_db.add(ErrorLog(user_id=1, registrant_id="1001", scan_time=None, error="Legacy", error_code="03"))
+    sqlite_db.commit()
+    _seed(sqlite_db, 6)
+
+    page, cursor = crud.get_error_log_page(sqlite_db, limit=5)
+    assert len(page) == 5 and cursor is not None
+    page, cursor = crud.get_error_log_page(sqlite_db, limit=5, cursor=cursor)
+    assert len(page) == 1 and cursor is None
+    assert all(log.scan_time is not None for log in crud.get_error_logs(sqlite_db))
+
+def test_cursor_round_trips(sqlite_db):
+    _seed(sqlite_db, 1)
+    error_log = crud.get_error_logs(sqlite_db)[0]
+    assert crud.decode_cursor(crud.encode_cursor(error_log)) == (error_log.scan_time, error_log.id)
+
+@pytest.mark.parametrize("token", ["not-a-cursor", "", "WzEsMl0", "bnVsbA"])
+def test_invalid_cursor_is_rejected(token):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        crud.decode_cursor(token)
+
+def test_date_filters_are_half_open_event_day_ranges():
+    query = crud._error_logs_query(0, 100, None, None, "03", date(2025, 7, 10), date(2025, 7, 11))
+    sql = str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    assert "date(" not in sql
+    assert f"fnb.error_logs.scan_time >= '{event_day_start(date(2025, 7, 10))}'" in sql
+    assert f"fnb.error_logs.scan_time < '{event_day_start(date(2025, 7, 12))}'" in sql
+
+def test_date_filters_include_the_whole_end_day(sqlite_db):
+    _seed(sqlite_db, 3)
+    crud.create_error_log(sqlite_db, ErrorLogCreate(
+        user_id=1, registrant_id="1001", scan_time=datetime(2025, 7, 11, 0, 0), error="Next day", error_code="03"
+    ))
+    day = SCAN_TIME.date()
+    assert len(crud.get_error_logs(sqlite_db, start_date=day, end_date=day)) == 3
+    assert len(crud.get_error_logs(sqlite_db, start_date=day + timedelta(days=1))) == 1
+
+def _plan(connection, query, explain):
+    compiled = query.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+    return " ".join(str(row) for row in connection.exec_driver_sql(f"{explain} {compiled}"))
+
+@pytest.mark.parametrize("filters, index", [
+    ({"error_code": "03"}, "ix_fnb_error_logs_error_code_scan_time"),
+    ({"user_id": 7}, "ix_fnb_error_logs_user_id_scan_time"),
+])
+def test_filtered_date_range_uses_composite_index_sqlite(sqlite_db, filters, index):
+    query = crud._error_logs_query(0, 100, filters.get("user_id"), None, filters.get("error_code"),
+                                   SCAN_TIME.date(), SCAN_TIME.date())
+    assert index in _plan(sqlite_db.connection(), query, "EXPLAIN QUERY PLAN")
+
+@pytest.mark.parametrize("filters, index", [
+    ({"error_code": "03"}, "ix_fnb_error_logs_error_code_scan_time"),
+    ({"user_id": 7}, "ix_fnb_error_logs_user_id_scan_time"),
+])
+def test_filtered_date_range_uses_composite_index(pg_engine, filters, index):
+    with pg_engine.begin() as connection:
+        # Enough spread-out rows that a sequential scan is not the obvious plan
+        connection.exec_driver_sql("""
+            INSERT INTO fnb.error_logs (user_id, registrant_id, scan_time, error, error_code)
+            SELECT i % 50, (1000 + i)::text, timestamptz '2025-07-01' + i * interval '1 minute', 'seed',
+                   lpad((i % 10 + 1)::text, 2, '0')
+            FROM generate_series(1, 50000) AS i
+        """)
+        connection.exec_driver_sql("ANALYZE fnb.error_logs")
+        query = crud._error_logs_query(0, 100, filters.get("user_id"), None, filters.get("error_code"),
+                                       SCAN_TIME.date(), SCAN_TIME.date())
+        assert index in _plan(connection, query, "EXPLAIN")
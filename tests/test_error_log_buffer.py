@@ -0,0 +1,111 @@
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from app.core.error_log_buffer import ErrorLogBuffer
+from app.models.error_log import ErrorLog
+from app.schemas.error_log import ErrorLogCreate
+
+def _error_log(n: int) -> ErrorLogCreate:
+    return ErrorLogCreate(user_id=1, registrant_id=1000 + n, error="Duplicate meal entry", error_code="03",
+                          scan_time=datetime(2025, 7, 10, 12, 30))
+
+def _count(db) -> int:
+    return db.execute(select(func.count()).select_from(ErrorLog)).scalar()
+
+def _buffer(db, maxsize=10, flush_rows=3, flush_ms=10_000, max_retries=3):
+    # Flush through the test session; close() is a no-op so the in-memory data survives
+    db.close = lambda: None
+    return ErrorLogBuffer(maxsize, flush_rows, flush_ms, session_factory=lambda: db, max_retries=max_retries)
+
+def test_flush_writes_queued_logs_in_batches(sqlite_db):
+    buffer = _buffer(sqlite_db)
+    assert buffer.put([_error_log(n) for n in range(7)]) == 7
+    assert buffer.stats()["depth"] == 7
+
+    assert buffer.flush() == 7
+    stats = buffer.stats()
+    assert (stats["depth"], stats["written"], stats["flushes"]) == (0, 7, 3)
+    assert _count(sqlite_db) == 7
+    assert sqlite_db.execute(select(ErrorLog.registrant_id).order_by(ErrorLog.id)).scalars().first() == "1000"
+
+def test_full_buffer_drops_and_counts(sqlite_db):
+    buffer = _buffer(sqlite_db, maxsize=4)
+    assert buffer.put([_error_log(n) for n in range(3)]) == 3
+    assert buffer.put([_error_log(n) for n in range(3)]) == 1
+    assert buffer.stats()["dropped"] == 2
+
+def test_failed_flush_keeps_rows_queued(sqlite_db):
+    buffer = _buffer(sqlite_db)
+    buffer.put([_error_log(n) for n in range(2)])
+    broken = sqlite_db.execute
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    sqlite_db.execute = fail
+    assert buffer.flush() == 0
+    assert buffer.stats()["flush_errors"] == 1
+    assert buffer.stats()["depth"] == 2
+
+    sqlite_db.execute = broken
+    assert buffer.flush() == 2
+
+def test_rejected_row_is_bisected_out(sqlite_db):
+    buffer = _buffer(sqlite_db)
+    buffer.put([_error_log(n) for n in range(7)])
+    execute = sqlite_db.execute
+
+    def reject_1004(statement, rows=None, *args, **kwargs):
+        if rows and any(row["registrant_id"] == "1004" for row in rows):
+            raise IntegrityError("INSERT INTO error_logs", {}, Exception("value too long"))
+        return execute(statement, rows, *args, **kwargs)
+
+    sqlite_db.execute = reject_1004
+    assert buffer.flush() == 6
+    stats = buffer.stats()
+    assert (stats["depth"], stats["rejected"], stats["dropped"], stats["flush_errors"]) == (0, 1, 1, 0)
+    sqlite_db.execute = execute
+    assert set(sqlite_db.execute(select(ErrorLog.registrant_id)).scalars()) == {str(1000 + n) for n in range(7)} - {"1004"}
+
+def test_failing_batch_is_dropped_after_its_retries(sqlite_db):
+    buffer = _buffer(sqlite_db, max_retries=2)
+    buffer.put([_error_log(n) for n in range(4)])
+    execute = sqlite_db.execute
+    failing = {"1000"}
+
+    def fail_first_batch(statement, rows=None, *args, **kwargs):
+        if rows and any(row["registrant_id"] in failing for row in rows):
+            raise RuntimeError("connection reset")
+        return execute(statement, rows, *args, **kwargs)
+
+    sqlite_db.execute = fail_first_batch
+    # The first batch is retried ahead of the rows behind it, then dropped
+    for _ in range(2):
+        assert buffer.flush() == 0
+        assert buffer.stats()["depth"] == 4
+    assert buffer.flush() == 0
+    assert (buffer.stats()["depth"], buffer.stats()["dropped"]) == (1, 3)
+    assert buffer.flush() == 1
+    assert buffer.stats()["flush_errors"] == 3
+
+def test_flusher_wakes_on_batch_size_and_flushes_on_stop(sqlite_db):
+    buffer = _buffer(sqlite_db, flush_rows=3)
+
+    async def scenario():
+        task = asyncio.create_task(buffer.run())
+        await asyncio.sleep(0.01)
+        buffer.put([_error_log(n) for n in range(3)])
+        for _ in range(100):
+            if buffer.stats()["written"] == 3:
+                break
+            await asyncio.sleep(0.01)
+        buffer.put([_error_log(3)])
+        task.cancel()
+        await buffer.stop()
+
+    asyncio.run(scenario())
+    assert buffer.stats()["written"] == 4
+    assert _count(sqlite_db) == 4
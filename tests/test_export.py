@@ -0,0 +1,127 @@
+import csv
+import gzip
+import io
+import json
+from datetime import date, datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from app.api.v1.endpoints import food_log as food_log_endpoints
+from app.core.event_time import EVENT_TZ
+from app.core.security import get_current_user, renew_access_token
+from app.crud import export
+from app.db.session import get_db
+from app.models.error_log import ErrorLog
+from app.models.food_log import FoodLog
+from app.models.participant import Participant
+
+DAY = date(2025, 7, 10)
+
+def _at(day, hour):
+    return datetime(day.year, day.month, day.day, hour, tzinfo=EVENT_TZ)
+
+@pytest.fixture
+def seeded(sqlite_db):
+    for i in range(12):
+        registration_id = str(1000 + i)
+        participant_type = "Delegate" if i % 2 else "Staff"
+        sqlite_db.add(Participant(registrant_id=registration_id, date=_at(DAY, 9), participant_type=participant_type))
+        sqlite_db.add(FoodLog(registration_id=registration_id, name=f"P{i}", date=_at(DAY, 0), lunch=1,
+                              lunch_takenon=_at(DAY, 12), dinner=1 if i < 4 else None,
+                              dinner_takenon=_at(DAY, 19) if i < 4 else None, multi_entry=False))
+        sqlite_db.add(ErrorLog(user_id=1, registrant_id=registration_id, scan_time=_at(DAY, 13),
+                               error="Meal already taken", error_code="03" if i % 3 else "02"))
+    # A day outside the range
+    sqlite_db.add(FoodLog(registration_id="1000", name="P0", date=_at(date(2025, 7, 11), 0), lunch=1,
+                          lunch_takenon=_at(date(2025, 7, 11), 12), multi_entry=False))
+    sqlite_db.commit()
+    return sqlite_db.get_bind()
+
+def _csv_rows(chunks):
+    return list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+
+def test_food_log_csv_export_streams_in_chunks(seeded):
+    query = export.food_log_export_query(start_date=DAY, end_date=DAY)
+    chunks = list(export.stream_export(query, "csv", engine=seeded, chunk_size=5))
+    # Header, then 12 rows in chunks of 5
+    assert len(chunks) == 4
+    rows = _csv_rows(chunks)
+    assert [row["registration_id"] for row in rows] == [str(1000 + i) for i in range(12)]
+    assert rows[1]["participant_type"] == "Delegate"
+    # SQLite drops the offset; Postgres returns it and isoformat keeps it
+    assert rows[0]["lunch_takenon"].startswith("2025-07-10T12:00:00")
+
+def test_food_log_export_filters(seeded):
+    query = export.food_log_export_query(start_date=DAY, end_date=DAY, meal="dinner", participant_type="Delegate")
+    rows = _csv_rows(export.stream_export(query, engine=seeded))
+    assert [row["registration_id"] for row in rows] == ["1001", "1003"]
+
+    with pytest.raises(ValueError, match="Invalid meal"):
+        export.food_log_export_query(meal="breakfast")
+
+def test_error_log_ndjson_gzip_export(seeded):
+    query = export.error_log_export_query(start_date=DAY, end_date=DAY, error_code="03", participant_type="Staff")
+    data = gzip.decompress(b"".join(export.stream_export(query, "ndjson", compress=True, engine=seeded, chunk_size=2)))
+    rows = [json.loads(line) for line in data.splitlines()]
+    assert [row["registrant_id"] for row in rows] == ["1002", "1004", "1008", "1010"]
+    assert set(rows[0]) == {"id", "user_id", "registrant_id", "scan_time", "error_code", "error"}
+
+def test_unknown_format_is_rejected_before_streaming():
+    with pytest.raises(ValueError, match="Unsupported export format"):
+        export.stream_export(export.error_log_export_query(), "xlsx")
+    with pytest.raises(ValueError, match="Invalid start_date format"):
+        export.parse_export_date("10/07/2025", "start_date")
+
+def test_export_endpoint_downloads_file(seeded, monkeypatch):
+    monkeypatch.setattr(export, "export_engine", seeded)
+    app = FastAPI()
+    app.include_router(food_log_endpoints.router, prefix="/food-log")
+    app.dependency_overrides[get_current_user] = lambda: None
+    app.dependency_overrides[renew_access_token] = lambda: None
+    closed = []
+
+    class AuthSession:
+        def close(self):
+            closed.append(True)
+
+    app.dependency_overrides[get_db] = AuthSession
+
+    with TestClient(app) as client:
+        reply = client.get("/food-log/export", params={"start_date_str": "2025-07-10", "end_date_str": "2025-07-10",
+                                                       "format": "csv", "gzip": "true"})
+        assert reply.status_code == 200
+        # The request's session is given back before the download streams
+        assert closed == [True]
+        assert reply.headers["content-disposition"] == 'attachment; filename="food_logs.csv.gz"'
+        assert len(_csv_rows([gzip.decompress(reply.content)])) == 12
+
+        reply = client.get("/food-log/export", params={"format": "xml"})
+        assert reply.status_code == 400
+
+def test_exports_beyond_the_pool_are_turned_away(monkeypatch):
+    engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=1, max_overflow=0)
+    monkeypatch.setattr(export, "export_engine", engine)
+    limit = export.ExportLimit()
+
+    with engine.connect():
+        assert not limit.admit()
+    assert limit.admit()
+    assert limit.stats()["admitted"] == 1
+    assert limit.stats()["rejected"] == 1
+
+def test_export_endpoint_returns_429_when_busy(monkeypatch):
+    monkeypatch.setattr(export.export_limit, "admit", lambda: False)
+    app = FastAPI()
+    app.include_router(food_log_endpoints.router, prefix="/food-log")
+    app.dependency_overrides[get_current_user] = lambda: None
+    app.dependency_overrides[renew_access_token] = lambda: None
+    app.dependency_overrides[get_db] = lambda: None
+
+    with TestClient(app) as client:
+        reply = client.get("/food-log/export")
+        assert reply.status_code == 429
+        assert reply.headers["retry-after"] == "30"
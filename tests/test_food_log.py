@@ -0,0 +1,139 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import sessionmaker
+
+import app.core.live_counters as live_counters_module
+from app.crud import food_log as crud
+from app.models.food_log import FoodLog
+from app.schemas.food_log import FoodLogUpdate
+
+DAY_START = datetime(2025, 7, 10)
+LUNCH_TIME = datetime(2025, 7, 10, 12, 30)
+
+def _lunch(registration_id="1001", takenon=LUNCH_TIME):
+    return FoodLogUpdate(registration_id=registration_id, date=DAY_START, lunch=1, lunch_takenon=takenon)
+
+def test_regular_update_is_a_single_upsert():
+    sql = str(crud._record_food_log_query(_lunch()).compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (registration_id, event_day) WHERE NOT multi_entry DO UPDATE" in sql
+    assert "coalesce(excluded.dinner_takenon, fnb.food_logs.dinner_takenon)" in sql
+    # Only the fields the request set are overwritten
+    assert "lunch = excluded.lunch" in sql and "dinner = excluded.dinner" not in sql
+    assert "RETURNING" in sql
+
+@pytest.fixture
+def sqlite_upsert(sqlite_db, monkeypatch):
+    """SQLite session with the food log upsert compiled for SQLite, which has the same ON CONFLICT form"""
+    monkeypatch.setattr(crud, "insert", sqlite_insert)
+    return sqlite_db
+
+def test_update_overwrites_set_fields_and_keeps_the_rest(sqlite_upsert):
+    crud.update_food_log(sqlite_upsert, FoodLogUpdate(registration_id="1001", date=DAY_START, name="Ali", lunch=1,
+                                                      lunch_takenon=LUNCH_TIME))
+    crud.update_food_log(sqlite_upsert, FoodLogUpdate(registration_id="1001", date=DAY_START, dinner=1))
+    food_log = crud.update_food_log(sqlite_upsert, FoodLogUpdate(registration_id="1001", date=DAY_START, name=None,
+                                                                 lunch=None, lunch_takenon=None))
+
+    # name and the lunch flag were sent as null and cleared; dinner was left out and kept; a stamp is never cleared
+    assert (food_log.name, food_log.lunch, food_log.dinner) == (None, None, 1)
+    assert food_log.lunch_takenon is not None
+
+def test_meal_flag_without_stamp_is_a_duplicate(sqlite_upsert):
+    crud.update_food_log(sqlite_upsert, FoodLogUpdate(registration_id="1001", date=DAY_START, lunch=1))
+    with pytest.raises(crud.DuplicateMealError):
+        crud.update_food_log(sqlite_upsert, FoodLogUpdate(registration_id="1001", date=DAY_START, lunch=1))
+    with pytest.raises(crud.DuplicateMealError):
+        crud.update_food_log(sqlite_upsert, _lunch())
+
+def test_regular_update_at_a_multi_entry_key_is_a_duplicate(sqlite_upsert):
+    crud.update_food_log(sqlite_upsert, FoodLogUpdate(registration_id="1001", name="master", date=DAY_START, lunch=1,
+                                                      lunch_takenon=LUNCH_TIME))
+    with pytest.raises(crud.DuplicateMealError):
+        crud.update_food_log(sqlite_upsert, _lunch())
+
+def _run_parallel(engine, updates):
+    local_session = sessionmaker(bind=engine)
+
+    def apply(update_data):
+        with local_session() as db:
+            try:
+                return crud.update_food_log(db, update_data)
+            except crud.DuplicateMealError as e:
+                return e
+
+    with ThreadPoolExecutor(max_workers=len(updates)) as pool:
+        return list(pool.map(apply, updates))
+
+def test_parallel_scans_of_one_badge_record_one_meal(pg_engine):
+    results = _run_parallel(pg_engine, [_lunch(takenon=LUNCH_TIME + timedelta(seconds=i)) for i in range(8)])
+
+    assert sum(isinstance(result, FoodLog) for result in results) == 1
+    assert sum(isinstance(result, crud.DuplicateMealError) for result in results) == 7
+    with pg_engine.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(FoodLog)).scalar() == 1
+
+def test_parallel_lunch_and_dinner_merge_into_one_entry(pg_engine):
+    dinner = FoodLogUpdate(registration_id="1001", date=DAY_START, dinner=1, dinner_takenon=datetime(2025, 7, 10, 19))
+    results = _run_parallel(pg_engine, [_lunch(), dinner])
+
+    assert all(isinstance(result, FoodLog) for result in results)
+    with pg_engine.connect() as conn:
+        row = conn.execute(select(FoodLog.lunch, FoodLog.dinner)).one()
+    assert tuple(row) == (1, 1)
+
+def test_special_registration_gets_a_row_per_meal(pg_engine):
+    results = _run_parallel(pg_engine, [
+        FoodLogUpdate(registration_id="FB005-80057860", date=LUNCH_TIME + timedelta(seconds=i), lunch=1,
+                      lunch_takenon=LUNCH_TIME + timedelta(seconds=i))
+        for i in range(3)
+    ])
+    assert all(isinstance(result, FoodLog) and result.multi_entry for result in results)
+
+def test_bulk_rounds_keep_each_key_once_per_statement():
+    updates = list(enumerate([_lunch("1"), _lunch("2"), _lunch("1"), _lunch("1")]))
+    rounds = crud._bulk_rounds(updates)
+    assert [[index for index, _ in round_] for round_ in rounds] == [[0, 1], [2], [3]]
+
+def test_bulk_update_reports_status_per_item(pg_engine):
+    dinner = FoodLogUpdate(registration_id="1001", date=DAY_START, dinner=1, dinner_takenon=datetime(2025, 7, 10, 19))
+    special = FoodLogUpdate(registration_id="FB005-80057860", date=LUNCH_TIME, lunch=1, lunch_takenon=LUNCH_TIME)
+    updates = [_lunch(), dinner, _lunch(takenon=LUNCH_TIME + timedelta(minutes=5)), special, special]
+    updates += [_lunch(str(2000 + i)) for i in range(1200)]
+
+    with sessionmaker(bind=pg_engine)() as db:
+        results = crud.bulk_update_food_logs(db, updates, chunk_size=500)
+
+    assert [status for status, _ in results[:5]] == [
+        crud.BULK_ACCEPTED, crud.BULK_ACCEPTED, crud.BULK_DUPLICATE, crud.BULK_ACCEPTED, crud.BULK_DUPLICATE
+    ]
+    assert all(status == crud.BULK_ACCEPTED for status, _ in results[5:])
+    with pg_engine.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(FoodLog)).scalar() == 1202
+
+def test_bulk_fallback_agrees_with_fast_path(sqlite_upsert, monkeypatch):
+    published = []
+    monkeypatch.setattr(live_counters_module.live_counters, "record",
+                        lambda meals=(), errors=(): published.append(meals))
+    special = FoodLogUpdate(registration_id="FB005-80057860", date=LUNCH_TIME, lunch=1, lunch_takenon=LUNCH_TIME)
+    updates = [_lunch(), _lunch(takenon=LUNCH_TIME + timedelta(minutes=5)), special, special]
+    fast = crud.bulk_update_food_logs(sqlite_upsert, updates)
+    sqlite_upsert.execute(FoodLog.__table__.delete())
+    sqlite_upsert.commit()
+
+    def fail_chunk(db, chunk, results):
+        raise ValueError("chunk failed")
+
+    monkeypatch.setattr(crud, "_apply_bulk_chunk", fail_chunk)
+    fallback = crud.bulk_update_food_logs(sqlite_upsert, updates)
+
+    assert fallback == fast
+    # Both paths publish the special entry's lunch once (on SQLite the regular entry's prior stamp reads as set)
+    assert [meal for meals in published for meal in meals] == [(LUNCH_TIME.date(), "lunch")] * 2
+    assert [status for status, _ in fallback] == [
+        crud.BULK_ACCEPTED, crud.BULK_DUPLICATE, crud.BULK_ACCEPTED, crud.BULK_DUPLICATE
+    ]
@@ -0,0 +1,124 @@
+import asyncio
+import json
+from datetime import timedelta
+
+from sqlalchemy.orm import sessionmaker
+
+import app.core.live_counters as live_counters_module
+from app.core.event_time import event_day_start, event_now
+from app.core.live_counters import KEEPALIVE, LiveCounters
+from app.crud import error_log as error_log_crud
+from app.crud import food_log as food_log_crud
+from app.models.meal_rollup import MealServedRollup
+from app.schemas.error_log import ErrorLogCreate
+from app.schemas.food_log import FoodLogUpdate
+
+def _error_log(scan_time, error_code="03"):
+    return ErrorLogCreate(user_id=1, registrant_id="1001", scan_time=scan_time, error="Meal already taken",
+                          error_code=error_code)
+
+def _payload(message):
+    return json.loads(message.split(b"data: ", 1)[1])
+
+def test_only_committed_writes_are_counted(sqlite_db, monkeypatch):
+    counters = LiveCounters(interval_ms=10, reseed_seconds=60)
+    monkeypatch.setattr(live_counters_module, "live_counters", counters)
+
+    error_log_crud.create_error_log(sqlite_db, _error_log(event_now()))
+    error_log_crud.create_error_log(sqlite_db, _error_log(event_now(), "02"), commit=False)
+    sqlite_db.rollback()
+    error_log_crud.create_error_log(sqlite_db, _error_log(event_now() - timedelta(days=1)))
+
+    assert _payload(counters.snapshot()[1])["errors"] == {"03": 1}
+    assert counters.version == 1
+
+def test_retried_meal_is_counted_once(pg_engine, monkeypatch):
+    counters = LiveCounters(interval_ms=10, reseed_seconds=60)
+    monkeypatch.setattr(live_counters_module, "live_counters", counters)
+    now = event_now()
+    lunch = FoodLogUpdate(registration_id="1001", date=event_day_start(now.date()), lunch=1, lunch_takenon=now)
+    dinner = FoodLogUpdate(registration_id="1001", date=event_day_start(now.date()), dinner=1, dinner_takenon=now)
+
+    with sessionmaker(bind=pg_engine)() as db:
+        for update_data in (lunch, lunch, dinner):
+            food_log_crud.update_food_log(db, update_data)
+
+    assert _payload(counters.snapshot()[1])["served"] == {"lunch": 1, "dinner": 1}
+
+def test_bulk_writes_are_counted_once(pg_engine, monkeypatch):
+    counters = LiveCounters(interval_ms=10, reseed_seconds=60)
+    monkeypatch.setattr(live_counters_module, "live_counters", counters)
+    now = event_now()
+    lunches = [FoodLogUpdate(registration_id=str(1000 + i), date=event_day_start(now.date()), lunch=1, lunch_takenon=now)
+               for i in range(3)]
+    special = FoodLogUpdate(registration_id="FB005-80057860", date=now, dinner=1, dinner_takenon=now)
+
+    with sessionmaker(bind=pg_engine)() as db:
+        food_log_crud.bulk_update_food_logs(db, lunches + [special])
+        # A retried upload re-sends the same stamps
+        food_log_crud.bulk_update_food_logs(db, lunches + [special])
+
+    assert _payload(counters.snapshot()[1])["served"] == {"lunch": 3, "dinner": 1}
+
+def test_burst_is_one_push_per_interval_for_every_subscriber():
+    counters = LiveCounters(interval_ms=20, reseed_seconds=3600)
+    counters._last_reseed = float("inf")  # no database here
+    today = event_now().date()
+
+    async def scenario():
+        task = asyncio.create_task(counters.run())
+        await asyncio.sleep(0)
+        streams = [counters.subscribe(keepalive_seconds=5) for _ in range(100)]
+        first = [await stream.__anext__() for stream in streams]
+        pending = [asyncio.ensure_future(stream.__anext__()) for stream in streams]
+
+        for _ in range(500):
+            counters.record(meals=[(today, "lunch")])
+        pushed = await asyncio.gather(*pending)
+        task.cancel()
+        for stream in streams:
+            await stream.aclose()
+        return first, pushed
+
+    first, pushed = asyncio.run(scenario())
+    assert _payload(first[0])["served"] == {}
+    assert {_payload(message)["served"]["lunch"] for message in pushed} == {500}
+    # Every subscriber got the same encoded message
+    assert len({id(message) for message in pushed}) == 1
+    assert counters.broadcasts == 1
+    assert counters.subscribers == 0
+
+def test_idle_subscribers_get_keepalives():
+    counters = LiveCounters(interval_ms=10, reseed_seconds=3600)
+    counters._last_reseed = float("inf")
+
+    async def scenario():
+        task = asyncio.create_task(counters.run())
+        await asyncio.sleep(0)
+        stream = counters.subscribe(keepalive_seconds=0.05)
+        messages = [await stream.__anext__(), await stream.__anext__()]
+        task.cancel()
+        await stream.aclose()
+        return messages
+
+    assert asyncio.run(scenario())[1] == KEEPALIVE
+
+def test_reseed_recounts_from_rollup_and_error_logs(sqlite_db):
+    today = event_now().date()
+    sqlite_db.add_all([
+        MealServedRollup(event_day=today, meal="lunch", participant_type="Delegate",
+                         bucket_start=event_day_start(today) + timedelta(hours=12), served=40),
+        MealServedRollup(event_day=today, meal="lunch", participant_type="Staff",
+                         bucket_start=event_day_start(today) + timedelta(hours=12), served=2),
+    ])
+    sqlite_db.commit()
+    error_log_crud.create_error_log(sqlite_db, _error_log(event_day_start(today) + timedelta(hours=13)))
+
+    counters = LiveCounters(interval_ms=10, reseed_seconds=60,
+                            session_factory=sessionmaker(bind=sqlite_db.get_bind()))
+    counters.record(meals=[(today, "dinner")])
+    counters.reseed()
+
+    payload = _payload(counters.snapshot()[1])
+    assert payload["served"] == {"lunch": 42}
+    assert payload["errors"] == {"03": 1}
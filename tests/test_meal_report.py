@@ -0,0 +1,68 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.core.event_time import EVENT_TZ
+from app.crud import food_log as food_log_crud
+from app.crud import report as crud
+from app.models.meal_rollup import MealServedRollup, UNSCHEDULED
+from app.models.participant import Participant
+from app.schemas.food_log import FoodLogUpdate
+
+DAY = date(2025, 7, 10)
+
+def _bucket(hour, minute):
+    return datetime(2025, 7, 10, hour, minute, tzinfo=EVENT_TZ)
+
+def _rollup(meal, participant_type, bucket_start, served, slot=0, day=DAY):
+    return MealServedRollup(event_day=day, meal=meal, participant_type=participant_type, bucket_start=bucket_start,
+                            slot=slot, served=served)
+
+def test_report_reads_rollup_buckets(sqlite_db):
+    sqlite_db.add_all([
+        _rollup("lunch", "Delegate", _bucket(12, 0), 30),
+        _rollup("lunch", "Delegate", _bucket(12, 0), 10, slot=3),
+        _rollup("lunch", "Delegate", _bucket(12, 15), 25),
+        _rollup("lunch", "Staff", _bucket(12, 15), 5, slot=7),
+        # A meal undone on another connection leaves a negative slot; only the bucket's sum counts
+        _rollup("dinner", "Staff", _bucket(19, 0), 1),
+        _rollup("dinner", "Staff", _bucket(19, 0), -1, slot=2),
+        _rollup("lunch", "Staff", _bucket(12, 0) + timedelta(days=1), 9, day=DAY + timedelta(days=1)),
+    ])
+    sqlite_db.commit()
+
+    buckets = crud.get_meals_served(sqlite_db, DAY)
+    assert [(bucket.participant_type, bucket.served) for bucket in buckets] == [("Delegate", 40), ("Delegate", 25), ("Staff", 5)]
+    assert crud.meal_totals(buckets) == {("lunch", "Delegate"): 65, ("lunch", "Staff"): 5}
+    assert [bucket.served for bucket in crud.get_meals_served(sqlite_db, DAY, participant_type="Staff")] == [5]
+    assert crud.get_meals_served(sqlite_db, DAY, meal="dinner") == []
+    with pytest.raises(ValueError, match="Invalid meal"):
+        crud.get_meals_served(sqlite_db, DAY, meal="breakfast")
+
+def test_trigger_keeps_rollup_in_step_with_food_logs(pg_engine):
+    local_session = sessionmaker(bind=pg_engine)
+    with local_session() as db:
+        db.add(Participant(registrant_id="1001", date=_bucket(9, 0), participant_type="Delegate"))
+        db.commit()
+
+        food_log_crud.update_food_log(db, FoodLogUpdate(registration_id="1001", date=_bucket(0, 0), lunch=1,
+                                                        lunch_takenon=_bucket(12, 7)))
+        with pytest.raises(food_log_crud.DuplicateMealError):
+            food_log_crud.update_food_log(db, FoodLogUpdate(registration_id="1001", date=_bucket(0, 0), lunch=1,
+                                                            lunch_takenon=_bucket(12, 20)))
+        food_log_crud.update_food_log(db, FoodLogUpdate(registration_id="1002", date=_bucket(0, 0), lunch=1,
+                                                        lunch_takenon=_bucket(12, 14)))
+        food_log_crud.update_food_log(db, FoodLogUpdate(registration_id="1001", date=_bucket(0, 0), dinner=1,
+                                                        dinner_takenon=_bucket(19, 31)))
+
+        counts = {(bucket.meal, bucket.participant_type, bucket.bucket_start): bucket.served
+                  for bucket in crud.get_meals_served(db, DAY)}
+        assert counts == {
+            ("lunch", "Delegate", _bucket(12, 0)): 1,
+            ("lunch", UNSCHEDULED, _bucket(12, 0)): 1,
+            ("dinner", "Delegate", _bucket(19, 30)): 1,
+        }
+
+        food_log_crud.delete_food_log(db, "1002", DAY)
+        assert crud.meal_totals(crud.get_meals_served(db, DAY)) == {("lunch", "Delegate"): 1, ("dinner", "Delegate"): 1}
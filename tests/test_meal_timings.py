@@ -0,0 +1,55 @@
+import os
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from app.core import meal_timings as meal_timings_module
+from app.core.meal_timings import MealTimings
+
+CONFIG = Path(meal_timings_module.__file__).parent / "meal_timings.yml"
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(meal_timings_module.settings, "MEAL_TIMINGS_RELOAD_SECONDS", 0)
+    path = tmp_path / "meal_timings.yml"
+    path.write_text(CONFIG.read_text())
+    return path
+
+def test_windows(config_file):
+    timings = MealTimings(config_file)
+    assert timings.get_timings_response()["lunch"] == {"start_time": "10:00 AM", "end_time": "03:00 PM"}
+    assert "breakfast" not in timings.get_timings_response()
+    assert timings.is_meal_early("lunch", datetime(2025, 7, 10, 9, 44))
+    assert not timings.is_meal_early("lunch", datetime(2025, 7, 10, 9, 45))
+    assert not timings.is_meal_late("lunch", datetime(2025, 7, 10, 15, 30))
+    assert timings.is_meal_late("lunch", datetime(2025, 7, 10, 15, 31))
+    with pytest.raises(ValueError):
+        timings.get_meal_timings("breakfast")
+
+def test_reloads_when_file_changes(config_file):
+    timings = MealTimings(config_file)
+    config_file.write_text(config_file.read_text().replace('start_time: "10:00"', 'start_time: "11:00"')
+                           .replace("is_active: false # Set to true when breakfast", "is_active: true # Set to true when breakfast"))
+    stat = os.stat(config_file)
+    os.utime(config_file, (stat.st_atime, stat.st_mtime + 10))
+
+    assert timings.get_meal_timings("lunch")[0].hour == 11
+    assert timings.get_meal_name("breakfast") == "Breakfast"
+
+def test_broken_reload_keeps_last_schedule(config_file):
+    timings = MealTimings(config_file)
+    config_file.write_text("lunch: [")
+    stat = os.stat(config_file)
+    os.utime(config_file, (stat.st_atime, stat.st_mtime + 10))
+    assert timings.get_meal_timings("lunch")[0].hour == 10
+
+def test_active_special_meals_are_served(config_file):
+    timings = MealTimings(config_file)
+    assert timings.is_served("lunch") and not timings.is_served("breakfast")
+
+    config_file.write_text(config_file.read_text().replace("is_active: false # Set to true when breakfast",
+                                                           "is_active: true # Set to true when breakfast"))
+    os.utime(config_file, (1, 1))
+    assert timings.is_served("breakfast")
+    assert not timings.is_served("late_night")
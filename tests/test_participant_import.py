@@ -0,0 +1,81 @@
+import csv
+import io
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.event_time import to_event_time
+from app.crud import participant_import as crud
+from app.models.participant import Participant
+
+CSV = (
+    "registrant_id,date,participant_type\n"
+    "1001,2025-07-10T09:00:00,Delegate\n"
+    "1002,not-a-date,Delegate\n"
+    " 1003 ,2025-07-10 09:00:00+05:00,\n"
+    "1004,2025-07-11T09:00:00,Volunteer\n"
+)
+
+def _copy_rows(data: bytes, import_format: str, max_errors: int = 10, size: int = 7):
+    report = crud.ImportReport(max_errors)
+    stream = crud._CopyStream(crud._read_rows(io.BytesIO(data), import_format), report, None)
+    chunks = []
+    while True:
+        chunk = stream.read(size)
+        if not chunk:
+            break
+        assert len(chunk) <= size
+        chunks.append(chunk)
+    return list(csv.reader(io.StringIO("".join(chunks)))), report
+
+def test_csv_rows_are_validated_and_encoded_for_copy():
+    rows, report = _copy_rows(CSV.encode(), "csv")
+
+    assert rows == [
+        ["2", "1001", "2025-07-10T09:00:00+05:00", "2025-07-10", "Delegate"],
+        ["5", "1004", "2025-07-11T09:00:00+05:00", "2025-07-11", "Volunteer"]
+    ]
+    assert (report.rows_read, report.rows_valid, report.error_count) == (4, 2, 2)
+    assert report.errors == [
+        {"line": 3, "error": "Invalid date: not-a-date"},
+        {"line": 4, "error": "participant_type is required"}
+    ]
+
+def test_ndjson_rows_and_error_cap():
+    data = b'{"registrant_id": 2001, "date": "2025-07-10T09:00:00", "participant_type": "Staff"}\n\n[1]\n{bad\n'
+    rows, report = _copy_rows(data, "ndjson", max_errors=1)
+
+    assert [row[:2] for row in rows] == [["1", "2001"]]
+    assert report.error_count == 2
+    assert report.errors == [{"line": 3, "error": "Expected a JSON object"}]
+
+def test_undecodable_bytes_and_bad_quoting_are_row_errors():
+    data = (
+        b"registrant_id,date,participant_type\n"
+        b"10\xff1,2025-07-10T09:00:00,Delegate\n"
+        b'1002,"2025-07-10T09:00:00"x,Delegate\n'
+        b"1003,2025-07-10T09:00:00,Staff\n"
+    )
+    rows, report = _copy_rows(data, "csv")
+
+    assert [row[:2] for row in rows] == [["4", "1003"]]
+    assert report.errors == [
+        {"line": 2, "error": "Invalid UTF-8"},
+        {"line": 3, "error": "Invalid CSV: ',' expected after '\"'"}
+    ]
+
+    rows, report = _copy_rows(b'{"registrant_id": "10\xff1"}\n', "ndjson")
+    assert rows == [] and report.errors == [{"line": 1, "error": "Invalid UTF-8"}]
+
+def test_import_merges_into_participants(pg_engine):
+    with sessionmaker(bind=pg_engine)() as db:
+        db.add(Participant(registrant_id="1004", date=to_event_time(datetime(2025, 7, 11, 9)),
+                           participant_type="Delegate"))
+        db.commit()
+
+        report = crud.import_participants(db, io.BytesIO(CSV.encode()), "csv")
+        assert (report.inserted, report.updated, report.error_count) == (1, 1, 2)
+
+        participants = db.execute(select(Participant).order_by(Participant.registrant_id)).scalars().all()
+        assert [(p.registrant_id, p.participant_type) for p in participants] == [("1001", "Delegate"), ("1004", "Volunteer")]
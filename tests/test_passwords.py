@@ -0,0 +1,19 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+
+from app.core import passwords
+
+def test_hash_and_verify():
+    hashed = passwords.hash_password("secret")
+    assert asyncio.run(passwords.verify_password_async("secret", hashed))
+    assert not asyncio.run(passwords.verify_password_async("wrong", hashed))
+    assert passwords.login_metrics.in_flight == 0
+
+def test_full_login_queue_is_rejected(monkeypatch):
+    monkeypatch.setattr(passwords.settings, "LOGIN_MAX_QUEUE_DEPTH", 0)
+    rejected = passwords.login_metrics.rejected
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(passwords.verify_password_async("secret", passwords.hash_password("secret")))
+    assert exc_info.value.status_code == 503
+    assert passwords.login_metrics.rejected == rejected + 1
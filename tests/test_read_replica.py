@@ -0,0 +1,63 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from app.db import session
+from app.db.session import ReplicaHealth, RoutingSession, get_read_db, record_write, use_replica
+
+def _engine(path="", name="primary"):
+    engine = create_engine(f"sqlite://{path}", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    if not path:
+        with engine.begin() as conn:
+            conn.execute(text("create table source (name text)"))
+            conn.execute(text("insert into source values (:name)"), {"name": name})
+    return engine
+
+def _source(db):
+    return db.execute(text("select name from source")).scalar()
+
+def _setup(monkeypatch, replica):
+    primary = _engine()
+    monkeypatch.setattr(session, "read_engine", replica)
+    monkeypatch.setattr(session, "replica_health", ReplicaHealth(30))
+    monkeypatch.setattr(session, "recent_writes", session.TTLCache(maxsize=10, ttl=30))
+    return RoutingSession(bind=primary)
+
+def test_reads_go_to_replica_once_marked(monkeypatch):
+    db = _setup(monkeypatch, _engine(name="replica"))
+    assert _source(db) == "primary"
+    db.rollback()
+    assert get_read_db(db) is db
+    assert _source(db) == "replica"
+    db.close()
+
+def test_no_replica_configured_uses_primary(monkeypatch):
+    db = _setup(monkeypatch, None)
+    assert use_replica(db) is False
+    assert _source(db) == "primary"
+    db.close()
+
+def test_recent_write_reads_from_primary(monkeypatch):
+    db = _setup(monkeypatch, _engine(name="replica"))
+    record_write(1001)
+    assert use_replica(db, "1001") is False
+    assert _source(db) == "primary"
+    assert use_replica(db, "1002") is True
+    db.close()
+
+def test_unreachable_replica_falls_back_and_is_rechecked_later(monkeypatch):
+    db = _setup(monkeypatch, _engine(path="/nonexistent-dir/replica.db"))
+    assert use_replica(db) is False
+    assert _source(db) == "primary"
+    assert session.replica_health.available is False
+    # While marked down the replica is not even tried
+    assert use_replica(db) is False
+    db.close()
+
+def test_exhausted_replica_pool_falls_back_without_marking_it_down(monkeypatch):
+    replica = create_engine("sqlite://", poolclass=QueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05)
+    db = _setup(monkeypatch, replica)
+    with replica.connect():
+        assert use_replica(db) is False
+        assert _source(db) == "primary"
+    assert session.replica_health.available is True
+    db.close()
@@ -0,0 +1,41 @@
+import json
+from datetime import datetime, timezone
+
+from fastapi import Depends, FastAPI, Response
+from fastapi.testclient import TestClient
+
+from app.core.responses import fast_response, row_dict
+from app.core.event_time import EVENT_TZ
+from app.models.food_log import FoodLog
+from app.schemas.food_log import FoodLogListResponse, FoodLogSchema
+
+def _food_log():
+    return FoodLog(name="A", registration_id="1001", date=datetime(2025, 7, 10, tzinfo=EVENT_TZ), lunch=1,
+                   dinner=None, lunch_takenon=datetime(2025, 7, 10, 10, 30, 15, 250000, tzinfo=timezone.utc),
+                   dinner_takenon=None)
+
+def test_fast_response_matches_pydantic_encoding():
+    log = _food_log()
+    content = {"food_logs": [row_dict(log, FoodLogSchema)], "detail": None, "access_token": "t"}
+    validated = FoodLogListResponse(food_logs=[FoodLogSchema.model_validate(log)], access_token="t")
+    assert json.loads(fast_response(Response(), content).body) == json.loads(validated.model_dump_json())
+
+def test_fast_response_keeps_status_and_headers():
+    app = FastAPI()
+
+    def renew(response: Response):
+        response.headers["X-Access-Token"] = "renewed"
+        return "renewed"
+
+    @app.get("/", response_model=FoodLogListResponse)
+    def search(response: Response, access_token=Depends(renew)):
+        response.status_code = 202
+        return fast_response(response, {"food_logs": [row_dict(_food_log(), FoodLogSchema)],
+                                        "access_token": access_token})
+
+    with TestClient(app) as client:
+        reply = client.get("/")
+    assert reply.status_code == 202
+    assert reply.headers["x-access-token"] == "renewed"
+    assert reply.headers["content-type"] == "application/json"
+    assert reply.json()["food_logs"][0]["lunch_takenon"] == "2025-07-10T10:30:15.250000Z"
@@ -0,0 +1,57 @@
+from datetime import date, datetime
+
+from app.core.roster_cache import roster_cache
+from app.crud import participant as crud
+from app.models.participant import Participant
+from app.schemas.participant import ParticipantCreate
+
+DAY = date(2025, 7, 10)
+
+def _add(db, registrant_id, participant_type="Delegate"):
+    db.add(Participant(registrant_id=registrant_id, date=datetime(2025, 7, 10, 9, 0), participant_type=participant_type))
+    db.commit()
+
+def test_roster_serves_lookups_from_memory(sqlite_db, monkeypatch):
+    _add(sqlite_db, "1001")
+    _add(sqlite_db, "1002", "Volunteer")
+    assert roster_cache.load(sqlite_db, DAY) == 2
+    assert roster_cache.stats()["memory_bytes"] > 0
+
+    monkeypatch.setattr(crud, "get_participant_by_schedule", lambda *args: None)
+    entry = crud.get_scheduled_participant(sqlite_db, 1002, "2025-07-10")
+    assert entry.participant_type == "Volunteer"
+    assert entry.registrant_id == "1002"
+
+def test_roster_falls_back_to_db(sqlite_db):
+    roster_cache.load(sqlite_db, DAY)
+    _add(sqlite_db, "1003")
+    assert crud.get_scheduled_participant(sqlite_db, "1003", "2025-07-10").registrant_id == "1003"
+    assert crud.get_scheduled_participant(sqlite_db, "1003", "2025-07-11") is None
+
+def test_create_participant_invalidates_entry(sqlite_db):
+    _add(sqlite_db, "1004", "Delegate")
+    roster_cache.load(sqlite_db, DAY)
+    crud.create_participant(sqlite_db, ParticipantCreate(registrant_id=1004, date=datetime(2025, 7, 10, 9, 0),
+                                                          participant_type="Staff"))
+    assert roster_cache.get("1004", DAY) is None
+
+def test_load_racing_an_invalidation_is_discarded(sqlite_db, monkeypatch):
+    _add(sqlite_db, "1005", "Delegate")
+    roster_cache.load(sqlite_db, DAY)
+    execute = sqlite_db.execute
+
+    def execute_then_edit(*args, **kwargs):
+        # The roster is read, then another request edits 1005 before the load installs it
+        result = execute(*args, **kwargs)
+        roster_cache.invalidate("1005")
+        return result
+
+    monkeypatch.setattr(sqlite_db, "execute", execute_then_edit)
+    discarded = roster_cache.stats()["discarded_loads"]
+    assert roster_cache.load(sqlite_db, DAY) == 0
+    assert roster_cache.stats()["discarded_loads"] == discarded + 1
+    assert roster_cache.get("1005", DAY) is None
+
+    monkeypatch.undo()
+    assert roster_cache.load(sqlite_db, DAY) == 1
+    assert roster_cache.get("1005", DAY).participant_type == "Delegate"
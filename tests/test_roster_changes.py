@@ -0,0 +1,134 @@
+from datetime import date, datetime
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.event_time import EVENT_TZ
+from app.crud import food_log as food_log_crud
+from app.crud import roster_changes as crud
+from app.models.change_tombstone import ChangeTombstone
+from app.models.food_log import FoodLog
+from app.models.participant import Participant
+from app.schemas.food_log import FoodLogUpdate
+
+DAY = date(2025, 7, 10)
+STAMPED = datetime(2025, 7, 10, 12, 0, tzinfo=EVENT_TZ)
+
+def _seed(db):
+    db.add_all([
+        Participant(id=1, registrant_id="1001", date=datetime(2025, 7, 10, 9, tzinfo=EVENT_TZ),
+                    participant_type="Delegate", change_version=1, changed_at=STAMPED),
+        Participant(id=2, registrant_id="1002", date=datetime(2025, 7, 11, 9, tzinfo=EVENT_TZ),
+                    participant_type="Staff", change_version=2, changed_at=STAMPED),
+        FoodLog(registration_id="1001", date=datetime(2025, 7, 10, tzinfo=EVENT_TZ), lunch=1,
+                lunch_takenon=STAMPED, multi_entry=False, change_version=3, changed_at=STAMPED),
+        FoodLog(registration_id="FB005-80057860", date=STAMPED, lunch=1, lunch_takenon=STAMPED, multi_entry=True,
+                change_version=4, changed_at=STAMPED),
+        ChangeTombstone(change_version=5, changed_at=STAMPED, kind="participant", participant_id=3,
+                        registrant_id="1003", event_day=DAY),
+        # Written by a transaction that was still open at the horizon
+        Participant(id=4, registrant_id="1004", date=datetime(2025, 7, 10, 9, tzinfo=EVENT_TZ),
+                    participant_type="Delegate", change_version=6, changed_at=STAMPED),
+    ])
+    db.commit()
+
+def test_feed_pages_through_changes_in_version_order(sqlite_db):
+    _seed(sqlite_db)
+    horizon = 5
+
+    page = crud.get_roster_changes(sqlite_db, since=0, horizon=horizon, limit=2)
+    assert [p["registrant_id"] for p in page["participants"]] == ["1001", "1002"]
+    assert (page["next_since"], page["has_more"]) == (2, True)
+
+    page = crud.get_roster_changes(sqlite_db, since=page["next_since"], horizon=horizon, limit=2)
+    assert page["served"] == [{"registration_id": "1001", "event_day": DAY, "lunch": True, "dinner": False}]
+    assert page["deleted"] == [{"kind": "participant", "id": 3, "registrant_id": "1003", "event_day": DAY}]
+    assert (page["next_since"], page["has_more"]) == (5, False)
+
+    # Nothing new: the client keeps its version
+    page = crud.get_roster_changes(sqlite_db, since=5, horizon=horizon)
+    assert page["participants"] == [] and (page["next_since"], page["has_more"]) == (5, False)
+
+    # Once the horizon passes the open transaction its change shows up
+    page = crud.get_roster_changes(sqlite_db, since=5, horizon=6)
+    assert [p["id"] for p in page["participants"]] == [4]
+
+def test_feed_can_be_limited_to_one_event_day(sqlite_db):
+    _seed(sqlite_db)
+    page = crud.get_roster_changes(sqlite_db, since=0, horizon=6, day=DAY)
+    assert [p["registrant_id"] for p in page["participants"]] == ["1001", "1004"]
+    assert len(page["served"]) == 1 and len(page["deleted"]) == 1
+
+def test_triggers_version_writes_and_record_deletions(pg_engine):
+    with sessionmaker(bind=pg_engine)() as db:
+        db.add_all([Participant(registrant_id=str(1000 + i), date=datetime(2025, 7, 10, 9, tzinfo=EVENT_TZ),
+                                participant_type="Delegate") for i in range(5)])
+        db.commit()
+        first = crud.get_roster_changes(db, since=0, horizon=crud.change_horizon(db))
+        db.commit()
+        assert len(first["participants"]) == 5 and not first["has_more"]
+
+        food_log_crud.update_food_log(db, FoodLogUpdate(registration_id="1000", date=datetime(2025, 7, 10),
+                                                        lunch=1, lunch_takenon=datetime(2025, 7, 10, 12, 30)))
+        db.delete(db.query(Participant).filter_by(registrant_id="1004").one())
+        db.commit()
+
+        delta = crud.get_roster_changes(db, since=first["next_since"], horizon=crud.change_horizon(db))
+        assert delta["participants"] == []
+        assert [(s["registration_id"], s["lunch"]) for s in delta["served"]] == [("1000", True)]
+        assert [(d["kind"], d["registrant_id"]) for d in delta["deleted"]] == [("participant", "1004")]
+        assert delta["next_since"] > first["next_since"]
+
+def test_food_logs_are_only_versioned_when_served_meals_change(pg_engine):
+    day = datetime(2025, 7, 10)
+    with sessionmaker(bind=pg_engine)() as db:
+        food_log_crud.update_food_log(db, FoodLogUpdate(registration_id="1000", date=day, lunch=1,
+                                                        lunch_takenon=datetime(2025, 7, 10, 12, 30)))
+        served = crud.get_roster_changes(db, since=0, horizon=crud.change_horizon(db))
+        db.commit()
+        assert [s["registration_id"] for s in served["served"]] == ["1000"]
+
+        # A name change and a special registration's scan do not change what the feed reports
+        food_log_crud.update_food_log(db, FoodLogUpdate(registration_id="1000", date=day, name="Ali"))
+        food_log_crud.update_food_log(db, FoodLogUpdate(registration_id="FB005-80057860", date=datetime(2025, 7, 10, 13),
+                                                        lunch=1, lunch_takenon=datetime(2025, 7, 10, 13)))
+        unchanged = crud.get_roster_changes(db, since=served["next_since"], horizon=crud.change_horizon(db))
+        db.commit()
+        assert unchanged["served"] == [] and unchanged["next_since"] == served["next_since"]
+
+        food_log_crud.update_food_log(db, FoodLogUpdate(registration_id="1000", date=day, dinner=1,
+                                                        dinner_takenon=datetime(2025, 7, 10, 19)))
+        dinner = crud.get_roster_changes(db, since=served["next_since"], horizon=crud.change_horizon(db))
+        assert [(s["lunch"], s["dinner"]) for s in dinner["served"]] == [(True, True)]
+
+def _participant(registrant_id):
+    return Participant(registrant_id=registrant_id, date=datetime(2025, 7, 10, 9, tzinfo=EVENT_TZ),
+                       participant_type="Delegate")
+
+def _registrants(page):
+    return [p["registrant_id"] for p in page["participants"]]
+
+def test_open_writer_holds_back_later_versions_but_other_transactions_do_not(pg_engine):
+    local_session = sessionmaker(bind=pg_engine)
+    with local_session() as slow, local_session() as fast, local_session() as idle, local_session() as reader:
+        # Idle in transaction (or a long export): not a roster writer, so it does not hold the feed back
+        idle.execute(text("SELECT count(*) FROM fnb.participants"))
+
+        slow.add(_participant("2001"))
+        slow.flush()  # takes the lower version, not committed yet
+        fast.add(_participant("2002"))
+        fast.commit()
+
+        page = crud.get_roster_changes(reader, since=0, horizon=crud.change_horizon(reader))
+        reader.commit()
+        assert _registrants(page) == [] and page["next_since"] == 0
+
+        slow.commit()
+        page = crud.get_roster_changes(reader, since=page["next_since"], horizon=crud.change_horizon(reader))
+        reader.commit()
+        assert _registrants(page) == ["2001", "2002"]
+
+        fast.add(_participant("2003"))
+        fast.commit()
+        page = crud.get_roster_changes(reader, since=page["next_since"], horizon=crud.change_horizon(reader))
+        assert _registrants(page) == ["2003"]
@@ -0,0 +1,130 @@
+import asyncio
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+
+from sqlalchemy import func, select
+
+from app.core import meal_timings as meal_timings_module
+from app.core.event_time import EVENT_TZ, to_event_time
+from app.core.meal_timings import MealTimings
+from app.crud import scan as scan_crud
+from app.models.food_log import FoodLog
+from app.models.participant import Participant
+from app.models.special_meal_log import SpecialMealLog
+from app.schemas.scan import ScanRequest
+
+LUNCH_TIME = datetime(2025, 7, 10, 12, 30)
+
+@pytest.fixture
+def recorded(monkeypatch):
+    """Replace the DB-backed crud calls used by process_scan with in-memory fakes"""
+    calls = {"food_logs": [], "error_logs": [], "duplicate": False, "participant": SimpleNamespace(participant_type="Delegate")}
+
+    def update_food_log(db, update_data, commit=True):
+        if calls["duplicate"]:
+            raise scan_crud.food_log_crud.DuplicateMealError("already recorded")
+        calls["food_logs"].append(update_data)
+        return SimpleNamespace(**update_data.dict())
+
+    def create_error_log(db, error_log, commit=True):
+        calls["error_logs"].append(error_log)
+        return error_log
+
+    monkeypatch.setattr(scan_crud.food_log_crud, "update_food_log", update_food_log)
+    monkeypatch.setattr(scan_crud.participant_crud, "get_scheduled_participant",
+                        lambda db, registrationid, date_str: calls["participant"])
+    monkeypatch.setattr(scan_crud.error_log_crud, "create_error_log", create_error_log)
+    return calls
+
+def test_scan_accepted(recorded):
+    verdict = scan_crud.process_scan(None, ScanRequest(registration_id=1234, meal="Lunch", scan_time=LUNCH_TIME), user_id=1)
+    assert verdict.accepted
+    assert verdict.participant_type == "Delegate"
+    assert recorded["food_logs"][0].lunch == 1
+    assert recorded["food_logs"][0].lunch_takenon == to_event_time(LUNCH_TIME)
+    assert not recorded["error_logs"]
+
+def test_scan_only_sets_scanned_meal(recorded):
+    dinner_time = datetime(2025, 7, 10, 19, 0)
+    verdict = scan_crud.process_scan(None, ScanRequest(registration_id="1234", meal="dinner", scan_time=dinner_time), user_id=1)
+    assert verdict.accepted
+    update = recorded["food_logs"][0]
+    # Unset fields are left alone by the upsert, so the other meal is kept
+    assert (update.lunch, update.dinner) == (None, 1)
+    assert update.lunch_takenon is None
+
+@pytest.mark.parametrize("changes, scan, error_code", [
+    ({}, dict(meal="breakfast", scan_time=LUNCH_TIME), "04"),
+    ({}, dict(meal="lunch", scan_time=datetime(2025, 7, 10, 8, 0)), "02"),
+    ({}, dict(meal="lunch", scan_time=datetime(2025, 7, 10, 16, 0)), "02"),
+    ({"participant": None}, dict(meal="lunch", scan_time=LUNCH_TIME), "01"),
+    ({"duplicate": True}, dict(meal="lunch", scan_time=LUNCH_TIME), "03"),
+])
+def test_scan_rejected(recorded, changes, scan, error_code):
+    recorded.update(changes)
+    verdict = scan_crud.process_scan(None, ScanRequest(registration_id="1234", **scan), user_id=7)
+    assert not verdict.accepted
+    assert verdict.error_code == error_code
+    assert recorded["error_logs"][0].error_code == error_code
+    assert recorded["error_logs"][0].user_id == 7
+    assert not recorded["food_logs"]
+
+def test_special_registration_skips_eligibility(recorded):
+    recorded["participant"] = None
+    verdict = scan_crud.process_scan(None, ScanRequest(registration_id="FB005-80057860", meal="lunch", scan_time=LUNCH_TIME), user_id=1)
+    assert verdict.accepted
+
+def test_async_scan_matches_sync(recorded, monkeypatch):
+    async def update_food_log_async(db, update_data):
+        recorded["food_logs"].append(update_data)
+        return SimpleNamespace(**update_data.dict())
+
+    async def get_scheduled_participant_async(db, registrationid, date_str):
+        return recorded["participant"]
+
+    monkeypatch.setattr(scan_crud.food_log_crud, "update_food_log_async", update_food_log_async)
+    monkeypatch.setattr(scan_crud.participant_crud, "get_scheduled_participant_async", get_scheduled_participant_async)
+
+    scan = ScanRequest(registration_id="1234", meal="lunch", scan_time=LUNCH_TIME)
+    verdict = asyncio.run(scan_crud.process_scan_async(None, scan, user_id=1))
+    assert verdict == scan_crud.process_scan(None, scan, user_id=1)
+
+def test_utc_scan_time_judged_in_event_timezone(recorded):
+    # 07:30 UTC is 12:30 in Karachi, inside the lunch window
+    verdict = scan_crud.process_scan(None, ScanRequest(registration_id="1234", meal="lunch",
+                                                       scan_time="2025-07-10T07:30:00Z"), user_id=1)
+    assert verdict.accepted
+    assert recorded["food_logs"][0].date.isoformat() == "2025-07-10T00:00:00+05:00"
+
+@pytest.mark.parametrize("registration_id, name", [("FB005-80057860", None), ("1234", "Master")])
+def test_unlimited_badge_scanned_twice_in_a_day_gets_two_rows(sqlite_db, registration_id, name):
+    for scan_time in (LUNCH_TIME, datetime(2025, 7, 10, 13, 0)):
+        scan = ScanRequest(registration_id=registration_id, name=name, meal="lunch", scan_time=scan_time)
+        assert scan_crud.process_scan(sqlite_db, scan, user_id=1).accepted
+    assert sqlite_db.execute(select(func.count()).select_from(FoodLog)).scalar() == 2
+
+@pytest.fixture
+def breakfast_served(tmp_path, monkeypatch):
+    path = tmp_path / "meal_timings.yml"
+    path.write_text(meal_timings_module.meal_timings.config_path.read_text()
+                    .replace("is_active: false # Set to true when breakfast", "is_active: true # Set to true when breakfast"))
+    monkeypatch.setattr(scan_crud, "meal_timings", MealTimings(path))
+
+def test_active_special_meal_is_recorded_once_per_day(sqlite_db, breakfast_served):
+    sqlite_db.add(Participant(registrant_id="1234", date=datetime(2025, 7, 10, 9, tzinfo=EVENT_TZ), participant_type="Staff"))
+    sqlite_db.commit()
+    scans = [ScanRequest(registration_id="1234", meal="breakfast", scan_time=datetime(2025, 7, 10, 8, minute))
+             for minute in (0, 30)]
+
+    first = scan_crud.process_scan(sqlite_db, scans[0], user_id=1)
+    assert first.accepted and first.participant_type == "Staff" and first.food_log is None
+    assert scan_crud.process_scan(sqlite_db, scans[1], user_id=1).error_code == "03"
+    assert sqlite_db.execute(select(func.count()).select_from(SpecialMealLog)).scalar() == 1
+    assert sqlite_db.execute(select(func.count()).select_from(FoodLog)).scalar() == 0
+
+def test_unlimited_badge_takes_special_meal_again(sqlite_db, breakfast_served):
+    for minute in (0, 30):
+        scan = ScanRequest(registration_id="FB005-80057860", meal="breakfast", scan_time=datetime(2025, 7, 10, 8, minute))
+        assert scan_crud.process_scan(sqlite_db, scan, user_id=1).accepted
+    assert sqlite_db.execute(select(func.count()).select_from(SpecialMealLog)).scalar() == 2
@@ -0,0 +1,78 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import admin
+from app.api.v1.endpoints import users as user_endpoints
+from app.core import security
+
+def _payload(minutes_left: float) -> dict:
+    return {"sub": "scanner1", "type": "access", "exp": time.time() + minutes_left * 60}
+
+def test_token_not_renewed_outside_window():
+    response = Response()
+    token = asyncio.run(security.renew_access_token(response, _payload(14)))
+    assert token is None
+    assert security.ACCESS_TOKEN_HEADER not in response.headers
+
+def test_token_renewed_near_expiry():
+    response = Response()
+    token = asyncio.run(security.renew_access_token(response, _payload(1)))
+    assert token is not None
+    assert response.headers[security.ACCESS_TOKEN_HEADER] == token
+    assert asyncio.run(security.get_token_payload(token))["sub"] == "scanner1"
+
+def test_renewed_token_reused_within_bucket():
+    security.renewed_token_cache.clear()
+    assert security.issue_renewed_token("scanner1") == security.issue_renewed_token("scanner1")
+    assert security.issue_renewed_token("scanner1") != security.issue_renewed_token("scanner2")
+
+def test_refresh_token_rejected_as_access_token():
+    refresh_token = security.create_refresh_token({"sub": "scanner1"})
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(security.get_token_payload(refresh_token))
+    assert exc_info.value.status_code == 401
+
+def test_token_payload_cached_until_revoked():
+    security.token_cache.clear()
+    token = security.create_access_token({"sub": "scanner1"})
+    first = asyncio.run(security.get_token_payload(token))
+    assert asyncio.run(security.get_token_payload(token)) is first
+    assert security.token_cache.stats()["hits"] >= 1
+
+    security.revoke_token(token, first)
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(security.get_token_payload(token))
+    assert exc_info.value.status_code == 401
+
+def test_logout_only_revokes_valid_tokens():
+    app = FastAPI()
+    app.include_router(user_endpoints.router, prefix="/users")
+    security.revoked_tokens.clear()
+    token = security.create_access_token({"sub": "scanner1"})
+
+    with TestClient(app) as client:
+        assert client.post("/users/logout", headers={"Authorization": "Bearer not-a-token"}).status_code == 401
+        assert len(security.revoked_tokens) == 0
+
+        assert client.post("/users/logout", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+        assert client.post("/users/logout", headers={"Authorization": f"Bearer {token}"}).status_code == 401
+    assert len(security.revoked_tokens) == 1
+
+def test_metrics_are_for_admins_only(monkeypatch):
+    monkeypatch.setattr(security.settings, "ADMIN_USERNAMES", "ops, lead")
+    app = FastAPI()
+    app.include_router(admin.router, prefix="/admin")
+    user = SimpleNamespace(username="scanner1")
+    app.dependency_overrides[security.get_current_user] = lambda: user
+
+    with TestClient(app) as client:
+        assert client.get("/admin/metrics").status_code == 403
+        user.username = "ops"
+        reply = client.get("/admin/metrics")
+        assert reply.status_code == 200
+        assert "pool" in reply.json()
@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import sync as crud
+from app.schemas.scan import ScanVerdict
+from app.schemas.sync import ScanSyncEventIn
+
+LUNCH_TIME = datetime(2025, 7, 10, 12, 30)
+
+def _event(seq, minutes=0, device_id="scanner-1", registration_id="1001", meal="lunch"):
+    return ScanSyncEventIn(device_id=device_id, seq=seq, registration_id=registration_id, meal=meal,
+                           scan_time=LUNCH_TIME + timedelta(minutes=minutes))
+
+@pytest.fixture
+def applied(sqlite_db, monkeypatch):
+    """Run sync_scans on SQLite with process_scan replaced by a recorder"""
+    calls = {"applied": [], "fail": set()}
+
+    def process_scan(db, scan, user_id, commit=True):
+        if (scan.device_id, scan.seq) in calls["fail"]:
+            raise ValueError("boom")
+        calls["applied"].append((scan.device_id, scan.seq))
+        rejected = scan.registration_id == "bad"
+        return ScanVerdict(accepted=not rejected, registration_id=scan.registration_id, meal=scan.meal,
+                           scan_time=scan.scan_time, error_code="01" if rejected else None)
+
+    monkeypatch.setattr(crud, "insert", sqlite_insert)
+    monkeypatch.setattr(crud.scan_crud, "process_scan", process_scan)
+    return calls
+
+def test_events_applied_in_scan_time_order(sqlite_db, applied):
+    events = [_event(1, minutes=5), _event(2, minutes=0), _event(1, minutes=1, device_id="scanner-2")]
+    results, marks = crud.sync_scans(sqlite_db, events, user_id=1)
+
+    assert applied["applied"] == [("scanner-1", 2), ("scanner-2", 1), ("scanner-1", 1)]
+    assert {status for status, _, _ in results.values()} == {crud.SYNC_ACCEPTED}
+    assert marks == {"scanner-1": 2, "scanner-2": 1}
+
+def test_replayed_events_are_not_applied_twice(sqlite_db, applied):
+    crud.sync_scans(sqlite_db, [_event(1), _event(2, registration_id="bad")], user_id=1)
+    results, marks = crud.sync_scans(sqlite_db, [_event(1), _event(2), _event(2), _event(3, minutes=1)], user_id=1)
+
+    assert applied["applied"] == [("scanner-1", 1), ("scanner-1", 2), ("scanner-1", 3)]
+    assert results[("scanner-1", 1)][0] == crud.SYNC_DUPLICATE
+    assert results[("scanner-1", 2)][0] == crud.SYNC_DUPLICATE
+    assert results[("scanner-1", 3)][0] == crud.SYNC_ACCEPTED
+    assert marks == {"scanner-1": 3}
+
+def test_rejected_scan_is_stored_with_its_error_code(sqlite_db, applied):
+    results, _ = crud.sync_scans(sqlite_db, [_event(7, registration_id="bad")], user_id=1)
+    assert results[("scanner-1", 7)] == (crud.SYNC_REJECTED, "01", None)
+
+def test_failed_chunk_falls_back_to_single_events(sqlite_db, applied):
+    applied["fail"].add(("scanner-1", 2))
+    results, marks = crud.sync_scans(sqlite_db, [_event(seq, minutes=seq) for seq in range(1, 5)], user_id=1, chunk_size=10)
+
+    assert results[("scanner-1", 2)][0] == crud.SYNC_ERROR
+    assert [results[("scanner-1", seq)][0] for seq in (1, 3, 4)] == [crud.SYNC_ACCEPTED] * 3
+    # The failed event was not stored, so the client keeps it and everything after it
+    assert marks == {"scanner-1": 1}
+    retry, _ = crud.sync_scans(sqlite_db, [_event(2, minutes=2)], user_id=1)
+    assert retry[("scanner-1", 2)][0] == crud.SYNC_ERROR
+
+def test_repeated_event_in_one_upload_is_accepted_once(sqlite_db, applied):
+    events = [_event(1), _event(2, minutes=1), _event(1)]
+    results, _ = crud.sync_scans(sqlite_db, events, user_id=1)
+
+    assert [status for status, _, _ in crud.event_results(events, results)] == [
+        crud.SYNC_ACCEPTED, crud.SYNC_ACCEPTED, crud.SYNC_DUPLICATE
+    ]
+
+def test_repeated_special_scans_in_one_day_all_sync(sqlite_db, monkeypatch):
+    monkeypatch.setattr(crud, "insert", sqlite_insert)
+    events = [_event(seq, minutes=seq * 10, registration_id="FB005-80057860") for seq in range(1, 4)]
+    results, marks = crud.sync_scans(sqlite_db, events, user_id=1)
+
+    assert {status for status, _, _ in results.values()} == {crud.SYNC_ACCEPTED}
+    assert marks == {"scanner-1": 3}
+
+def test_sync_against_postgres_records_each_meal_once(pg_engine):
+    events = [_event(seq, minutes=seq) for seq in range(1, 4)]
+    with sessionmaker(bind=pg_engine)() as db:
+        results, _ = crud.sync_scans(db, events, user_id=1)
+        replay, _ = crud.sync_scans(db, events, user_id=1)
+
+    # The participant is not on the roster, so every scan is rejected once and then deduplicated
+    assert {status for status, _, _ in results.values()} == {crud.SYNC_REJECTED}
+    assert {status for status, _, _ in replay.values()} == {crud.SYNC_DUPLICATE}
+
+def test_gapped_upload_holds_the_mark_at_the_gap(sqlite_db, applied):
+    _, marks = crud.sync_scans(sqlite_db, [_event(1), _event(2, minutes=1), _event(5, minutes=2)], user_id=1)
+    # 3 and 4 were never received, so the client must keep them (and 5)
+    assert marks == {"scanner-1": 2}
+
+    _, marks = crud.sync_scans(sqlite_db, [_event(3, minutes=3), _event(4, minutes=4)], user_id=1)
+    assert marks == {"scanner-1": 5}
+
+def test_no_mark_while_the_first_seqs_are_missing(sqlite_db, applied):
+    applied["fail"].add(("scanner-1", 1))
+    _, marks = crud.sync_scans(sqlite_db, [_event(seq, minutes=seq) for seq in range(1, 4)], user_id=1, chunk_size=10)
+    assert marks == {}
+    _, marks = crud.sync_scans(sqlite_db, [_event(seq, minutes=seq, device_id="scanner-2") for seq in (4, 5)],
+                               user_id=1)
+    assert marks == {}